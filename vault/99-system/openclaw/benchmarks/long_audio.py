@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare sequential and chunked parallel transcription of one long recording.
+
+Sequential: transcribe_segments() decodes the whole file on one warm model.
+Parallel: the file is cut at pauses and the chunks are decoded by a process
+pool with one model per worker (see voice/longaudio.py); its time includes
+starting the workers and loading their models. The report gives both times,
+the speedup, and the WER of the parallel transcript against the sequential
+one, which shows what the chunk boundaries cost in accuracy.
+
+Use a real recording (a meeting, a lecture); --minutes loops a shorter one
+to length. Needs the voice venv and the Whisper model.
+
+Usage:
+    python3 long_audio.py meeting.ogg [--model small] [--workers 4] [--minutes 60]
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import tempfile
+
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
+
+from wer_latency import wer
+
+
+def loop_to(audio_path, minutes, output):
+    """Write audio_path repeated to the given length as a 16 kHz WAV."""
+    import numpy as np
+    import preprocess
+
+    samples = preprocess.decode_audio(audio_path)
+    length = int(minutes * 60 * preprocess.SAMPLE_RATE)
+    repeats = -(-length // max(len(samples), 1))
+    pcm = (np.clip(np.tile(samples, repeats)[:length], -1, 1) * 32767).astype('<i2')
+    with wave.open(output, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(preprocess.SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+    return output
+
+
+def run(audio_path, model, parallel):
+    from voice import transcribe_segments
+
+    start = time.perf_counter()
+    segments, info = transcribe_segments(audio_path, model, use_cache=False, parallel=parallel)
+    elapsed = time.perf_counter() - start
+    text = " ".join(s.text.strip() for s in segments)
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'rtf': round(elapsed / info['duration'], 3) if info['duration'] else None,
+        'segments': len(segments),
+        'words': len(text.split()),
+        'chunks': info.get('chunks', 1),
+        'workers': info.get('workers', 1),
+    }, text, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Long-recording parallel transcription benchmark')
+    parser.add_argument('audio', help='Local recording to transcribe')
+    parser.add_argument('--model', '-m', default='small',
+                        choices=['tiny', 'base', 'small', 'medium', 'large'])
+    parser.add_argument('--workers', '-w', type=int, help='Pool workers (default: longaudio.worker_count)')
+    parser.add_argument('--minutes', type=float, help='Loop the recording to this length first')
+    args = parser.parse_args()
+
+    import longaudio
+    from models import get_model
+
+    workers = args.workers or longaudio.worker_count(args.model)
+    if workers < 2:
+        parser.error('only one worker fits (CPU count / WHISPER_POOL_MAX_MB); pass --workers')
+
+    workdir = tempfile.mkdtemp(prefix='nazar-bench-')
+    try:
+        audio = args.audio
+        if args.minutes:
+            audio = loop_to(audio, args.minutes, os.path.join(workdir, 'long.wav'))
+
+        get_model(args.model)  # sequential runs on a warm model, as in the daemon
+        sequential, reference, info = run(audio, args.model, False)
+        parallel, hypothesis, _ = run(audio, args.model, workers)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'model': args.model,
+        'cores': os.cpu_count(),
+        'audio_seconds': round(info['duration'], 1),
+        'speech_seconds': round(info['speech_duration'], 1),
+        'chunk_seconds': longaudio.CHUNK_SECONDS,
+        'sequential': sequential,
+        'parallel': parallel,
+        'speedup': round(sequential['elapsed_s'] / parallel['elapsed_s'], 2) if parallel['elapsed_s'] else None,
+        'wer_vs_sequential': round(wer(reference, hypothesis), 4),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
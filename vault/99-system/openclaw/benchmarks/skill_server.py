@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare CLI latency with and without the resident skill server.
+
+Runs `obsidian-cli.py append` and `obsidian-cli.py daily-path` repeatedly
+against a throwaway vault, first as fresh interpreters (in-process mode),
+then as thin clients of a skill server, and prints a JSON report.
+
+Usage:
+    python3 skill_server.py [--runs 30]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SKILLS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'skills')
+OBSIDIAN_CLI = os.path.join(SKILLS_DIR, 'obsidian', 'scripts', 'obsidian-cli.py')
+SERVER = os.path.join(SKILLS_DIR, 'obsidian', 'scripts', 'skill-server.py')
+
+COMMANDS = {
+    'daily-path': ['daily-path'],
+    'append': ['append', '-c', 'benchmark entry'],
+}
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(ordered) * 1000, 2),
+        'p95_ms': round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 2),
+    }
+
+
+def time_command(argv, env, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, OBSIDIAN_CLI] + argv, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def wait_for_socket(path, timeout=10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if os.path.exists(path):
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Skill server latency benchmark')
+    parser.add_argument('--runs', '-n', type=int, default=30, help='Runs per command and mode')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='nazar-bench-')
+    socket_path = os.path.join(workdir, 'skills.sock')
+    env = dict(os.environ, VAULT_PATH=os.path.join(workdir, 'vault'), NAZAR_SKILL_SOCKET=socket_path)
+    os.makedirs(env['VAULT_PATH'])
+
+    report = {'runs': args.runs, 'python': sys.version.split()[0], 'commands': {}}
+    try:
+        for name, argv in COMMANDS.items():
+            report['commands'][name] = {'in_process': summarize(time_command(argv, env, args.runs))}
+
+        server = subprocess.Popen([sys.executable, SERVER, 'serve'], env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_for_socket(socket_path):
+                raise RuntimeError('skill server did not start')
+            for name, argv in COMMANDS.items():
+                result = report['commands'][name]
+                result['server'] = summarize(time_command(argv, env, args.runs))
+                result['speedup'] = round(result['in_process']['median_ms'] / result['server']['median_ms'], 2)
+        finally:
+            server.terminate()
+            server.wait()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
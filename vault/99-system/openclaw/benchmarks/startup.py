@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Measure voice-cli.py startup cost per subcommand with `python -X importtime`.
+
+For each subcommand, a fresh interpreter loads voice-cli.py (without running
+it) and imports the modules that subcommand needs before it does any work:
+the daemon client, and voice.py for the in-process fallback. Import time is
+the importtime total minus a bare interpreter's. Speech synthesis and daily
+notes must not pull in the Whisper/PyAV stack at startup; `--check` fails
+when a budgeted subcommand exceeds its budget or imports a heavy module.
+
+Usage:
+    python3 startup.py [--runs 10] [--check]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+VAULT_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..'))
+VOICE_CLI = os.path.join(VAULT_DIR, '99-system', 'openclaw', 'skills', 'voice', 'scripts', 'voice-cli.py')
+
+# Modules each subcommand imports before it starts working
+SUBCOMMANDS = {
+    'transcribe': ['voice'],
+    'speak': ['voice'],
+    'daily-note': ['voice'],
+    'transcribe-batch': ['voice'],
+    'cache': ['cache'],
+}
+
+# Startup budgets (import milliseconds, median) guarded by --check
+BUDGET_MS = {
+    'speak': 60,
+    'daily-note': 60,
+}
+
+# Modules that must only load once a subcommand actually decodes or encodes audio
+HEAVY_MODULES = ('faster_whisper', 'ctranslate2', 'av', 'numpy', 'onnxruntime', 'tokenizers')
+
+LOAD_CLI = (
+    "import importlib.util\n"
+    "spec = importlib.util.spec_from_file_location('voice_cli', {cli!r})\n"
+    "module = importlib.util.module_from_spec(spec)\n"
+    "spec.loader.exec_module(module)\n"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        Tuple of (top-level cumulative microseconds, {module: cumulative us})
+    """
+    total = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        cumulative = int(cumulative)
+        if not name.startswith('  '):
+            total += cumulative
+        modules[name.strip()] = cumulative
+    return total, modules
+
+
+def run_snippet(code, env):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return parse_importtime(result.stderr)
+
+
+def measure(modules, env, runs, bare_us):
+    code = LOAD_CLI.format(cli=VOICE_CLI) + ''.join(f"import {m}\n" for m in modules)
+    samples = []
+    for _ in range(runs):
+        total, imported = run_snippet(code, env)
+        samples.append((total - bare_us) / 1000)
+
+    heaviest = sorted(((us, name) for name, us in imported.items()), reverse=True)[:5]
+    return {
+        'runs': runs,
+        'import_ms': round(statistics.median(samples), 1),
+        'heavy_modules': sorted(m for m in imported if m.split('.')[0] in HEAVY_MODULES),
+        'heaviest': [{'module': name, 'ms': round(us / 1000, 1)} for us, name in heaviest],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='voice-cli.py startup benchmark')
+    parser.add_argument('--runs', '-n', type=int, default=10, help='Runs per subcommand')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit non-zero when a budgeted subcommand is over budget')
+    args = parser.parse_args()
+
+    env = dict(os.environ, VAULT_PATH=VAULT_DIR)
+    bare_us = statistics.median(run_snippet('pass', env)[0] for _ in range(args.runs))
+
+    report = {'python': sys.version.split()[0], 'budget_ms': BUDGET_MS, 'subcommands': {}}
+    failures = []
+    for name, modules in SUBCOMMANDS.items():
+        result = measure(modules, env, args.runs, bare_us)
+        report['subcommands'][name] = result
+        if name in BUDGET_MS:
+            if result['import_ms'] > BUDGET_MS[name]:
+                failures.append(f"{name}: {result['import_ms']} ms > {BUDGET_MS[name]} ms")
+            if result['heavy_modules']:
+                failures.append(f"{name}: imports {', '.join(result['heavy_modules'])} at startup")
+
+    report['failures'] = failures
+    print(json.dumps(report, indent=2))
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
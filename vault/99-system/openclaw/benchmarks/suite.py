@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""Benchmark suite for the obsidian and voice skills on a synthetic vault.
+
+Generates a throwaway vault under /tmp (years of daily notes plus PARA notes
+with tags and wikilinks) and synthetic audio fixtures, then measures:
+
+- obsidian: config loading, index build, daily-note listing, reading
+  (whole notes and the last entries), date-range reads, appending, note
+  creation, search, link-graph queries and change-feed reconciliation
+- voice: Whisper model load and transcription real-time factor per fixture
+  length (model and beam chosen by policy.json as for `--model auto`)
+- tts: time to first PCM chunk, full WAV and OGG/Opus synthesis
+- semantic: embedding index build, no-op refresh and query latency
+
+Results are keyed by metric name, so runs can be stored and compared:
+`--output` writes the JSON report, `--compare` diffs against an earlier one
+and flags regressions. Everything runs offline on the CPU; Whisper models
+must already be in $WHISPER_MODEL_DIR and the Piper voice in
+$PIPER_MODEL_DIR, the embedding model in $EMBED_MODEL_DIR. Sections whose dependencies are missing are reported as
+skipped. Audio fixtures are spoken by Piper when it is available, otherwise
+they are synthetic tone bursts (fine for RTF, not for accuracy).
+
+Usage:
+    python3 suite.py [--years 3] [--para 300] [--runs 20] [--audio 5 30 120]
+                     [--sections obsidian voice tts semantic] [--output run.json]
+                     [--compare baseline.json]
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import math
+import tempfile
+import statistics
+import subprocess
+from datetime import date, datetime, timedelta
+
+SKILLS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'skills'))
+
+SECTIONS = ('obsidian', 'voice', 'tts', 'semantic')
+
+WORDS = (
+    "meeting project review garden budget travel family reading idea draft call "
+    "deadline workout recipe invoice release design feedback weekend music plan "
+    "doctor train coffee notes sprint client report habit journal research"
+).split()
+
+TAGS = ['work', 'health', 'family', 'ideas', 'finance', 'learning', 'travel']
+
+PARA_FOLDERS = ['02-projects', '03-areas', '04-resources', '05-archive']
+
+SENTENCES = [
+    "I added the meeting notes to today's journal under the ten o'clock entry.",
+    "The project deadline moved to Friday, so the review is now on Thursday afternoon.",
+    "You have three open tasks in the inbox and one of them is overdue.",
+    "Remember to call the dentist before noon to confirm the appointment.",
+    "The weather looks clear this evening, which is good for the run you planned.",
+]
+
+SHORT_REPLY = "Saved to your daily note."
+
+
+def summarize(samples):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'runs': len(samples),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[math.ceil(len(ordered) * 0.95) - 1] * 1000, 3),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 3),
+        'min_ms': round(ordered[0] * 1000, 3),
+    }
+
+
+def measure(func, runs, args=()):
+    """Time func(*next(args)) runs times; args is an iterator of argument tuples."""
+    args = iter(args)
+    samples = []
+    for _ in range(runs):
+        call_args = next(args, ())
+        start = time.perf_counter()
+        func(*call_args)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+# --- Synthetic vault ---
+
+def _sentence(rng, links):
+    words = rng.sample(WORDS, rng.randint(6, 14))
+    if rng.random() < 0.3:
+        words.append(f"#{rng.choice(TAGS)}")
+    if links and rng.random() < 0.3:
+        words.append(f"[[{rng.choice(links)}]]")
+    return " ".join(words).capitalize() + "."
+
+
+def generate_vault(root, years=3, para=300, seed=1):
+    """
+    Write a synthetic vault: Obsidian config, daily notes and PARA notes.
+
+    Args:
+        root: Vault directory (created)
+        years: Years of daily notes, ending yesterday
+        para: Number of notes spread over the PARA folders
+        seed: Random seed, so runs with the same arguments get the same vault
+
+    Returns:
+        Dict with the generated counts, the daily-note dates and PARA note titles
+    """
+    rng = random.Random(seed)
+    config = {
+        'app.json': {'newFileFolderPath': '00-inbox/', 'attachmentFolderPath': './attachments'},
+        'daily-notes.json': {'folder': '01-daily-journey/', 'format': 'YYYY-MM-DD'},
+        'core-plugins.json': {'daily-notes': True, 'templates': True, 'backlink': True},
+    }
+    os.makedirs(os.path.join(root, '.obsidian'))
+    for name, data in config.items():
+        with open(os.path.join(root, '.obsidian', name), 'w') as f:
+            json.dump(data, f)
+    os.makedirs(os.path.join(root, '00-inbox'))
+
+    titles = [f"{WORDS[i % len(WORDS)].capitalize()} {i}" for i in range(para)]
+    for i, title in enumerate(titles):
+        folder = os.path.join(root, PARA_FOLDERS[i % len(PARA_FOLDERS)])
+        os.makedirs(folder, exist_ok=True)
+        body = "\n\n".join(
+            " ".join(_sentence(rng, titles) for _ in range(rng.randint(2, 5)))
+            for _ in range(rng.randint(2, 6))
+        )
+        # File named like the title, as Obsidian does, so [[Title]] links resolve
+        with open(os.path.join(folder, title + '.md'), 'w') as f:
+            f.write(f"---\ntags: [{', '.join(rng.sample(TAGS, 2))}]\n---\n\n# {title}\n\n{body}\n")
+
+    end = date.today() - timedelta(days=1)
+    day = end.replace(year=end.year - years) + timedelta(days=1)
+    dates = []
+    while day <= end:
+        path = os.path.join(root, '01-daily-journey', day.strftime('%Y'), day.strftime('%m-%B'),
+                            day.strftime('%Y-%m-%d') + '.md')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entries = "".join(
+            f"\n\n---\n\n**[{rng.randint(6, 22):02d}:{rng.randint(0, 59):02d}]**\n\n"
+            + " ".join(_sentence(rng, titles) for _ in range(rng.randint(1, 4)))
+            for _ in range(rng.randint(1, 6))
+        )
+        with open(path, 'w') as f:
+            f.write(f"# {day.isoformat()}{entries}\n")
+        dates.append(day)
+        day += timedelta(days=1)
+
+    return {'daily_notes': len(dates), 'para_notes': para, 'dates': dates, 'titles': titles}
+
+
+# --- Synthetic audio ---
+
+def _tone_bursts(seconds, rate, rng):
+    """Speech-like PCM without a TTS voice: syllable-rate tone bursts between pauses."""
+    import numpy as np
+
+    t = np.arange(int(seconds * rate)) / rate
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    voiced = sum(np.sin(2 * np.pi * k * np.cumsum(pitch) / rate) / k for k in (1, 2, 3))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    # Pause for 0.6 s every ~3 s, like breaths between phrases
+    envelope[(t % 3.0) > 2.4] = 0
+    signal = 0.3 * voiced * envelope + 0.005 * rng.standard_normal(len(t))
+    return (np.clip(signal, -1, 1) * 32767).astype('<i2').tobytes()
+
+
+def _spoken(seconds):
+    """PCM of Piper reading SENTENCES until the clip is long enough."""
+    import tts
+
+    rate = tts.sample_rate()
+    pause = b"\0\0" * int(rate * 0.4)
+    needed = int(seconds * rate) * 2
+    pcm = bytearray()
+    i = 0
+    while len(pcm) < needed:
+        for chunk in tts.synthesize_stream(SENTENCES[i % len(SENTENCES)]):
+            pcm += chunk
+        pcm += pause
+        i += 1
+    return rate, bytes(pcm[:needed])
+
+
+def generate_audio(directory, lengths, seed=1):
+    """
+    Write one OGG/Opus fixture per length.
+
+    Returns:
+        Tuple of ({seconds: path}, source) where source is 'piper' or 'tones'
+    """
+    import numpy as np
+    from voice import encode_opus
+
+    os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    try:
+        import tts
+        tts.get_voice()
+        source = 'piper'
+    except Exception:
+        source = 'tones'
+
+    fixtures = {}
+    for seconds in lengths:
+        if source == 'piper':
+            rate, pcm = _spoken(seconds)
+        else:
+            rate, pcm = 16000, _tone_bursts(seconds, 16000, rng)
+        path = os.path.join(directory, f'fixture-{seconds}s.ogg')
+        encode_opus([pcm], rate, path)
+        fixtures[seconds] = path
+    return fixtures, source
+
+
+# --- Sections ---
+
+def bench_obsidian(vault, runs, rng):
+    import obsidian
+    import vault_index
+
+    dates = vault['dates']
+    results = {}
+    results['config.load'] = measure(lambda: obsidian.get_config(reload=True), runs)
+    results['config.cached'] = measure(obsidian.get_config, runs)
+
+    start = time.perf_counter()
+    vault_index.refresh()
+    results['index.build'] = summarize([time.perf_counter() - start])
+    results['index.refresh'] = measure(vault_index.refresh, runs)
+    results['index.catch_up'] = measure(vault_index.catch_up, runs)
+
+    latest = dates[-1]
+    results['daily.list_all'] = measure(obsidian.list_daily_notes, runs)
+    results['daily.list_year'] = measure(lambda: obsidian.list_daily_notes(latest.year), runs)
+    results['daily.list_month'] = measure(lambda: obsidian.list_daily_notes(latest.year, latest.month), runs)
+
+    month_start, month_end = obsidian.period_bounds('month', latest)
+    results['daily.range_month'] = measure(lambda: list(obsidian.read_daily_range(month_start, month_end)), runs)
+
+    def random_dates():
+        while True:
+            yield (datetime.combine(rng.choice(dates), datetime.min.time()),)
+
+    results['note.read'] = measure(lambda d: obsidian.read_note(obsidian.get_daily_note_path(d)),
+                                   runs, random_dates())
+    results['note.read_entries'] = measure(
+        lambda d: obsidian.read_entries(obsidian.get_daily_note_path(d), last=2), runs, random_dates())
+    results['daily.append'] = measure(lambda d: obsidian.append_to_daily_note("Benchmark entry", d, "12:00"),
+                                      runs, random_dates())
+    results['note.create'] = measure(
+        lambda i: obsidian.create_note(f"Benchmark note {i}", "Body text for the benchmark."),
+        runs, ((i,) for i in range(runs)))
+    results['search'] = measure(lambda: obsidian.search_notes("project review", refresh=False), runs)
+
+    titles = vault['titles'] or ['missing']
+    results['links.backlinks'] = measure(lambda t: obsidian.get_backlinks(t, refresh=False), runs,
+                                         ((rng.choice(titles),) for _ in range(runs)))
+    results['links.orphans'] = measure(lambda: obsidian.find_orphans(refresh=False), runs)
+
+    import changes
+    changes.reconcile()
+    results['changes.reconcile'] = measure(changes.reconcile, runs)
+    results['changes.since'] = measure(lambda: changes.changes(since=0, refresh=False), runs)
+
+    # Re-adding known content links it instead of storing another copy
+    import attachments
+    payload = rng.randbytes(256 * 1024)
+    results['attachments.add'] = measure(
+        lambda i: obsidian.add_attachment(io.BytesIO(payload), f"bench-{i % 4}.png"), runs,
+        ((i,) for i in range(runs)))
+    attachments.dedupe()
+    results['attachments.dedupe'] = measure(attachments.dedupe, runs)
+    return results, {}
+
+
+def bench_voice(workdir, lengths, runs):
+    import policy
+    from models import get_model
+    from voice import transcribe_segments
+
+    fixtures, source = generate_audio(os.path.join(workdir, 'audio'), lengths)
+    results = {}
+    loaded = set()
+    for seconds, path in sorted(fixtures.items()):
+        decision = policy.choose(seconds, policy.IDLE)
+        key = (decision['model'], decision['compute_type'])
+        if key not in loaded:
+            start = time.perf_counter()
+            get_model(*key)
+            results[f"voice.model_load.{decision['model']}"] = summarize([time.perf_counter() - start])
+            loaded.add(key)
+
+        samples, duration = [], seconds
+        for _ in range(max(1, runs // 5)):
+            start = time.perf_counter()
+            segments, info = transcribe_segments(path, decision['model'], use_cache=False,
+                                                 compute_type=decision['compute_type'],
+                                                 beam_size=decision['beam_size'])
+            samples.append(time.perf_counter() - start)
+            duration = info['duration'] or seconds
+        summary = summarize(samples)
+        summary.update(model=decision['model'], beam_size=decision['beam_size'],
+                       audio_seconds=round(duration, 2),
+                       rtf=round(statistics.median(samples) / duration, 4))
+        results[f'voice.transcribe.{seconds}s'] = summary
+    return results, {'fixtures': source}
+
+
+def bench_tts(workdir, runs):
+    import tts
+    from voice import stream_speech, generate_speech, generate_opus
+
+    start = time.perf_counter()
+    tts.get_voice()
+    results = {'tts.voice_load': summarize([time.perf_counter() - start])}
+
+    long_reply = " ".join(SENTENCES * 2)
+    wav_path = os.path.join(workdir, 'reply.wav')
+
+    def first_chunk(text):
+        _, chunks = stream_speech(text)
+        next(iter(chunks))
+        chunks.close()
+
+    runs = max(1, runs // 4)
+    for name, text in (('short', SHORT_REPLY), ('long', long_reply)):
+        results[f'tts.first_chunk.{name}'] = measure(lambda: first_chunk(text), runs)
+        results[f'tts.wav.{name}'] = measure(lambda: generate_speech(text, wav_path), runs)
+        results[f'tts.opus.{name}'] = measure(lambda: generate_opus(text, use_cache=False), runs)
+    return results, {}
+
+
+def bench_semantic(vault, runs):
+    import semantic
+
+    start = time.perf_counter()
+    built = semantic.refresh()
+    results = {'semantic.build': summarize([time.perf_counter() - start])}
+    results['semantic.build'].update(chunks=built['chunks'])
+    results['semantic.refresh'] = measure(semantic.refresh, runs)
+    results['semantic.search'] = measure(lambda: semantic.search("when did I feel tired"), runs)
+    results['semantic.search_folder'] = measure(
+        lambda: semantic.search("project budget", folder='02-projects'), runs)
+    return results, {'model': semantic.index_stats()['model']}
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare median latencies with an earlier report.
+
+    Returns:
+        Dict of metric -> {before_ms, after_ms, change} plus a list of regressions
+        (metrics slower by more than threshold)
+    """
+    changes, regressions = {}, []
+    for name, after in results.items():
+        before = baseline.get('results', {}).get(name)
+        if not isinstance(after, dict) or not isinstance(before, dict) or not before.get('median_ms'):
+            continue
+        change = round(after['median_ms'] / before['median_ms'] - 1, 3)
+        changes[name] = {'before_ms': before['median_ms'], 'after_ms': after['median_ms'], 'change': change}
+        if change > threshold:
+            regressions.append(name)
+    return {'baseline': baseline.get('meta', {}).get('started'), 'metrics': changes, 'regressions': regressions}
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SKILLS_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Obsidian and voice skill benchmark suite')
+    parser.add_argument('--years', type=int, default=3, help='Years of synthetic daily notes')
+    parser.add_argument('--para', type=int, default=300, help='Synthetic PARA notes')
+    parser.add_argument('--runs', '-n', type=int, default=20, help='Runs per vault operation')
+    parser.add_argument('--audio', nargs='+', type=int, default=[5, 30, 120],
+                        help='Audio fixture lengths in seconds')
+    parser.add_argument('--sections', nargs='+', choices=SECTIONS, default=list(SECTIONS))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Slowdown (fraction of the baseline median) reported as a regression')
+    parser.add_argument('--keep', action='store_true', help='Keep the synthetic vault')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='nazar-bench-')
+    vault_path = os.path.join(workdir, 'vault')
+    # The skills read these at import time, so set them before importing
+    os.environ.update(VAULT_PATH=vault_path, NAZAR_CACHE_DIR=os.path.join(workdir, 'cache'),
+                      VOICE_CACHE_DIR=os.path.join(workdir, 'cache', 'voice'),
+                      VOICE_DAEMON_SOCKET=os.path.join(workdir, 'voice.sock'),
+                      NAZAR_SKILL_SOCKET=os.path.join(workdir, 'skills.sock'))
+    sys.path.insert(0, os.path.join(SKILLS_DIR, 'voice'))
+    sys.path.insert(0, os.path.join(SKILLS_DIR, 'obsidian'))
+
+    report = {
+        'meta': {
+            'started': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        },
+        'results': {},
+        'skipped': {},
+    }
+    rng = random.Random(args.seed)
+    try:
+        start = time.perf_counter()
+        vault = generate_vault(vault_path, args.years, args.para, args.seed)
+        report['meta']['vault'] = {
+            'daily_notes': vault['daily_notes'],
+            'para_notes': vault['para_notes'],
+            'generate_s': round(time.perf_counter() - start, 2),
+        }
+
+        benches = {
+            'obsidian': lambda: bench_obsidian(vault, args.runs, rng),
+            'voice': lambda: bench_voice(workdir, args.audio, args.runs),
+            'tts': lambda: bench_tts(workdir, args.runs),
+            'semantic': lambda: bench_semantic(vault, args.runs),
+        }
+        for section in args.sections:
+            try:
+                results, meta = benches[section]()
+                report['results'].update(results)
+                if meta:
+                    report['meta'][section] = meta
+            except ImportError as e:
+                report['skipped'][section] = f"{type(e).__name__}: {e}"
+            except Exception as e:
+                if section == 'obsidian':
+                    raise
+                report['skipped'][section] = f"{type(e).__name__}: {e}"
+    finally:
+        if args.keep:
+            print(f"Synthetic vault kept at {vault_path}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            report['compare'] = compare(report['results'], json.load(f), args.threshold)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + "\n")
+    print(output)
+    if args.compare and report['compare']['regressions']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Compare the two-step TTS→WAV→Opus path with the in-memory pipeline.
+
+Two-step: generate_speech() writes a WAV, then convert_to_opus() reopens,
+decodes, resamples and encodes it. Pipeline: generate_opus() feeds Piper's
+PCM straight into the resampler and libopus encoder. Both run against the
+same warm Piper voice on a long synthetic reply; a JSON report is printed.
+Needs the voice venv (piper-tts, PyAV, numpy).
+
+Usage:
+    python3 tts_opus.py [--runs 5] [--sentences 40]
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
+
+SENTENCES = [
+    "I added the meeting notes to today's journal under the ten o'clock entry.",
+    "The project deadline moved to Friday, so the review is now on Thursday afternoon.",
+    "You have three open tasks in the inbox and one of them is overdue.",
+    "Remember to call the dentist before noon to confirm the appointment.",
+    "The weather looks clear this evening, which is good for the run you planned.",
+]
+
+
+def reply_text(count):
+    return " ".join(SENTENCES[i % len(SENTENCES)] for i in range(count))
+
+
+def summarize(samples):
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 1),
+        'min_ms': round(min(samples) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TTS to Opus pipeline benchmark')
+    parser.add_argument('--runs', '-n', type=int, default=5, help='Runs per path')
+    parser.add_argument('--sentences', '-s', type=int, default=40, help='Sentences in the reply')
+    args = parser.parse_args()
+
+    import tts
+    from voice import generate_speech, convert_to_opus, generate_opus
+
+    text = reply_text(args.sentences)
+    tts.get_voice()  # load once so both paths measure synthesis + encoding only
+
+    workdir = tempfile.mkdtemp(prefix='nazar-bench-')
+    two_step, pipeline = [], []
+    try:
+        for i in range(args.runs):
+            wav_path = os.path.join(workdir, f'two-step-{i}.wav')
+            start = time.perf_counter()
+            convert_to_opus(generate_speech(text, wav_path))
+            two_step.append(time.perf_counter() - start)
+            wav_bytes = os.path.getsize(wav_path)
+            ogg_two_step = os.path.getsize(wav_path.replace('.wav', '.ogg'))
+
+            start = time.perf_counter()
+            ogg = generate_opus(text)
+            pipeline.append(time.perf_counter() - start)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'runs': args.runs,
+        'characters': len(text),
+        'audio_seconds': round((wav_bytes - 44) / 2 / tts.sample_rate(), 1),
+        'two_step': dict(summarize(two_step), temp_bytes=wav_bytes, ogg_bytes=ogg_two_step),
+        'pipeline': dict(summarize(pipeline), temp_bytes=0, ogg_bytes=len(ogg)),
+    }
+    report['speedup'] = round(report['two_step']['median_ms'] / report['pipeline']['median_ms'], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Measure word error rate against decode latency to tune the voice policy.
+
+Decodes every fixture with a grid of (model, beam size) settings, and with
+the current adaptive policy, and reports WER and real-time factor per
+duration tier of policy.json. For each tier it suggests the cheapest setting
+whose WER is within --tolerance of the best and whose RTF meets the
+policy's latency target.
+
+Fixtures are recordings with a reference transcript next to them
+(memo.ogg + memo.txt). Use a handful of real voice notes per tier; they are
+not shipped with the repo. Needs the voice venv.
+
+Usage:
+    python3 wer_latency.py fixtures/ [--models base small] [--beams 1 5]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
+
+
+def words(text):
+    """Lowercase words without punctuation, for WER."""
+    return re.findall(r"[\w']+", text.lower())
+
+
+def wer(reference, hypothesis):
+    """Word error rate: word-level edit distance / reference length."""
+    ref, hyp = words(reference), words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        current = [i]
+        for j, h in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (r != h)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_fixtures(directory):
+    """(audio_path, reference_text) pairs for audio files with a .txt beside them."""
+    from voice import collect_audio_files
+
+    fixtures = []
+    for path in collect_audio_files(directory):
+        reference = os.path.splitext(path)[0] + '.txt'
+        if os.path.exists(reference):
+            with open(reference, 'r', encoding='utf-8') as f:
+                fixtures.append((path, f.read()))
+    return fixtures
+
+
+def tier_of(duration, tiers):
+    for i, tier in enumerate(tiers):
+        if tier.get("max_seconds") is None or duration <= tier["max_seconds"]:
+            return i
+    return len(tiers) - 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description='WER vs. latency benchmark for the voice policy')
+    parser.add_argument('fixtures', help='Directory of audio files with .txt reference transcripts')
+    parser.add_argument('--models', nargs='+', default=['tiny', 'base', 'small'], help='Models to try')
+    parser.add_argument('--beams', nargs='+', type=int, default=[1, 5], help='Beam sizes to try')
+    parser.add_argument('--tolerance', type=float, default=0.02,
+                        help='WER slack over the best setting when suggesting tiers')
+    args = parser.parse_args()
+
+    import policy
+    from models import get_model
+    from voice import transcribe_segments
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures (audio + .txt) in {args.fixtures}")
+
+    config = policy.load_policy()
+    tiers = config["tiers"]
+    settings = [(m, b) for m in args.models for b in args.beams] + [("auto", None)]
+    for model in args.models:
+        get_model(model)  # load up front so latency is decode time only
+
+    rows = {}
+    for path, reference in fixtures:
+        for model, beam in settings:
+            params = {} if beam is None else {"beam_size": beam}
+            start = time.perf_counter()
+            segments, info = transcribe_segments(path, model, use_cache=False, **params)
+            elapsed = time.perf_counter() - start
+            name = "auto" if model == "auto" else f"{model}/beam{beam}"
+            row = rows.setdefault((tier_of(info["duration"], tiers), name), {"wer": [], "rtf": []})
+            row["wer"].append(wer(reference, " ".join(s.text for s in segments)))
+            row["rtf"].append(elapsed / info["duration"] if info["duration"] else 0.0)
+
+    report = {"fixtures": len(fixtures), "latency_target_rtf": config["latency_target_rtf"], "tiers": []}
+    for index, tier in enumerate(tiers):
+        results = {
+            name: {
+                "files": len(row["wer"]),
+                "wer": round(statistics.mean(row["wer"]), 3),
+                "rtf": round(statistics.median(row["rtf"]), 3),
+            }
+            for (i, name), row in sorted(rows.items()) if i == index
+        }
+        grid = {name: r for name, r in results.items() if name != "auto"}
+        suggestion = None
+        if grid:
+            best = min(r["wer"] for r in grid.values())
+            fitting = [(r["rtf"], name) for name, r in grid.items()
+                       if r["wer"] <= best + args.tolerance and r["rtf"] <= config["latency_target_rtf"]]
+            suggestion = min(fitting)[1] if fitting else None
+        report["tiers"].append({
+            "max_seconds": tier.get("max_seconds"),
+            "policy": f"{tier['model']}/beam{tier.get('beam_size', 5)}",
+            "results": results,
+            "suggested": suggestion,
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
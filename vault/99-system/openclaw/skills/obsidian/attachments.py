@@ -0,0 +1,473 @@
+"""Content-addressed attachment store.
+
+The same photo or voice memo forwarded twice used to take its full size on
+disk twice. add_attachment() hashes a file (SHA-256) while streaming it to
+disk and keeps each distinct content once, as a blob in the store under the
+cache folder (which Syncthing ignores). The file a note embeds is a
+hardlink to its blob, so another copy costs a directory entry rather than
+its size. dedupe() does the same for attachments already
+in the vault. Hashes are remembered by (inode, mtime, size), so unchanged
+files are not read again.
+
+Hardlinked copies share one inode: a program rewriting one of them in place
+would change them all. Obsidian, Syncthing and these skills replace files
+(write a temp file, then rename), which gives that copy an inode of its own.
+Blobs are re-hashed when their mtime/size change, so an edited blob is
+dropped instead of being linked to more files. Only media and PDFs
+(DEDUPE_EXTENSIONS) are linked; notes, canvases and other files added here
+are written as files of their own. When the store is on another filesystem
+than the vault, new attachments are reflinked where the filesystem supports
+it (btrfs, XFS) and copied otherwise, and dedupe() refuses to run.
+"""
+
+import os
+import errno
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+
+from obsidian import VAULT_PATH, CACHE_PATH, get_attachment_path
+from vault_index import ATTACHMENT_EXTENSIONS
+
+STORE_DIR = os.environ.get("NAZAR_ATTACHMENT_STORE", os.path.join(CACHE_PATH, "attachments"))
+TABLE_PATH = os.path.join(STORE_DIR, "hashes.sqlite")
+# Serializes changes to the store (add_attachment, dedupe)
+STORE_LOCK = STORE_DIR + ".lock"
+
+# Linkable attachments: embedded files that nothing edits in place
+DEDUPE_EXTENSIONS = ATTACHMENT_EXTENSIONS - {'canvas'}
+# Read/write block size while hashing and copying
+BLOCK_SIZE = 1024 * 1024
+# Files hashed per commit during dedupe
+FILES_PER_COMMIT = 256
+# Linux FICLONE ioctl: share the source's extents (copy-on-write)
+FICLONE = 0x40049409
+
+SCHEMA = """
+-- Hash cache for vault attachments
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    ino INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT NOT NULL
+);
+-- Stamp of each blob when its content was last verified
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+CACHE_REL = os.path.relpath(CACHE_PATH, VAULT_PATH)
+
+
+def connect():
+    """Open the hash table, creating it on first use."""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    conn = sqlite3.connect(TABLE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+@contextmanager
+def _store_lock():
+    import fcntl
+
+    os.makedirs(os.path.dirname(STORE_LOCK), exist_ok=True)
+    with open(STORE_LOCK, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def blob_path(digest):
+    """Path of the blob holding the content with this SHA-256."""
+    return os.path.join(STORE_DIR, digest[:2], digest)
+
+
+def linkable(name):
+    """Whether a file name is an attachment dedupe may hardlink."""
+    return '.' in name and name.rsplit('.', 1)[-1].lower() in DEDUPE_EXTENSIONS
+
+
+def _hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def _stream_to(source, fd):
+    """Copy a path or binary file object into fd, hashing on the way."""
+    sha = hashlib.sha256()
+    size = 0
+    src = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+    try:
+        with open(fd, "wb", closefd=False) as out:
+            for block in iter(lambda: src.read(BLOCK_SIZE), b""):
+                sha.update(block)
+                out.write(block)
+                size += len(block)
+            out.flush()
+            os.fsync(out.fileno())
+    finally:
+        if src is not source:
+            src.close()
+    return sha.hexdigest(), size
+
+
+def _temp_in(directory, label):
+    """Create an empty temp file (umask permissions) in a directory."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f".{label}.{os.getpid()}.{threading.get_ident()}.tmp")
+    return path, os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+
+
+def _clone(src, dst_fd):
+    """Fill dst_fd with src's content: reflinked if possible, else copied."""
+    import fcntl
+    import shutil
+
+    with open(src, "rb") as f:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, f.fileno())
+            return "reflink"
+        except OSError:
+            with open(dst_fd, "wb", closefd=False) as out:
+                shutil.copyfileobj(f, out, BLOCK_SIZE)
+                out.flush()
+                os.fsync(out.fileno())
+            return "copy"
+
+
+def _place(blob, dest):
+    """
+    Create dest as a hardlink to blob (a reflink or copy across filesystems).
+
+    Raises:
+        FileExistsError: dest already exists (it is never replaced)
+
+    Returns:
+        "link", "reflink" or "copy"
+    """
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    try:
+        os.link(blob, dest)
+        return "link"
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.EMLINK, errno.EPERM):
+            raise
+    tmp, fd = _temp_in(os.path.dirname(dest), os.path.basename(dest))
+    try:
+        method = _clone(blob, fd)
+        os.close(fd)
+        fd = None
+        os.link(tmp, dest)
+    finally:
+        if fd is not None:
+            os.close(fd)
+        os.unlink(tmp)
+    return method
+
+
+def _cached_digest(conn, rel, st):
+    """SHA-256 of a vault file, from the cache when its stamp is unchanged."""
+    row = conn.execute("SELECT ino, mtime_ns, size, sha256 FROM files WHERE path = ?", (rel,)).fetchone()
+    if row and tuple(row[:3]) == (st.st_ino, st.st_mtime_ns, st.st_size):
+        return row[3], False
+    digest = _hash_file(os.path.join(VAULT_PATH, rel))
+    _remember(conn, rel, st, digest)
+    return digest, True
+
+
+def _remember(conn, rel, st, digest):
+    conn.execute("INSERT OR REPLACE INTO files (path, ino, mtime_ns, size, sha256) VALUES (?, ?, ?, ?, ?)",
+                 (rel, st.st_ino, st.st_mtime_ns, st.st_size, digest))
+
+
+def _blob_stat(conn, digest, dry_run=False):
+    """
+    Stat of a verified blob, or None when there is none.
+
+    A blob whose mtime/size changed since it was verified (edited in place
+    through one of its links) is re-hashed, and unlinked from the store if
+    its content no longer matches its name (a dry run only reports it as
+    unusable). Vault files keep their data.
+    """
+    path = blob_path(digest)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        conn.execute("DELETE FROM blobs WHERE sha256 = ?", (digest,))
+        return None
+    row = conn.execute("SELECT mtime_ns, size FROM blobs WHERE sha256 = ?", (digest,)).fetchone()
+    if row and tuple(row) == (st.st_mtime_ns, st.st_size):
+        return st
+    if _hash_file(path) != digest:
+        if not dry_run:
+            os.unlink(path)
+            conn.execute("DELETE FROM blobs WHERE sha256 = ?", (digest,))
+        return None
+    _verified(conn, digest, st)
+    return st
+
+
+def _verified(conn, digest, st):
+    conn.execute("INSERT OR REPLACE INTO blobs (sha256, mtime_ns, size) VALUES (?, ?, ?)",
+                 (digest, st.st_mtime_ns, st.st_size))
+
+
+def _free_name(dest, attempt):
+    """dest for the first attempt, then "name 1.ext", "name 2.ext"... (Obsidian's style)."""
+    if attempt == 0:
+        return dest
+    stem, ext = os.path.splitext(dest)
+    return f"{stem} {attempt}{ext}"
+
+
+def add_attachment(source, filename=None, note_path=None):
+    """
+    Store a file as a vault attachment, keeping each distinct content once.
+
+    The file is hashed while it is copied into the store. Its note-facing
+    name (under attachmentFolderPath) is a hardlink to the stored blob;
+    files that are not linkable() (notes, canvases, other documents) are
+    written as files of their own and not stored. If that name is taken by
+    the same content, the existing file is returned; if it is taken by
+    other content, " 1", " 2"... is appended to the name.
+
+    Args:
+        source: Path or binary file object to read
+        filename: Attachment file name (defaults to the source's name)
+        note_path: Note that embeds it (for a relative attachment folder),
+            absolute or relative to the vault
+
+    Returns:
+        Absolute path of the attachment in the vault
+    """
+    if filename is None:
+        if not isinstance(source, (str, os.PathLike)):
+            raise ValueError("filename is required when source is a file object")
+        filename = os.path.basename(source)
+    if note_path and not os.path.isabs(note_path):
+        note_path = os.path.join(VAULT_PATH, note_path)
+    dest = os.path.normpath(get_attachment_path(filename, note_path))
+
+    tmp, fd = _temp_in(STORE_DIR, "incoming")
+    try:
+        try:
+            digest, _ = _stream_to(source, fd)
+        finally:
+            os.close(fd)
+
+        with _store_lock(), closing(connect()) as conn, conn:
+            # Non-linkable files are placed from the temp file, outside the store
+            source = tmp
+            if linkable(filename):
+                source = blob_path(digest)
+                if _blob_stat(conn, digest) is None:
+                    os.makedirs(os.path.dirname(source), exist_ok=True)
+                    os.replace(tmp, source)
+                    _verified(conn, digest, os.stat(source))
+
+            attempt = 0
+            while True:
+                candidate = _free_name(dest, attempt)
+                try:
+                    _place(source, candidate)
+                    break
+                except FileExistsError:
+                    st = os.stat(candidate)
+                    rel = os.path.relpath(candidate, VAULT_PATH)
+                    if st.st_ino == os.stat(source).st_ino or _cached_digest(conn, rel, st)[0] == digest:
+                        break
+                attempt += 1
+            _remember(conn, os.path.relpath(candidate, VAULT_PATH), os.stat(candidate), digest)
+        return candidate
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+
+def _walk(rel_dir=''):
+    """(vault-relative path, stat) of every linkable attachment under a folder."""
+    stack = [rel_dir]
+    while stack:
+        current = stack.pop()
+        prefix = current + '/' if current else ''
+        try:
+            entries = os.scandir(os.path.join(VAULT_PATH, current))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                rel = prefix + entry.name
+                if entry.name.startswith('.') or rel == CACHE_REL:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel)
+                elif linkable(entry.name) and entry.is_file(follow_symlinks=False):
+                    yield rel, entry.stat(follow_symlinks=False)
+
+
+def _relink(full, blob, st):
+    """Replace a duplicate with a hardlink to blob, unless it changed since st."""
+    directory = os.path.dirname(full)
+    tmp = os.path.join(directory, f".{os.path.basename(full)}.{os.getpid()}.dedupe.tmp")
+    os.link(blob, tmp)
+    try:
+        now = os.lstat(full)
+        if (now.st_ino, now.st_mtime_ns, now.st_size) != (st.st_ino, st.st_mtime_ns, st.st_size):
+            return False
+        os.replace(tmp, full)
+        return True
+    finally:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+
+
+def _blob_files():
+    """Stats of every blob in the store."""
+    try:
+        shards = os.scandir(STORE_DIR)
+    except FileNotFoundError:
+        return
+    with shards:
+        for shard in shards:
+            if len(shard.name) != 2 or not shard.is_dir(follow_symlinks=False):
+                continue
+            with os.scandir(shard.path) as blobs:
+                for blob in blobs:
+                    if blob.is_file(follow_symlinks=False) and not blob.name.endswith('.tmp'):
+                        yield blob.path, blob.stat(follow_symlinks=False)
+
+
+def dedupe(folder=None, dry_run=False):
+    """
+    Replace duplicate attachments in the vault with hardlinks to one blob.
+
+    Every linkable attachment is hashed (unless its stamp is cached) and
+    linked into the store, so later add_attachment() calls find it. A file
+    whose content is already stored under another inode is replaced by a
+    hardlink to the blob. Blobs no vault file links to any more are removed.
+
+    Args:
+        folder: Only scan this folder (relative to vault)
+        dry_run: Report what would be linked without changing the vault or
+            the store (file hashes are still cached for the real run)
+
+    Returns:
+        Dict with files, bytes, hashed, linked (duplicates replaced),
+        reclaimed_bytes, stored (files added to the store) and
+        removed_blobs
+
+    Raises:
+        OSError: The store is on another filesystem than the vault
+    """
+    os.makedirs(STORE_DIR, exist_ok=True)
+    if os.stat(STORE_DIR).st_dev != os.stat(VAULT_PATH).st_dev:
+        raise OSError(errno.EXDEV, f"Attachment store {STORE_DIR} is not on the vault's filesystem; "
+                                   "set NAZAR_ATTACHMENT_STORE to a folder inside the vault's mount")
+
+    result = {"files": 0, "bytes": 0, "hashed": 0, "linked": 0, "reclaimed_bytes": 0,
+              "stored": 0, "removed_blobs": 0}
+    folder = os.path.normpath(folder).strip('/') if folder else ''
+    with _store_lock(), closing(connect()) as conn:
+        seen = set()
+        # Dry run: content that would have been stored by an earlier file
+        planned = {}
+        for rel, st in _walk(folder):
+            seen.add(rel)
+            result["files"] += 1
+            result["bytes"] += st.st_size
+            digest, hashed = _cached_digest(conn, rel, st)
+            result["hashed"] += hashed
+            if hashed and result["hashed"] % FILES_PER_COMMIT == 0:
+                conn.commit()
+
+            blob = blob_path(digest)
+            stored = _blob_stat(conn, digest, dry_run)
+            ino = stored.st_ino if stored else planned.get(digest)
+            if ino is None:
+                result["stored"] += 1
+                if dry_run:
+                    planned[digest] = st.st_ino
+                else:
+                    os.makedirs(os.path.dirname(blob), exist_ok=True)
+                    os.link(os.path.join(VAULT_PATH, rel), blob)
+                    _verified(conn, digest, st)
+                continue
+            if ino == st.st_ino:
+                continue
+
+            result["linked"] += 1
+            if st.st_nlink == 1:
+                result["reclaimed_bytes"] += st.st_size
+            if not dry_run and _relink(os.path.join(VAULT_PATH, rel), blob, st):
+                _remember(conn, rel, stored, digest)
+
+        prefix = folder + '/' if folder else ''
+        gone = [(path,) for (path,) in conn.execute(
+            "SELECT path FROM files WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+            if path not in seen]
+        conn.executemany("DELETE FROM files WHERE path = ?", gone)
+        conn.commit()
+
+        for path, st in list(_blob_files()):
+            if st.st_nlink == 1:
+                result["removed_blobs"] += 1
+                if not dry_run:
+                    os.unlink(path)
+                    conn.execute("DELETE FROM blobs WHERE sha256 = ?", (os.path.basename(path),))
+        conn.commit()
+    return result
+
+
+def store_stats():
+    """
+    Describe vault attachments and the store without hashing anything.
+
+    Returns:
+        Dict with store path, files, bytes (as listed), disk_bytes (one count
+        per inode), saved_bytes, duplicate_bytes (known duplicates not yet
+        linked), unhashed (files dedupe has not hashed yet), blobs and
+        unused_blobs (linked from no vault file)
+    """
+    files = total = 0
+    inodes = {}
+    by_digest = {}
+    unhashed = 0
+    with closing(connect()) as conn:
+        cached = {path: (tuple(stamp), digest) for path, *stamp, digest in
+                  conn.execute("SELECT path, ino, mtime_ns, size, sha256 FROM files")}
+    for rel, st in _walk():
+        files += 1
+        total += st.st_size
+        inodes[st.st_ino] = st.st_size
+        known = cached.get(rel)
+        if known and known[0] == (st.st_ino, st.st_mtime_ns, st.st_size):
+            by_digest.setdefault(known[1], {})[st.st_ino] = st.st_size
+        else:
+            unhashed += 1
+
+    blobs = unused = 0
+    for _, st in _blob_files():
+        blobs += 1
+        unused += st.st_nlink == 1
+    disk = sum(inodes.values())
+    return {
+        "store": STORE_DIR,
+        "files": files,
+        "bytes": total,
+        "disk_bytes": disk,
+        "saved_bytes": total - disk,
+        "duplicate_bytes": sum(sum(sizes.values()) - max(sizes.values()) for sizes in by_digest.values()),
+        "unhashed": unhashed,
+        "blobs": blobs,
+        "unused_blobs": unused,
+    }
@@ -0,0 +1,423 @@
+"""Vault change feed: a journal of what changed, numbered in order.
+
+Edits reach the vault from phones and desktops through Syncthing, so a
+consumer (the agent, an index, a sync job) can't know what changed since
+it last looked without re-listing and re-reading. The feed records every
+created, modified, deleted and renamed file under a monotonic sequence
+number. A consumer keeps the last number it saw as its cursor and asks
+only for what came after it.
+
+Events come from a watcher (`change-feed.py serve`) using inotify. A
+reconciliation pass compares the tree with the last known mtime/size of
+every file. It catches whatever inotify missed: changes made while the
+watcher was down, or a queue overflow. When no watcher is running,
+changes() reconciles before answering, so the feed is still correct, just
+slower. Hidden files and folders (.obsidian, Syncthing temp files) and the
+cache folder are not tracked.
+"""
+
+import os
+import sys
+import time
+import stat
+import sqlite3
+from contextlib import closing, contextmanager
+
+import timing
+from obsidian import VAULT_PATH, CACHE_PATH
+
+JOURNAL_PATH = os.environ.get("NAZAR_CHANGES_PATH", os.path.join(CACHE_PATH, "changes.sqlite"))
+# Held exclusively by the watcher for its lifetime
+WATCH_LOCK = JOURNAL_PATH + ".watch.lock"
+# Serializes reconciliation passes
+RECONCILE_LOCK = JOURNAL_PATH + ".reconcile.lock"
+
+# Seconds a path must be quiet before its change is recorded (coalesces
+# a create and the writes that follow into one event)
+SETTLE_SECONDS = 1.0
+# Seconds to wait for the IN_MOVED_TO half of a rename
+RENAME_WAIT = 0.5
+# Journal rows kept; a cursor older than the pruned ones gets reset=True
+KEEP_CHANGES = int(os.environ.get("NAZAR_CHANGES_KEEP", "50000"))
+
+SCHEMA = """
+-- Last known state of every tracked file
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+-- kind: created | modified | deleted | renamed (old_path -> path)
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL,
+    old_path TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def connect():
+    """Open the journal, creating it on first use."""
+    os.makedirs(os.path.dirname(JOURNAL_PATH), exist_ok=True)
+    conn = sqlite3.connect(JOURNAL_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+CACHE_REL = os.path.relpath(CACHE_PATH, VAULT_PATH)
+
+
+def tracked(rel):
+    """Whether a vault-relative path belongs in the feed."""
+    if rel == '.' or rel.startswith('..'):
+        return False
+    if rel == CACHE_REL or rel.startswith(CACHE_REL + '/'):
+        return False
+    return not any(part.startswith('.') for part in rel.split('/'))
+
+
+def _stamp(rel):
+    try:
+        st = os.stat(os.path.join(VAULT_PATH, rel))
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return (st.st_mtime_ns, st.st_size) if stat.S_ISREG(st.st_mode) else None
+
+
+def _record(conn, kind, path, old_path=None):
+    conn.execute("INSERT INTO changes (ts, kind, path, old_path) VALUES (?, ?, ?, ?)",
+                 (round(time.time(), 3), kind, path, old_path))
+
+
+def observe(conn, rel):
+    """
+    Compare one file with its last known state and journal the difference.
+
+    Returns:
+        Kind of change recorded, or None if the file is unchanged
+    """
+    current = _stamp(rel)
+    known = conn.execute("SELECT mtime_ns, size FROM files WHERE path = ?", (rel,)).fetchone()
+    if current is None:
+        if known is None:
+            return None
+        conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+        kind = "deleted"
+    elif known is None:
+        conn.execute("INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (rel, *current))
+        kind = "created"
+    elif tuple(known) != current:
+        conn.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (*current, rel))
+        kind = "modified"
+    else:
+        return None
+    _record(conn, kind, rel)
+    return kind
+
+
+def _known_under(conn, rel_dir):
+    prefix = rel_dir + '/'
+    return [p for (p,) in conn.execute(
+        "SELECT path FROM files WHERE substr(path, 1, ?) = ? ORDER BY path", (len(prefix), prefix))]
+
+
+def rename(conn, old, new, is_dir=False):
+    """
+    Journal a rename seen by the watcher (a directory renames every file below it).
+
+    Falls back to observing both paths when the old one isn't known.
+    """
+    pairs = [(path, new + path[len(old):]) for path in _known_under(conn, old)] if is_dir else [(old, new)]
+    for old_path, new_path in pairs:
+        current = _stamp(new_path)
+        known = conn.execute("SELECT 1 FROM files WHERE path = ?", (old_path,)).fetchone()
+        if current is None or known is None or not tracked(new_path):
+            observe(conn, old_path)
+            if tracked(new_path):
+                observe(conn, new_path)
+            continue
+        conn.execute("DELETE FROM files WHERE path = ?", (old_path,))
+        conn.execute("INSERT OR REPLACE INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (new_path, *current))
+        _record(conn, "renamed", new_path, old_path)
+    if is_dir:
+        # Files the journal didn't know about yet
+        for path, _ in _walk(new):
+            observe(conn, path)
+
+
+def _walk(rel_dir=''):
+    """(vault-relative path, (mtime_ns, size)) of every tracked file under a folder."""
+    stack = [rel_dir]
+    while stack:
+        current = stack.pop()
+        prefix = current + '/' if current else ''
+        try:
+            entries = os.scandir(os.path.join(VAULT_PATH, current))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                rel = prefix + entry.name
+                if entry.name.startswith('.') or rel == CACHE_REL:
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    yield rel, (st.st_mtime_ns, st.st_size)
+
+
+@contextmanager
+def _flock(path, mode):
+    import fcntl
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, mode)
+        yield
+
+
+def watcher_running():
+    """Whether a change-feed watcher currently holds the watch lock."""
+    import fcntl
+
+    try:
+        with _flock(WATCH_LOCK, fcntl.LOCK_SH | fcntl.LOCK_NB):
+            return False
+    except BlockingIOError:
+        return True
+
+
+@timing.timed("changes.reconcile")
+def reconcile(conn=None):
+    """
+    Journal every difference between the vault and the last known state.
+
+    Deleted and created files with identical mtime and size are recorded
+    as renames (Syncthing keeps both across a rename).
+
+    Args:
+        conn: Open journal connection to use (defaults to a new one)
+
+    Returns:
+        Dict of counts per kind of change
+    """
+    import fcntl
+
+    with _flock(RECONCILE_LOCK, fcntl.LOCK_EX):
+        if conn is None:
+            with closing(connect()) as own:
+                return _reconcile(own)
+        return _reconcile(conn)
+
+
+def _reconcile(conn):
+    stats = {"created": 0, "modified": 0, "deleted": 0, "renamed": 0}
+    with conn:
+        known = {path: (mtime_ns, size) for path, mtime_ns, size in
+                 conn.execute("SELECT path, mtime_ns, size FROM files")}
+        current = dict(_walk())
+
+        deleted = sorted(set(known) - set(current))
+        created = sorted(set(current) - set(known))
+        by_stamp = {}
+        for path in created:
+            by_stamp.setdefault(current[path], []).append(path)
+
+        for path in deleted:
+            candidates = by_stamp.get(known[path], [])
+            if len(candidates) == 1:
+                new = candidates.pop()
+                created.remove(new)
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                conn.execute("INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (new, *current[new]))
+                _record(conn, "renamed", new, path)
+                stats["renamed"] += 1
+            else:
+                conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                _record(conn, "deleted", path)
+                stats["deleted"] += 1
+        for path in created:
+            conn.execute("INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)", (path, *current[path]))
+            _record(conn, "created", path)
+            stats["created"] += 1
+        for path in sorted(set(current) & set(known)):
+            if current[path] != known[path]:
+                conn.execute("UPDATE files SET mtime_ns = ?, size = ? WHERE path = ?", (*current[path], path))
+                _record(conn, "modified", path)
+                stats["modified"] += 1
+        prune(conn)
+    return stats
+
+
+def prune(conn, keep=None):
+    """Drop journal rows beyond the newest `keep` (defaults to KEEP_CHANGES)."""
+    keep = KEEP_CHANGES if keep is None else keep
+    latest = _latest(conn)
+    cutoff = latest - keep
+    if cutoff > 0 and conn.execute("SELECT 1 FROM changes WHERE seq <= ? LIMIT 1", (cutoff,)).fetchone():
+        conn.execute("DELETE FROM changes WHERE seq <= ?", (cutoff,))
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('pruned_through', ?)", (str(cutoff),))
+
+
+def _latest(conn):
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+
+def changes(since=0, limit=1000, refresh=True):
+    """
+    Changes recorded after a cursor.
+
+    Args:
+        since: Cursor from an earlier call (0 for the whole journal, which
+            starts with every file as "created")
+        limit: Maximum number of changes
+        refresh: Reconcile with the vault first when no watcher is running
+
+    Returns:
+        Dict with cursor (pass it as `since` next time), more (True if
+        limit cut the list short), reset (True if the cursor is older than
+        the journal or from another journal: resync fully, then continue
+        from cursor) and changes: list of dicts (seq, ts, kind, path, old_path)
+    """
+    if refresh and not watcher_running():
+        reconcile()
+
+    with closing(connect()) as conn:
+        with conn:
+            latest = _latest(conn)
+            pruned = int(dict(conn.execute("SELECT key, value FROM meta")).get("pruned_through", 0))
+            if since > latest or (since < pruned):
+                return {"cursor": latest, "more": False, "reset": True, "changes": []}
+            rows = conn.execute(
+                "SELECT seq, ts, kind, path, old_path FROM changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (since, limit),
+            ).fetchall()
+    return {
+        "cursor": rows[-1][0] if rows else max(since, latest),
+        "more": len(rows) == limit,
+        "reset": False,
+        "changes": [dict(zip(("seq", "ts", "kind", "path", "old_path"), row)) for row in rows],
+    }
+
+
+def feed_stats():
+    """Journal location, size, latest sequence number and watcher state."""
+    with closing(connect()) as conn:
+        files = conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        rows = conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0]
+        latest = _latest(conn)
+    return {"journal": JOURNAL_PATH, "files": files, "changes": rows, "cursor": latest,
+            "watcher": watcher_running()}
+
+
+def watch(settle=SETTLE_SECONDS, poll=None, log=None):
+    """
+    Keep the journal current until interrupted.
+
+    Watches are set up before the startup reconciliation, so nothing
+    changed in between is lost. A queue overflow triggers a full
+    reconciliation; without inotify the vault is reconciled every
+    `poll` seconds.
+
+    Args:
+        settle: Seconds a path must be quiet before its change is recorded
+        poll: Reconcile every N seconds instead of using inotify (also
+            used automatically when inotify is unavailable)
+        log: Callable for progress messages (defaults to stderr)
+
+    Raises:
+        RuntimeError: Another watcher is already running
+    """
+    import fcntl
+
+    log = log or (lambda message: print(message, file=sys.stderr, flush=True))
+    os.makedirs(os.path.dirname(WATCH_LOCK), exist_ok=True)
+    with open(WATCH_LOCK, "a") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise RuntimeError(f"A change-feed watcher is already running ({WATCH_LOCK})")
+        _watch(settle, poll, log)
+
+
+def _watch(settle, poll, log):
+    import inotify
+
+    notifier = None
+    if poll is None:
+        try:
+            notifier = inotify.Inotify()
+            mask = (inotify.IN_CLOSE_WRITE | inotify.IN_CREATE | inotify.IN_DELETE
+                    | inotify.IN_MOVED_FROM | inotify.IN_MOVED_TO)
+            notifier.add_watch(VAULT_PATH, mask, recursive=True,
+                               skip=lambda d: not tracked(os.path.relpath(d, VAULT_PATH)))
+        except OSError as e:
+            log(f"inotify unavailable ({e}), reconciling every 30s")
+            notifier, poll = None, 30.0
+
+    conn = connect()
+    try:
+        log(f"Reconciled {VAULT_PATH}: {reconcile(conn)}")
+        log(f"Watching {VAULT_PATH} ({'inotify' if notifier else f'reconciling every {poll}s'})")
+        if not notifier:
+            while True:
+                time.sleep(poll)
+                reconcile(conn)
+
+        pending = {}   # path -> due time
+        moves = {}     # cookie -> (old path, is_dir, seen at)
+        while True:
+            now = time.monotonic()
+            waits = [due - now for due in pending.values()]
+            waits += [seen + RENAME_WAIT - now for _, _, seen in moves.values()]
+            events = notifier.read(max(0.0, min(waits)) if waits else None)
+
+            with conn:
+                for event in events:
+                    if event.path is None:
+                        log("inotify queue overflowed, reconciling")
+                        pending.clear()
+                        reconcile(conn)
+                        continue
+                    rel = os.path.relpath(event.path, VAULT_PATH)
+                    is_dir = bool(event.mask & inotify.IN_ISDIR)
+                    if event.mask & inotify.IN_MOVED_FROM:
+                        if tracked(rel):
+                            moves[event.cookie] = (rel, is_dir, time.monotonic())
+                    elif event.mask & inotify.IN_MOVED_TO and event.cookie in moves:
+                        old, _, _ = moves.pop(event.cookie)
+                        pending.pop(old, None)
+                        rename(conn, old, rel, is_dir)
+                    elif is_dir:
+                        if event.mask & inotify.IN_DELETE:
+                            for path in _known_under(conn, rel):
+                                observe(conn, path)
+                    elif tracked(rel):
+                        pending[rel] = time.monotonic() + settle
+
+                now = time.monotonic()
+                for cookie, (old, is_dir, seen) in list(moves.items()):
+                    if seen + RENAME_WAIT <= now:
+                        # Moved out of the vault (or into a hidden folder)
+                        del moves[cookie]
+                        for path in _known_under(conn, old) if is_dir else [old]:
+                            observe(conn, path)
+                for path, due in list(pending.items()):
+                    if due <= now:
+                        del pending[path]
+                        observe(conn, path)
+                prune(conn)
+    finally:
+        conn.close()
+        if notifier:
+            notifier.close()
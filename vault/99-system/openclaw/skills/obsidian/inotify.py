@@ -0,0 +1,158 @@
+"""Minimal Linux inotify binding (ctypes, standard library only).
+
+Used by services that react to vault changes (voice inbox watcher, change
+feed) instead of polling the tree. Watches can cover a whole directory tree;
+directories created later are watched as they appear.
+"""
+
+import os
+import errno
+import struct
+import select
+import ctypes
+import ctypes.util
+from collections import namedtuple
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+# Everything that changes which files exist or what they contain
+CHANGES = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+
+_HEADER = struct.Struct("iIII")
+
+# path is absolute; for IN_Q_OVERFLOW it is None (events were lost, rescan)
+Event = namedtuple("Event", "path mask cookie")
+
+_libc = None
+
+
+def _lib():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    return _libc
+
+
+class Inotify:
+    """
+    An inotify instance with recursive directory watches.
+
+    Raises OSError on platforms or containers without inotify, so callers
+    can fall back to polling.
+    """
+
+    def __init__(self):
+        try:
+            fd = _lib().inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f"inotify unavailable: {e}")
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self._paths = {}
+        self._recursive = {}
+
+    def add_watch(self, path, mask=CHANGES, recursive=False, skip=None):
+        """
+        Watch a directory (and, with recursive, every directory below it).
+
+        Args:
+            path: Directory to watch
+            mask: inotify event mask
+            recursive: Also watch subdirectories, including ones created later
+            skip: Optional callable(dir_path) -> True to leave a subtree unwatched
+
+        Returns:
+            List of directories watched
+        """
+        watched = []
+        for root, dirs, _ in os.walk(path) if recursive else [(path, [], [])]:
+            if skip and root != path and skip(root):
+                dirs[:] = []
+                continue
+            wd = _lib().inotify_add_watch(self.fd, os.fsencode(root), mask | (IN_CREATE if recursive else 0))
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                    continue
+                raise OSError(err, f"{os.strerror(err)}: {root}")
+            self._paths[wd] = root
+            self._recursive[wd] = (mask, skip) if recursive else None
+            watched.append(root)
+        return watched
+
+    def read(self, timeout=None):
+        """
+        Wait for events.
+
+        Args:
+            timeout: Seconds to wait (None blocks, 0 polls)
+
+        Returns:
+            List of Event; empty on timeout. Files already inside a newly
+            created directory are reported as IN_CREATE events.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _HEADER.unpack_from(data, offset)
+            offset += _HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(Event(None, mask, cookie))
+                continue
+            directory = self._paths.get(wd)
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                self._recursive.pop(wd, None)
+                continue
+            if directory is None:
+                continue
+            path = os.path.join(directory, os.fsdecode(name)) if name else directory
+            events.append(Event(path, mask, cookie))
+
+            recursive = self._recursive.get(wd)
+            if recursive and mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                mask_, skip = recursive
+                if not (skip and skip(path)):
+                    for new_dir in self.add_watch(path, mask_, recursive=True, skip=skip):
+                        for entry in os.scandir(new_dir):
+                            if entry.is_file(follow_symlinks=False):
+                                events.append(Event(entry.path, IN_CREATE, 0))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
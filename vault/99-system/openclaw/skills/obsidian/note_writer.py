@@ -0,0 +1,224 @@
+"""Concurrency-safe note writes.
+
+- note_lock(): per-note lock, a thread lock plus an flock on a lock file
+  under the cache dir, so threads and processes (skill server, CLIs,
+  watchers) serialize their writes to the same note.
+- write_atomic(): whole-file writes go to a hidden temp file in the same
+  directory and are renamed into place. Obsidian and Syncthing never see a
+  half-written note, and the temp name matches the `*.tmp` .stignore rule.
+- append(): queued appends to one note are coalesced. Whoever takes the
+  lock writes every pending entry in one fsync'd write (group commit). The
+  batch goes to a write-ahead journal first, so a crash mid-write is
+  repaired on the next append instead of leaving a torn entry. The record
+  remembers the note's inode and the bytes before the append; if the note
+  was replaced or edited since (Syncthing, Obsidian), the batch is appended
+  at the current end unless the note already holds it, and nothing is
+  truncated.
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+
+from obsidian import CACHE_PATH
+
+LOCK_DIR = os.path.join(CACHE_PATH, "locks")
+JOURNAL_DIR = os.path.join(CACHE_PATH, "journal")
+
+_registry_lock = threading.Lock()
+_thread_locks = {}
+_pending = {}
+
+
+def _key(path):
+    return hashlib.sha1(os.path.abspath(path).encode()).hexdigest()
+
+
+def _thread_lock(path):
+    with _registry_lock:
+        return _thread_locks.setdefault(os.path.abspath(path), threading.Lock())
+
+
+@contextmanager
+def note_lock(path):
+    """Hold the exclusive write lock for a note (threads and processes)."""
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with _thread_lock(path):
+        with open(os.path.join(LOCK_DIR, _key(path) + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, text):
+    """
+    Replace a file's contents atomically (temp file + fsync + rename).
+
+    Call with note_lock(path) held when the new text depends on the old.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    _fsync_dir(directory)
+
+
+# Bytes before the append point hashed into a journal record's identity
+IDENTITY_BYTES = 64
+
+
+def _journal_path(path):
+    return os.path.join(JOURNAL_DIR, _key(path) + ".json")
+
+
+def _identity(path, size):
+    """
+    Inode and hash of the bytes just before offset size, or None when the
+    note is missing or shorter than size. Tells whether a note is still the
+    file a journal record was written against.
+    """
+    start = max(size - IDENTITY_BYTES, 0)
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            before = f.read(size - start)
+            ino = os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return None
+    if len(before) != size - start:
+        return None
+    return [ino, hashlib.sha1(before).hexdigest()]
+
+
+def _apply(path, data, size_before):
+    """Append data at size_before, truncating any torn tail from an earlier attempt."""
+    with open(path, "ab") as f:
+        if f.tell() != size_before:
+            f.truncate(size_before)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def recover(path):
+    """
+    Finish or repair an append interrupted by a crash (call with the lock held).
+
+    A torn append is truncated and rewritten only while the note is the
+    file the record was written against, with nothing but (part of) the
+    batch after the append point. A note changed since then keeps its
+    content; the batch is appended at its end unless it is already there.
+
+    Returns:
+        True if a journal record was replayed
+    """
+    journal = _journal_path(path)
+    try:
+        with open(journal, "r", encoding="utf-8") as f:
+            record = json.load(f)
+    except FileNotFoundError:
+        return False
+    except ValueError:
+        # The journal itself was torn, so the note write never started
+        os.unlink(journal)
+        return False
+
+    data = record["data"].encode("utf-8")
+    size_before = record["size_before"]
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except FileNotFoundError:
+        content = b""
+
+    replayed = False
+    unchanged = record.get("identity", False) == _identity(path, size_before)
+    tail = content[size_before:]
+    if unchanged and data.startswith(tail):
+        if tail != data:
+            _apply(path, data, size_before)
+            replayed = True
+    elif data not in content:
+        _apply(path, data, len(content))
+        replayed = True
+
+    os.unlink(journal)
+    return replayed
+
+
+def append(path, text):
+    """
+    Append text to a note, coalescing with concurrent appends to it.
+
+    Returns once the text is durably on disk (possibly written by another
+    thread as part of its batch).
+
+    Returns:
+        True if this call performed the write, False if another thread's
+        batch carried the text
+    """
+    path = os.path.abspath(path)
+    entry = {"text": text, "done": False, "error": None}
+    with _registry_lock:
+        _pending.setdefault(path, []).append(entry)
+
+    wrote = False
+    with note_lock(path):
+        if not entry["done"]:
+            wrote = True
+            with _registry_lock:
+                batch = _pending.pop(path, [])
+            try:
+                _write_batch(path, "".join(e["text"] for e in batch))
+            except BaseException as e:
+                for queued in batch:
+                    queued["error"] = e
+                raise
+            finally:
+                for queued in batch:
+                    queued["done"] = True
+
+    if entry["error"] is not None:
+        raise entry["error"]
+    return wrote
+
+
+def _write_batch(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    os.makedirs(JOURNAL_DIR, exist_ok=True)
+    recover(path)
+
+    size_before = os.path.getsize(path) if os.path.exists(path) else 0
+    record = {"path": path, "size_before": size_before, "identity": _identity(path, size_before), "data": text}
+    journal = _journal_path(path)
+    with open(journal, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+
+    _apply(path, text.encode("utf-8"), size_before)
+    os.unlink(journal)
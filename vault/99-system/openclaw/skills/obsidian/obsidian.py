@@ -1,36 +1,110 @@
 """Obsidian vault utilities for file operations and structure awareness."""
 
 import os
+import re
 import json
-from datetime import datetime
-from pathlib import Path
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import datetime, date as date_type, timedelta
+
+import timing
 
 VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
 CONFIG_PATH = f"{VAULT_PATH}/.obsidian"
+# Device-local caches and indexes (excluded from Syncthing via .stignore)
+CACHE_PATH = os.environ.get("NAZAR_CACHE_DIR", f"{VAULT_PATH}/99-system/openclaw/cache")
 
-def get_vault_config():
-    """Load Obsidian configuration files."""
-    config = {}
+class VaultConfig:
+    """
+    Obsidian configuration cached in memory.
 
-    # App config
-    app_config_path = f"{CONFIG_PATH}/app.json"
-    if os.path.exists(app_config_path):
-        with open(app_config_path, 'r') as f:
-            config['app'] = json.load(f)
+    The JSON files under .obsidian/ are parsed once and re-read only when
+    one of them changes (by mtime/size) or reload() is called, so repeated
+    helper calls cost a few stat() calls instead of three JSON parses.
+    """
 
-    # Daily notes config
-    daily_config_path = f"{CONFIG_PATH}/daily-notes.json"
-    if os.path.exists(daily_config_path):
-        with open(daily_config_path, 'r') as f:
-            config['daily_notes'] = json.load(f)
+    FILES = {
+        'app': 'app.json',
+        'daily_notes': 'daily-notes.json',
+        'core_plugins': 'core-plugins.json',
+    }
+
+    def __init__(self, config_path=CONFIG_PATH):
+        self.config_path = config_path
+        self._data = {}
+        self._stamps = None
+
+    def _current_stamps(self):
+        stamps = []
+        for filename in self.FILES.values():
+            try:
+                st = os.stat(f"{self.config_path}/{filename}")
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return stamps
+
+    def reload(self):
+        """Re-read every config file from disk."""
+        with timing.span("obsidian.config_load"):
+            stamps = self._current_stamps()
+            data = {}
+            for key, filename in self.FILES.items():
+                path = f"{self.config_path}/{filename}"
+                if os.path.exists(path):
+                    with open(path, 'r') as f:
+                        data[key] = json.load(f)
+        self._data = data
+        self._stamps = stamps
+        return self
+
+    def refresh(self):
+        """Reload only if a config file changed since the last read."""
+        if self._current_stamps() != self._stamps:
+            self.reload()
+        return self
+
+    def as_dict(self):
+        """Raw config, keyed by app / daily_notes / core_plugins."""
+        return dict(self._data)
+
+    @property
+    def daily_notes_folder(self):
+        """Daily notes folder relative to the vault, without trailing slash."""
+        return self._data.get('daily_notes', {}).get('folder', '01-daily-journey/').rstrip('/')
+
+    @property
+    def new_file_folder(self):
+        """Default folder for new notes."""
+        return self._data.get('app', {}).get('newFileFolderPath', '00-inbox/')
+
+    @property
+    def attachment_folder(self):
+        """Attachment folder (a './' prefix means relative to the note)."""
+        return self._data.get('app', {}).get('attachmentFolderPath', './attachments')
+
+    @property
+    def enabled_plugins(self):
+        """Names of enabled core plugins."""
+        return [name for name, enabled in self._data.get('core_plugins', {}).items() if enabled]
+
+_config = VaultConfig()
+
+def get_config(reload=False):
+    """
+    Get the cached vault configuration.
 
-    # Core plugins
-    plugins_path = f"{CONFIG_PATH}/core-plugins.json"
-    if os.path.exists(plugins_path):
-        with open(plugins_path, 'r') as f:
-            config['core_plugins'] = json.load(f)
+    Args:
+        reload: Force a re-read instead of the mtime check
 
-    return config
+    Returns:
+        VaultConfig instance
+    """
+    return _config.reload() if reload else _config.refresh()
+
+def get_vault_config():
+    """Load Obsidian configuration files."""
+    return get_config().as_dict()
 
 def get_daily_note_path(date=None):
     """
@@ -45,10 +119,7 @@ def get_daily_note_path(date=None):
     if date is None:
         date = datetime.now()
 
-    config = get_vault_config()
-    daily_config = config.get('daily_notes', {})
-
-    folder = daily_config.get('folder', '01-daily-journey/').rstrip('/')
+    folder = get_config().daily_notes_folder
 
     # Format: YYYY/MM-MMMM/YYYY-MM-DD
     year = date.strftime('%Y')
@@ -61,6 +132,17 @@ def ensure_folder(path):
     """Create folder if it doesn't exist."""
     os.makedirs(os.path.dirname(path), exist_ok=True)
 
+@timing.timed("obsidian.index_note")
+def _index_note(path):
+    """Refresh the vault index entry for a note we just wrote (best effort)."""
+    import sqlite3
+    try:
+        import vault_index
+        vault_index.update_note(path)
+    except (OSError, sqlite3.Error):
+        pass
+
+@timing.timed("obsidian.create_daily_note")
 def create_daily_note(content, date=None, template=None):
     """
     Create or overwrite a daily note.
@@ -80,11 +162,21 @@ def create_daily_note(content, date=None, template=None):
     if template:
         full_content = template + "\n\n" + content
 
-    with open(note_path, 'w', encoding='utf-8') as f:
-        f.write(full_content)
+    from note_writer import note_lock, recover, write_atomic
+    with note_lock(note_path):
+        # Settle a crashed append first so it can't replay into the new note
+        recover(note_path)
+        write_atomic(note_path, full_content)
+
+    _index_note(note_path)
 
     return note_path
 
+def format_entry(content, timestamp):
+    """Format a daily-note entry with its timestamp separator."""
+    return f"\n\n---\n\n**[{timestamp}]**\n\n{content}"
+
+@timing.timed("obsidian.append")
 def append_to_daily_note(content, date=None, timestamp=None):
     """
     Append content to a daily note.
@@ -103,14 +195,120 @@ def append_to_daily_note(content, date=None, timestamp=None):
     if timestamp is None:
         timestamp = datetime.now().strftime('%H:%M')
 
-    # Format entry with timestamp
-    entry = f"\n\n---\n\n**[{timestamp}]**\n\n{content}"
+    import note_writer
+    # Only the thread that wrote a coalesced batch re-indexes the note
+    if note_writer.append(note_path, format_entry(content, timestamp)):
+        _index_note(note_path)
+
+    return note_path
+
+@timing.timed("obsidian.append_entries")
+def append_entries_to_daily_note(entries, date=None):
+    """
+    Append several timestamped entries to a daily note in a single write.
+
+    Args:
+        entries: Iterable of (timestamp, content) tuples, in note order
+        date: datetime object (defaults to today)
+
+    Returns:
+        Path to the updated file
+    """
+    note_path = get_daily_note_path(date)
+    ensure_folder(note_path)
+
+    block = "".join(format_entry(content, timestamp) for timestamp, content in entries)
 
-    with open(note_path, 'a', encoding='utf-8') as f:
-        f.write(entry)
+    import note_writer
+    # Only the thread that wrote a coalesced batch re-indexes the note
+    if note_writer.append(note_path, block):
+        _index_note(note_path)
 
     return note_path
 
+IN_PROGRESS_MARK = "*(transcribing…)*"
+
+def _entry_pattern(entry_id):
+    return re.compile(
+        r"\*\*\[(?P<ts>[^\]]*)\]\*\* <!-- in-progress:" + re.escape(entry_id) + r" -->\n\n"
+        r".*?<!-- end:" + re.escape(entry_id) + r" -->",
+        re.S,
+    )
+
+def _in_progress_entry(content, timestamp, entry_id):
+    body = f"{content}\n\n{IN_PROGRESS_MARK}" if content else IN_PROGRESS_MARK
+    return f"**[{timestamp}]** <!-- in-progress:{entry_id} -->\n\n{body}\n<!-- end:{entry_id} -->"
+
+@timing.timed("obsidian.start_entry")
+def start_daily_entry(content="", date=None, timestamp=None):
+    """
+    Append an in-progress entry that can be filled in as content arrives.
+
+    The entry is written immediately with hidden markers and a visible
+    in-progress note, so it shows up in Obsidian right away. Use
+    update_daily_entry() to replace its body and to finalize it.
+
+    Args:
+        content: Initial body (may be empty)
+        date: datetime object (defaults to today)
+        timestamp: Optional timestamp string (defaults to current time)
+
+    Returns:
+        Tuple of (note_path, entry_id)
+    """
+    if timestamp is None:
+        timestamp = datetime.now().strftime('%H:%M')
+
+    note_path = get_daily_note_path(date)
+    ensure_folder(note_path)
+
+    import uuid
+    entry_id = uuid.uuid4().hex[:12]
+    import note_writer
+    if note_writer.append(note_path, "\n\n---\n\n" + _in_progress_entry(content, timestamp, entry_id)):
+        _index_note(note_path)
+
+    return note_path, entry_id
+
+@timing.timed("obsidian.update_entry")
+def update_daily_entry(note_path, entry_id, content, final=False):
+    """
+    Replace the body of an in-progress entry.
+
+    Args:
+        note_path: Path returned by start_daily_entry()
+        entry_id: Entry id returned by start_daily_entry()
+        content: Full body text so far
+        final: Drop the in-progress markers, leaving a normal entry
+
+    Returns:
+        True if the entry was found and updated
+    """
+    from note_writer import note_lock, recover, write_atomic
+
+    # Read-modify-write under the note lock so concurrent appends aren't lost
+    with note_lock(note_path):
+        recover(note_path)
+        with open(note_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+        match = _entry_pattern(entry_id).search(text)
+        if match is None:
+            return False
+
+        timestamp = match.group('ts')
+        if final:
+            replacement = f"**[{timestamp}]**\n\n{content}"
+        else:
+            replacement = _in_progress_entry(content, timestamp, entry_id)
+
+        write_atomic(note_path, text[:match.start()] + replacement + text[match.end():])
+
+    _index_note(note_path)
+
+    return True
+
+@timing.timed("obsidian.create_note")
 def create_note(title, content, folder=None, frontmatter=None):
     """
     Create a new note in the vault.
@@ -124,11 +322,8 @@ def create_note(title, content, folder=None, frontmatter=None):
     Returns:
         Path to the created file
     """
-    config = get_vault_config()
-    app_config = config.get('app', {})
-
     if folder is None:
-        folder = app_config.get('newFileFolderPath', '00-inbox/')
+        folder = get_config().new_file_folder
 
     # Sanitize filename
     safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
@@ -150,8 +345,13 @@ def create_note(title, content, folder=None, frontmatter=None):
 
     full_content += content
 
-    with open(note_path, 'w', encoding='utf-8') as f:
-        f.write(full_content)
+    from note_writer import note_lock, recover, write_atomic
+    with note_lock(note_path):
+        # Settle a crashed append first so it can't replay into the new note
+        recover(note_path)
+        write_atomic(note_path, full_content)
+
+    _index_note(note_path)
 
     return note_path
 
@@ -162,14 +362,240 @@ def read_note(path):
     if not os.path.exists(full_path):
         return None
 
-    with open(full_path, 'r', encoding='utf-8') as f:
-        return f.read()
+    with timing.span("obsidian.read") as attrs:
+        with open(full_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        attrs["bytes"] = len(text)
+    return text
 
 def note_exists(path):
     """Check if a note exists."""
     full_path = path if path.startswith(VAULT_PATH) else f"{VAULT_PATH}/{path}"
     return os.path.exists(full_path)
 
+# Line-range reads map files at least this large instead of reading them
+MMAP_MIN_BYTES = 64 * 1024
+# Outlines kept in memory (path -> (mtime, size), rows), least recently used evicted
+OUTLINE_CACHE_SIZE = 256
+
+_outlines = OrderedDict()
+_outlines_lock = threading.Lock()
+
+def _outline(path, reindex=False):
+    """
+    Full path, size and outline of a note from the vault index.
+
+    The outline is re-indexed when the note changed since it was indexed
+    (by mtime/size) or reindex is set, and kept in memory until it changes.
+
+    Returns:
+        Tuple of (full path, size, outline rows), or None if the note doesn't exist
+    """
+    import vault_index
+
+    full_path = path if path.startswith(VAULT_PATH) else f"{VAULT_PATH}/{path}"
+    try:
+        st = os.stat(full_path)
+    except FileNotFoundError:
+        with _outlines_lock:
+            _outlines.pop(full_path, None)
+        return None
+    stamp = (st.st_mtime, st.st_size)
+
+    with _outlines_lock:
+        cached = None if reindex else _outlines.get(full_path)
+    if cached is None or cached[0] != stamp:
+        cached = None if reindex else vault_index.outline(full_path)
+        if cached is None or cached[0] != stamp:
+            vault_index.update_note(full_path)
+            cached = vault_index.outline(full_path) or (stamp, [])
+    with _outlines_lock:
+        _outlines[full_path] = cached
+        _outlines.move_to_end(full_path)
+        while len(_outlines) > OUTLINE_CACHE_SIZE:
+            _outlines.popitem(last=False)
+    return full_path, st.st_size, cached[1]
+
+def _read_span(full_path, start, end=None):
+    """Bytes start..end of a file, read by seeking (no full read)."""
+    with open(full_path, 'rb') as f:
+        f.seek(start)
+        return f.read() if end is None else f.read(max(0, end - start))
+
+def _outline_span(path, select):
+    """
+    Read the part of a note that select(outline) picks as (start, end) offsets.
+
+    The bytes at start must be the heading or entry line the outline
+    recorded; if the note changed under us, it is re-indexed and read again.
+
+    Returns:
+        Text, or None if the note doesn't exist or select returned None
+    """
+    for reindex in (False, True):
+        found = _outline(path, reindex)
+        if found is None:
+            return None
+        full_path, _, rows = found
+        span = select(rows)
+        if span is None:
+            return None
+        raw = _read_span(full_path, *span)
+        if raw[:1] in (b'#', b'*'):
+            return raw.decode('utf-8', errors='replace')
+    return None
+
+def get_outline(path):
+    """
+    Headings and daily-note entries of a note, from the vault index.
+
+    Returns:
+        List of dicts (level, title, line, offset); daily-note entries have
+        level 7 and their "HH:MM" as title. None if the note doesn't exist.
+    """
+    found = _outline(path)
+    if found is None:
+        return None
+    return [{"level": level, "title": title, "line": line, "offset": offset}
+            for offset, line, level, title in found[2]]
+
+def _heading_key(heading):
+    return heading.strip().lstrip('#').strip().strip('*[]').strip().lower()
+
+def read_section(path, heading):
+    """
+    Read one section of a note without reading the rest of it.
+
+    The section runs from its heading to the next heading of the same or a
+    higher level (or, for a daily-note entry, to the next entry).
+
+    Args:
+        path: Note path (relative to vault or absolute)
+        heading: Heading text, e.g. "Tasks" or "## Tasks" (first match,
+            case-insensitive), or an entry time such as "14:30"
+
+    Returns:
+        Section text including its heading line, or None if the note or
+        heading doesn't exist
+    """
+    key = _heading_key(heading)
+
+    def select(rows):
+        for i, (offset, _, level, title) in enumerate(rows):
+            if _heading_key(title) == key:
+                end = next((o for o, _, l, _ in rows[i + 1:] if l <= level), None)
+                return offset, end
+        return None
+
+    with timing.span("obsidian.read_section") as attrs:
+        text = _outline_span(path, select)
+        attrs["bytes"] = len(text) if text else 0
+    if text is None:
+        return None
+    # Drop the "---" separating it from the next entry
+    text = text.rstrip()
+    while text.endswith('\n---'):
+        text = text[:-4].rstrip()
+    return text
+
+def read_entries(path, last=None):
+    """
+    Read the timestamped entries of a daily note, optionally only the last N.
+
+    Seeks to the N-th last "**[HH:MM]**" header, so the cost depends on
+    the entries returned rather than the size of the note.
+
+    Args:
+        path: Daily note path (relative to vault or absolute)
+        last: Number of entries from the end (None for all)
+
+    Returns:
+        List of DailyEntry in note order, or None if the note doesn't exist
+    """
+    import vault_index
+
+    def select(rows):
+        entries = [offset for offset, _, level, _ in rows if level == vault_index.ENTRY_LEVEL]
+        if not entries:
+            return None
+        return entries[-min(last, len(entries)) if last else 0], None
+
+    with timing.span("obsidian.read_entries") as attrs:
+        text = _outline_span(path, select)
+        attrs["bytes"] = len(text) if text else 0
+    if text is None:
+        return None if not note_exists(path) else []
+
+    name = os.path.basename(path)[:-3]
+    try:
+        day = datetime.strptime(name, '%Y-%m-%d').date()
+    except ValueError:
+        day = None
+    full_path = path if path.startswith(VAULT_PATH) else f"{VAULT_PATH}/{path}"
+    return parse_daily_entries(text, day, full_path)
+
+def read_lines(path, start, end=None):
+    """
+    Read a range of lines of a note.
+
+    Starts scanning from the nearest indexed heading at or before the first
+    line; notes of MMAP_MIN_BYTES or more are memory-mapped, not read whole.
+
+    Args:
+        path: Note path (relative to vault or absolute)
+        start: First line (1-based)
+        end: Last line, inclusive (defaults to the end of the note)
+
+    Returns:
+        Text of the lines, or None if the note doesn't exist
+    """
+    import mmap
+
+    found = _outline(path)
+    if found is None:
+        return None
+    full_path, size, rows = found
+    offset, line = 0, 1
+    for row_offset, row_line, _, _ in rows:
+        if row_line > start:
+            break
+        offset, line = row_offset, row_line
+
+    with timing.span("obsidian.read_lines") as attrs, open(full_path, 'rb') as f:
+        if size >= MMAP_MIN_BYTES:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            data = f.read()
+        try:
+            while line < start and offset < len(data):
+                offset = data.find(b'\n', offset) + 1 or len(data)
+                line += 1
+            stop = offset
+            while (end is None or line <= end) and stop < len(data):
+                stop = data.find(b'\n', stop) + 1 or len(data)
+                line += 1
+            raw = data[offset:stop]
+        finally:
+            if size >= MMAP_MIN_BYTES:
+                data.close()
+        attrs["bytes"] = len(raw)
+    return raw.decode('utf-8', errors='replace')
+
+def read_bytes(path, start, end=None):
+    """
+    Read a byte range of a note (decoded as UTF-8, split characters replaced).
+
+    Returns:
+        Text, or None if the note doesn't exist
+    """
+    full_path = path if path.startswith(VAULT_PATH) else f"{VAULT_PATH}/{path}"
+    if not os.path.exists(full_path):
+        return None
+    with timing.span("obsidian.read_bytes") as attrs:
+        raw = _read_span(full_path, start, end)
+        attrs["bytes"] = len(raw)
+    return raw.decode('utf-8', errors='replace')
+
 def get_attachment_path(filename, note_path=None):
     """
     Get path for an attachment.
@@ -181,10 +607,7 @@ def get_attachment_path(filename, note_path=None):
     Returns:
         Full path for the attachment
     """
-    config = get_vault_config()
-    app_config = config.get('app', {})
-
-    attachment_folder = app_config.get('attachmentFolderPath', './attachments')
+    attachment_folder = get_config().attachment_folder
 
     if attachment_folder.startswith('./') and note_path:
         # Relative to note location
@@ -195,39 +618,291 @@ def get_attachment_path(filename, note_path=None):
         # Absolute from vault root
         return f"{VAULT_PATH}/{attachment_folder}/{filename}"
 
+@timing.timed("obsidian.add_attachment")
+def add_attachment(source, filename=None, note_path=None):
+    """
+    Store an attachment once per distinct content (see attachments.py).
+
+    Args:
+        source: Path or binary file object to read
+        filename: Attachment file name (defaults to the source's name)
+        note_path: Note that embeds it (for a relative attachment folder)
+
+    Returns:
+        Absolute path of the attachment, a hardlink to the stored blob
+    """
+    import attachments
+
+    return attachments.add_attachment(source, filename, note_path)
+
+@timing.timed("obsidian.list_daily_notes")
 def list_daily_notes(year=None, month=None):
     """
     List daily notes, optionally filtered by year/month.
 
+    Served from the vault index (see vault_index.py); only directories whose
+    mtime changed since the last call are re-listed.
+
     Returns:
         List of note paths
     """
-    config = get_vault_config()
-    daily_config = config.get('daily_notes', {})
-    folder = daily_config.get('folder', '01-daily-journey/').rstrip('/')
+    import vault_index
 
-    base_path = f"{VAULT_PATH}/{folder}"
-    notes = []
+    folder = get_config().daily_notes_folder
 
     if year and month:
         # Specific month
         month_name = datetime(int(year), int(month), 1).strftime('%m-%B')
-        month_path = f"{base_path}/{year}/{month_name}"
-        if os.path.exists(month_path):
-            notes = [f"{month_path}/{f}" for f in os.listdir(month_path) if f.endswith('.md')]
+        folder = f"{folder}/{year}/{month_name}"
     elif year:
         # All months in year
-        year_path = f"{base_path}/{year}"
-        if os.path.exists(year_path):
-            for month_folder in os.listdir(year_path):
-                month_path = f"{year_path}/{month_folder}"
-                if os.path.isdir(month_path):
-                    notes.extend([f"{month_path}/{f}" for f in os.listdir(month_path) if f.endswith('.md')])
-    else:
-        # All notes
-        for root, dirs, files in os.walk(base_path):
-            for file in files:
-                if file.endswith('.md'):
-                    notes.append(os.path.join(root, file))
+        folder = f"{folder}/{year}"
+
+    if not os.path.isdir(f"{VAULT_PATH}/{folder}"):
+        return []
+
+    vault_index.refresh(folder, deep=False)
+    return [f"{VAULT_PATH}/{note['path']}" for note in vault_index.query_notes(folder=folder)]
+
+# "**[HH:MM]**" entry header, optionally still marked in progress
+ENTRY_HEADER = re.compile(r'^\*\*\[(\d{1,2}:\d{2})\]\*\*(?: <!-- in-progress:(\w+) -->)?[ \t]*$', re.M)
+ENTRY_SEPARATOR = re.compile(r'(?:\s*\n---\s*)+$')
+
+# One timestamped entry of a daily note; time is None for text before the first entry
+DailyEntry = namedtuple("DailyEntry", "date time text path in_progress")
+
+def parse_daily_entries(text, date=None, path=None, include_preamble=False):
+    """
+    Split a daily note into its timestamped entries.
+
+    Args:
+        text: Note content
+        date: Date of the note (stored on each entry)
+        path: Note path (stored on each entry)
+        include_preamble: Also return text before the first entry (time=None)
+
+    Returns:
+        List of DailyEntry in note order
+    """
+    entries = []
+    headers = list(ENTRY_HEADER.finditer(text))
+    if include_preamble:
+        preamble = ENTRY_SEPARATOR.sub('', text[:headers[0].start()] if headers else text).strip()
+        if preamble:
+            entries.append(DailyEntry(date, None, preamble, path, False))
+
+    for i, match in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        body = ENTRY_SEPARATOR.sub('', text[match.end():end])
+        entry_id = match.group(2)
+        if entry_id:
+            body = body.replace(f"<!-- end:{entry_id} -->", "").replace(IN_PROGRESS_MARK, "")
+        entries.append(DailyEntry(date, match.group(1), body.strip(), path, bool(entry_id)))
+    return entries
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date_type):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def period_bounds(period, date=None):
+    """
+    First and last day of the week (Monday to Sunday), month or year containing a date.
+
+    Args:
+        period: 'day', 'week', 'month' or 'year'
+        date: date, datetime or 'YYYY-MM-DD' (defaults to today)
+
+    Returns:
+        Tuple of (start, end) dates, inclusive
+    """
+    day = _as_date(date) if date else datetime.now().date()
+    if period == 'day':
+        return day, day
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'month':
+        start = day.replace(day=1)
+        following = (start + timedelta(days=32)).replace(day=1)
+        return start, following - timedelta(days=1)
+    if period == 'year':
+        return day.replace(month=1, day=1), day.replace(month=12, day=31)
+    raise ValueError(f"Unknown period: {period}")
+
+def _read_daily_entries(day, include_preamble):
+    path = get_daily_note_path(datetime(day.year, day.month, day.day))
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    except FileNotFoundError:
+        return []
+    return parse_daily_entries(text, day, path, include_preamble)
+
+def read_daily_range(start, end=None, workers=8, include_preamble=False):
+    """
+    Stream the entries of every daily note from start to end, in order.
+
+    Note paths are computed from the dates (no directory walk), and up to
+    `workers` notes are read ahead concurrently, so cost grows with the
+    days in the range rather than the size of the vault. Missing days
+    are skipped.
+
+    Args:
+        start: First day (date, datetime or 'YYYY-MM-DD')
+        end: Last day, inclusive (defaults to start)
+        workers: Notes read in parallel
+        include_preamble: Also yield text before a note's first entry (time=None)
+
+    Yields:
+        DailyEntry(date, time, text, path, in_progress)
+    """
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    start = _as_date(start)
+    end = _as_date(end) if end else start
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Bounded read-ahead: at most `workers` notes in flight or buffered
+        pending = deque()
+        for day in days:
+            pending.append(pool.submit(_read_daily_entries, day, include_preamble))
+            if len(pending) >= workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+@timing.timed("obsidian.search")
+def search_notes(query, folder=None, start=None, end=None, limit=20, refresh=True):
+    """
+    Full-text search across the vault.
+
+    Args:
+        query: Search text (all words must match)
+        folder: Restrict to a folder (relative to vault)
+        start: Restrict to daily notes from this date (YYYY-MM-DD)
+        end: Restrict to daily notes up to this date (YYYY-MM-DD)
+        limit: Maximum number of results
+        refresh: Pick up notes changed outside the skill (e.g. via Syncthing)
+            first (vault_index.catch_up)
+
+    Returns:
+        List of dicts (path, title, snippet, score), best match first
+    """
+    import vault_index
+
+    if refresh:
+        vault_index.catch_up(folder)
+    return vault_index.search(query, folder=folder, start=start, end=end, limit=limit)
+
+def _resolve_note(note):
+    """Vault-relative path of a note given by path or by link name (None if unknown)."""
+    import vault_index
+
+    rel = vault_index.relative(note)
+    if not rel.endswith('.md') and os.path.exists(f"{VAULT_PATH}/{rel}.md"):
+        rel += '.md'
+    if rel.endswith('.md') and os.path.exists(f"{VAULT_PATH}/{rel}"):
+        return rel
+    return vault_index.resolve_link(note)
+
+@timing.timed("obsidian.backlinks")
+def get_backlinks(note, refresh=True):
+    """
+    Notes linking to a note, from the link graph in the vault index.
+
+    Args:
+        note: Note path (relative to vault) or link name, e.g. "Website"
+        refresh: Pick up notes changed outside the skill first
+
+    Returns:
+        List of dicts (path, title), or None if the note doesn't exist
+    """
+    import vault_index
+
+    if refresh:
+        vault_index.catch_up()
+    rel = _resolve_note(note)
+    return vault_index.backlinks(rel) if rel else None
+
+@timing.timed("obsidian.links")
+def get_links(note, refresh=True):
+    """
+    Outgoing wikilinks and embeds of a note.
+
+    Args:
+        note: Note path (relative to vault) or link name
+        refresh: Pick up notes changed outside the skill first
+
+    Returns:
+        List of dicts (target, path, attachment); path is None when the
+        link is unresolved. None if the note doesn't exist.
+    """
+    import vault_index
+
+    if refresh:
+        vault_index.catch_up()
+    rel = _resolve_note(note)
+    return vault_index.outgoing_links(rel) if rel else None
+
+@timing.timed("obsidian.orphans")
+def find_orphans(folder=None, include_daily=False, refresh=True):
+    """
+    Notes no other note links to.
+
+    Args:
+        folder: Restrict to a folder (relative to vault)
+        include_daily: Also list daily notes
+        refresh: Pick up notes changed outside the skill first
+
+    Returns:
+        List of dicts (path, title)
+    """
+    import vault_index
+
+    if refresh:
+        vault_index.catch_up()
+    return vault_index.orphans(folder, include_daily)
+
+@timing.timed("obsidian.unresolved_links")
+def find_unresolved_links(folder=None, refresh=True):
+    """
+    Links pointing at notes that don't exist.
+
+    Args:
+        folder: Restrict to a folder (relative to vault)
+        refresh: Pick up notes changed outside the skill first
+
+    Returns:
+        List of dicts (path, target)
+    """
+    import vault_index
+
+    if refresh:
+        vault_index.catch_up()
+    return vault_index.unresolved_links(folder)
+
+@timing.timed("obsidian.semantic_search")
+def semantic_search(query, folder=None, limit=10, refresh=True):
+    """
+    Search notes by meaning rather than exact words (offline embeddings).
+
+    Args:
+        query: Free text, e.g. "when did I feel burned out"
+        folder: Restrict to a folder (relative to vault)
+        limit: Maximum number of notes
+        refresh: Embed notes changed since the last search first
+
+    Returns:
+        List of dicts (path, heading, snippet, score), best match first
+    """
+    import semantic
 
-    return sorted(notes)
+    if refresh:
+        semantic.refresh(folder)
+    return semantic.search(query, limit=limit, folder=folder)
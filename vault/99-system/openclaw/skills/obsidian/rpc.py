@@ -0,0 +1,111 @@
+"""Minimal JSON-lines RPC over local Unix sockets.
+
+Shared by the resident skill server and the voice transcription daemon.
+A request is one line `{"op": ..., "params": {...}}`; the reply is one line
+`{"ok": true, "result": ...}` or `{"ok": false, "error": "..."}`. Only the
+standard library is imported so clients stay cheap to start.
+"""
+
+import os
+import sys
+import json
+import socket
+
+
+class Unavailable(Exception):
+    """Raised when nothing is listening on the socket."""
+
+
+def call(socket_path, op, timeout=None, **params):
+    """
+    Send one request and return its result.
+
+    Args:
+        socket_path: Unix socket to connect to
+        op: Operation name
+        timeout: Socket timeout in seconds (None blocks until the reply)
+        **params: Operation arguments (JSON-serializable)
+
+    Returns:
+        The "result" field of the reply
+
+    Raises:
+        Unavailable: No server is listening
+        RuntimeError: The server reported an error
+    """
+    if not os.path.exists(socket_path):
+        raise Unavailable(socket_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError as e:
+        sock.close()
+        raise Unavailable(f"{socket_path}: {e}")
+
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps({"op": op, "params": params}).encode() + b"\n")
+        stream.flush()
+        line = stream.readline()
+
+    if not line:
+        raise RuntimeError(f"Server on {socket_path} closed the connection")
+    response = json.loads(line)
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error"))
+    return response["result"]
+
+
+def is_running(socket_path):
+    """Check whether a server answers ping on the socket."""
+    try:
+        return call(socket_path, "ping", timeout=2) == "pong"
+    except (Unavailable, RuntimeError, OSError):
+        return False
+
+
+def serve(socket_path, handlers):
+    """
+    Serve handlers on a Unix socket in the foreground until interrupted.
+
+    Each connection is handled on its own thread. A "ping" handler is added
+    automatically; a stale socket file left by a dead server is replaced.
+
+    Args:
+        socket_path: Unix socket to listen on (created with mode 0600)
+        handlers: Dict mapping op names to callables taking keyword params
+    """
+    import signal
+    import socketserver
+
+    handlers = dict(handlers, ping=lambda: "pong")
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                return
+            try:
+                request = json.loads(line)
+                handler = handlers[request["op"]]
+                response = {"ok": True, "result": handler(**request.get("params", {}))}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            raise RuntimeError(f"Server already running on {socket_path}")
+        os.unlink(socket_path)
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    server.daemon_threads = True
+    os.chmod(socket_path, 0o600)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
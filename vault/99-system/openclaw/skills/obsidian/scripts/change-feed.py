@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Keep the vault change feed current (inotify watcher) or show its state."""
+
+import sys
+import os
+import json
+import argparse
+
+# Add the skill directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import changes
+
+def main():
+    parser = argparse.ArgumentParser(description='Vault change feed')
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    serve_parser = subparsers.add_parser('serve', help='Watch the vault in the foreground')
+    serve_parser.add_argument('--settle', type=float, default=changes.SETTLE_SECONDS,
+                              help='Seconds a file must be quiet before its change is recorded')
+    serve_parser.add_argument('--poll', type=float,
+                              help='Reconcile every N seconds instead of using inotify')
+
+    subparsers.add_parser('reconcile', help='Record changes missed while no watcher ran')
+    subparsers.add_parser('status', help='Show journal statistics')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            changes.watch(settle=args.settle, poll=args.poll)
+        except RuntimeError as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == 'reconcile':
+        print(json.dumps(changes.reconcile()))
+
+    elif args.command == 'status':
+        print(json.dumps(changes.feed_stats(), indent=2))
+
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
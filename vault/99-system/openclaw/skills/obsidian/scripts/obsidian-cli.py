@@ -3,24 +3,53 @@
 
 import sys
 import os
+import json
 import argparse
 from datetime import datetime
 
 # Add the skill directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+if __name__ == '__main__':
+    # Hand the command to the resident skill server when one is running
+    from skill_server import forward
+    forward('obsidian')
+
 from obsidian import (
-    get_vault_config,
+    get_config,
     get_daily_note_path,
     create_daily_note,
     append_to_daily_note,
     create_note,
     read_note,
+    read_section,
+    read_entries,
+    read_lines,
+    read_bytes,
+    get_outline,
     note_exists,
-    list_daily_notes
+    list_daily_notes,
+    read_daily_range,
+    period_bounds,
+    search_notes,
+    get_backlinks,
+    get_links,
+    find_orphans,
+    find_unresolved_links,
+    semantic_search,
+    add_attachment,
 )
 
-def main():
-    parser = argparse.ArgumentParser(description='Obsidian Vault CLI')
+def parse_span(value, parser):
+    """Parse "START:END" (either side optional) into a tuple of ints or None."""
+    start, sep, end = value.partition(':')
+    try:
+        return (int(start) if start else None), (int(end) if end else None)
+    except ValueError:
+        parser.error(f"expected START:END, got {value}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='obsidian-cli.py', description='Obsidian Vault CLI')
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
     # Config command
@@ -50,24 +79,113 @@ def main():
     # Read note command
     read_parser = subparsers.add_parser('read', help='Read a note')
     read_parser.add_argument('path', help='Note path (relative to vault)')
+    part = read_parser.add_mutually_exclusive_group()
+    part.add_argument('--section', '-s', help='Only this heading\'s section, e.g. "Tasks", or an entry time')
+    part.add_argument('--entries', '-e', type=int, metavar='N', help='Only the last N timestamped entries')
+    part.add_argument('--lines', metavar='START:END', help='Only these lines (1-based, inclusive)')
+    part.add_argument('--bytes', metavar='START:END', help='Only this byte range (end exclusive)')
+    part.add_argument('--outline', action='store_true', help='List headings and entries with line numbers')
 
     # List daily notes command
     list_parser = subparsers.add_parser('list-daily', help='List daily notes')
     list_parser.add_argument('--year', help='Filter by year')
     list_parser.add_argument('--month', help='Filter by month (1-12)')
 
-    args = parser.parse_args()
+    # Daily range command
+    range_parser = subparsers.add_parser('range', help='Entries of the daily notes in a date range')
+    range_parser.add_argument('start', nargs='?', help='First day YYYY-MM-DD (default: today)')
+    range_parser.add_argument('end', nargs='?', help='Last day YYYY-MM-DD (default: start)')
+    range_parser.add_argument('--period', '-p', choices=['week', 'month', 'year'],
+                              help='The whole week/month/year containing start')
+    range_parser.add_argument('--json', action='store_true', help='One JSON object per entry')
+    range_parser.add_argument('--preamble', action='store_true', help='Include text before the first entry')
+    range_parser.add_argument('--workers', type=int, default=8, help='Notes read in parallel (default: 8)')
+
+    # Search command
+    search_parser = subparsers.add_parser('search', help='Full-text search across the vault')
+    search_parser.add_argument('query', help='Search text')
+    search_parser.add_argument('--folder', '-f', help='Restrict to folder (relative to vault)')
+    search_parser.add_argument('--from', dest='start', help='Daily notes from YYYY-MM-DD')
+    search_parser.add_argument('--to', dest='end', help='Daily notes up to YYYY-MM-DD')
+    search_parser.add_argument('--no-refresh', action='store_true',
+                               help='Skip picking up notes changed outside the skill')
+    search_parser.add_argument('--limit', '-n', type=int, default=10, help='Max results (default: 10)')
+
+    # Semantic search command
+    semantic_parser = subparsers.add_parser('semantic-search', help='Search notes by meaning (offline embeddings)')
+    semantic_parser.add_argument('query', help='Free text, e.g. "when did I feel burned out"')
+    semantic_parser.add_argument('--folder', '-f', help='Restrict to folder (relative to vault)')
+    semantic_parser.add_argument('--limit', '-n', type=int, default=10, help='Max results (default: 10)')
+    semantic_parser.add_argument('--no-refresh', action='store_true',
+                                 help='Skip embedding changed notes first')
+
+    # Query indexed notes command
+    notes_parser = subparsers.add_parser('notes', help='Query notes from the vault index')
+    notes_parser.add_argument('--folder', '-f', help='Folder (relative to vault, includes subfolders)')
+    notes_parser.add_argument('--tag', '-t', help='Only notes with this tag')
+    notes_parser.add_argument('--from', dest='start', help='Daily notes from YYYY-MM-DD')
+    notes_parser.add_argument('--to', dest='end', help='Daily notes up to YYYY-MM-DD')
+    notes_parser.add_argument('--titles', action='store_true', help='Show titles next to paths')
+
+    # Link graph commands
+    backlinks_parser = subparsers.add_parser('backlinks', help='Notes linking to a note')
+    backlinks_parser.add_argument('note', help='Note path (relative to vault) or link name')
+    backlinks_parser.add_argument('--no-refresh', action='store_true',
+                                  help='Skip picking up notes changed outside the skill')
+
+    links_parser = subparsers.add_parser('links', help='Outgoing links of a note')
+    links_parser.add_argument('note', nargs='?', help='Note path or link name')
+    links_parser.add_argument('--unresolved', '-u', action='store_true',
+                              help='Only links to missing notes (vault-wide without a note)')
+    links_parser.add_argument('--folder', '-f', help='With --unresolved and no note: restrict to folder')
+    links_parser.add_argument('--no-refresh', action='store_true',
+                              help='Skip picking up notes changed outside the skill')
+
+    orphans_parser = subparsers.add_parser('orphans', help='Notes nothing links to')
+    orphans_parser.add_argument('--folder', '-f', help='Restrict to folder (relative to vault)')
+    orphans_parser.add_argument('--daily', action='store_true', help='Include daily notes')
+    orphans_parser.add_argument('--no-refresh', action='store_true',
+                                help='Skip picking up notes changed outside the skill')
+
+    # Change feed command
+    changes_parser = subparsers.add_parser('changes', help='Files changed since a cursor (change feed)')
+    changes_parser.add_argument('--since', type=int, default=0,
+                                help='Cursor printed by the previous call (default: 0, everything)')
+    changes_parser.add_argument('--limit', '-n', type=int, default=1000, help='Max changes (default: 1000)')
+    changes_parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+
+    # Attachment store command
+    attachments_parser = subparsers.add_parser('attachments',
+                                               help='Add attachments or deduplicate them (content-addressed store)')
+    attachments_parser.add_argument('action', choices=['add', 'dedupe', 'stats'], help='Action')
+    attachments_parser.add_argument('files', nargs='*', help='Files to add (add)')
+    attachments_parser.add_argument('--name', help='Attachment file name (add, single file)')
+    attachments_parser.add_argument('--note', help='Note that embeds the attachment (add)')
+    attachments_parser.add_argument('--folder', '-f', help='Only scan this folder (dedupe)')
+    attachments_parser.add_argument('--dry-run', action='store_true',
+                                    help='Report what dedupe would link without changing files')
+
+    # Index maintenance command
+    index_parser = subparsers.add_parser('index', help='Maintain the vault index')
+    index_parser.add_argument('action', choices=['refresh', 'stats'], help='Action')
+
+    semantic_index_parser = subparsers.add_parser('semantic-index', help='Maintain the semantic index')
+    semantic_index_parser.add_argument('action', choices=['refresh', 'stats'], help='Action')
+
+    # Timing spans command
+    timing_parser = subparsers.add_parser('timing', help='Summarize recorded timing spans (NAZAR_TIMING=1)')
+    timing_parser.add_argument('--last', '-n', type=int, help='Only the last N spans')
+
+    args = parser.parse_args(argv)
 
     if args.command == 'config':
-        config = get_vault_config()
+        config = get_config()
         print("=== Vault Configuration ===")
-        print(f"Daily notes folder: {config.get('daily_notes', {}).get('folder', 'N/A')}")
-        print(f"New file location: {config.get('app', {}).get('newFileFolderPath', 'N/A')}")
-        print(f"Attachments: {config.get('app', {}).get('attachmentFolderPath', 'N/A')}")
+        print(f"Daily notes folder: {config.daily_notes_folder}")
+        print(f"New file location: {config.new_file_folder}")
+        print(f"Attachments: {config.attachment_folder}")
 
-        plugins = config.get('core_plugins', {})
-        enabled = [k for k, v in plugins.items() if v]
-        print(f"\nEnabled plugins: {', '.join(enabled[:5])}...")
+        print(f"\nEnabled plugins: {', '.join(config.enabled_plugins[:5])}...")
 
     elif args.command == 'daily-path':
         if args.date:
@@ -97,20 +215,209 @@ def main():
         print(f"Created: {path}")
 
     elif args.command == 'read':
-        content = read_note(args.path)
-        if content:
-            print(content)
+        if args.section:
+            content = read_section(args.path, args.section)
+            missing = f"Section not found: {args.section}" if note_exists(args.path) else None
+        elif args.entries:
+            entries = read_entries(args.path, args.entries)
+            content = None if entries is None else "\n\n".join(
+                f"**[{e.time}]**\n\n{e.text}" for e in entries)
+            missing = None
+        elif args.lines or args.bytes:
+            start, end = parse_span(args.lines or args.bytes, parser)
+            if args.lines:
+                content = read_lines(args.path, start or 1, end)
+            else:
+                content = read_bytes(args.path, start or 0, end)
+            missing = None
+        elif args.outline:
+            outline = get_outline(args.path)
+            content = None if outline is None else "\n".join(
+                f"{o['line']:>5}  " + (f"{'#' * o['level']} {o['title']}" if o['level'] < 7 else f"  [{o['title']}]")
+                for o in outline)
+            missing = None
         else:
-            print(f"Note not found: {args.path}", file=sys.stderr)
+            content = read_note(args.path)
+            missing = None
+        if content is None:
+            print(missing or f"Note not found: {args.path}", file=sys.stderr)
             sys.exit(1)
+        print(content)
 
     elif args.command == 'list-daily':
         notes = list_daily_notes(args.year, args.month)
         for note in notes:
             print(note)
 
+    elif args.command == 'range':
+        if args.period:
+            start, end = period_bounds(args.period, args.start)
+        else:
+            start = args.start or datetime.now().strftime('%Y-%m-%d')
+            end = args.end or start
+        current = None
+        for entry in read_daily_range(start, end, args.workers, args.preamble):
+            if args.json:
+                print(json.dumps({"date": entry.date.isoformat(), "time": entry.time, "text": entry.text,
+                                  "path": entry.path, "in_progress": entry.in_progress}, ensure_ascii=False))
+            else:
+                if entry.date != current:
+                    if current is not None:
+                        print()
+                    print(f"## {entry.date.isoformat()}\n")
+                    current = entry.date
+                print(f"**[{entry.time}]** {entry.text}" if entry.time else entry.text)
+            sys.stdout.flush()
+
+    elif args.command == 'search':
+        results = search_notes(args.query, args.folder, args.start, args.end, args.limit,
+                               refresh=not args.no_refresh)
+        if not results:
+            print(f"No matches for: {args.query}", file=sys.stderr)
+            sys.exit(1)
+        for r in results:
+            print(f"{r['path']} ({r['title']})")
+            print(f"  {r['snippet']}".replace('\n', ' '))
+
+    elif args.command == 'semantic-search':
+        results = semantic_search(args.query, args.folder, args.limit, refresh=not args.no_refresh)
+        if not results:
+            print(f"No matches for: {args.query}", file=sys.stderr)
+            sys.exit(1)
+        for r in results:
+            heading = f" > {r['heading']}" if r['heading'] else ""
+            print(f"{r['path']}{heading} ({r['score']:.2f})")
+            print(f"  {r['snippet']}")
+
+    elif args.command == 'notes':
+        import vault_index
+
+        # Listing changes only need a directory-level refresh; tags need note contents
+        vault_index.refresh(args.folder, deep=bool(args.tag))
+        for note in vault_index.query_notes(args.folder, args.tag, args.start, args.end):
+            if args.titles:
+                print(f"{note['path']}\t{note['title']}")
+            else:
+                print(note['path'])
+
+    elif args.command == 'backlinks':
+        notes = get_backlinks(args.note, refresh=not args.no_refresh)
+        if notes is None:
+            print(f"Note not found: {args.note}", file=sys.stderr)
+            sys.exit(1)
+        for note in notes:
+            print(f"{note['path']}\t{note['title']}")
+
+    elif args.command == 'links':
+        if args.note:
+            links = get_links(args.note, refresh=not args.no_refresh)
+            if links is None:
+                print(f"Note not found: {args.note}", file=sys.stderr)
+                sys.exit(1)
+            for link in links:
+                if link['attachment']:
+                    if not args.unresolved:
+                        print(f"{link['target']}\t(attachment)")
+                elif link['path'] is None:
+                    print(f"{link['target']}\t(unresolved)")
+                elif not args.unresolved:
+                    print(f"{link['target']}\t{link['path']}")
+        elif args.unresolved:
+            for link in find_unresolved_links(args.folder, refresh=not args.no_refresh):
+                print(f"{link['path']}\t{link['target']}")
+        else:
+            parser.error('links needs a note, or --unresolved for the whole vault')
+
+    elif args.command == 'orphans':
+        for note in find_orphans(args.folder, args.daily, refresh=not args.no_refresh):
+            print(f"{note['path']}\t{note['title']}")
+
+    elif args.command == 'changes':
+        import changes
+
+        result = changes.changes(args.since, args.limit)
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            if result['reset']:
+                print("Cursor not in the journal (pruned or rebuilt): resync fully, "
+                      "then continue from the cursor below", file=sys.stderr)
+            for c in result['changes']:
+                path = f"{c['old_path']} -> {c['path']}" if c['old_path'] else c['path']
+                print(f"{c['seq']}\t{c['kind']}\t{path}")
+            print(f"Cursor: {result['cursor']}" + (" (more)" if result['more'] else ""))
+
+    elif args.command == 'attachments':
+        import attachments
+
+        mb = 1024 * 1024
+        if args.action == 'add':
+            if not args.files:
+                parser.error("attachments add needs at least one file")
+            if args.name and len(args.files) > 1:
+                parser.error("--name needs a single file")
+            for source in args.files:
+                path = add_attachment(source, args.name, args.note)
+                print(f"{path}\t![[{os.path.basename(path)}]]")
+        elif args.action == 'dedupe':
+            result = attachments.dedupe(args.folder, args.dry_run)
+            print(f"Scanned {result['files']} attachments ({result['bytes'] / mb:.1f} MB), "
+                  f"hashed {result['hashed']}")
+            print(f"{'Would link' if args.dry_run else 'Linked'} {result['linked']} duplicates "
+                  f"({result['reclaimed_bytes'] / mb:.1f} MB reclaimed)")
+            print(f"Stored {result['stored']} new blobs, removed {result['removed_blobs']} unused")
+        else:
+            stats = attachments.store_stats()
+            print(f"Store: {stats['store']}")
+            print(f"Attachments: {stats['files']} ({stats['bytes'] / mb:.1f} MB listed, "
+                  f"{stats['disk_bytes'] / mb:.1f} MB on disk, {stats['saved_bytes'] / mb:.1f} MB saved)")
+            print(f"Duplicates not yet linked: {stats['duplicate_bytes'] / mb:.1f} MB "
+                  f"({stats['unhashed']} files not hashed yet)")
+            print(f"Blobs: {stats['blobs']} ({stats['unused_blobs']} unused)")
+
+    elif args.command == 'index':
+        import vault_index
+
+        if args.action == 'refresh':
+            result = vault_index.refresh()
+            print(f"Indexed {result['indexed']} notes, removed {result['removed']}")
+        else:
+            stats = vault_index.index_stats()
+            print(f"Index: {stats['path']}")
+            print(f"Notes: {stats['notes']} ({stats['bytes'] / 1024:.0f} KB)")
+            print(f"Tags: {stats['tags']}")
+            print(f"Links: {stats['links']}")
+
+    elif args.command == 'semantic-index':
+        import semantic
+
+        if args.action == 'refresh':
+            result = semantic.refresh()
+            print(f"Embedded {result['embedded']} notes ({result['chunks']} chunks), "
+                  f"removed {result['removed']}")
+        else:
+            stats = semantic.index_stats()
+            print(f"Index: {stats['path']}")
+            print(f"Model: {stats['model']} ({stats['dimensions']} dimensions)")
+            print(f"Notes: {stats['notes']}")
+            print(f"Chunks: {stats['chunks']} ({stats['stale_rows']} stale rows)")
+            print(f"Vectors: {stats['vector_bytes'] / 1024:.0f} KB")
+
+    elif args.command == 'timing':
+        import timing
+
+        spans = timing.summary(args.last)
+        if not spans:
+            print(f"No spans in {timing.TIMING_LOG} (set NAZAR_TIMING=1 to record)", file=sys.stderr)
+            sys.exit(1)
+        print(f"{'span':<32} {'count':>6} {'median ms':>10} {'p95 ms':>10} {'total ms':>10}")
+        for name, s in sorted(spans.items(), key=lambda item: -item[1]['total_ms']):
+            print(f"{name:<32} {s['count']:>6} {s['median_ms']:>10} {s['p95_ms']:>10} {s['total_ms']:>10}")
+
     else:
         parser.print_help()
 
 if __name__ == '__main__':
+    import timing
+    timing.startup('obsidian-cli')
     main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Run the resident skill server that keeps the obsidian and voice CLIs warm."""
+
+import sys
+import os
+import json
+import argparse
+
+# Add the skill directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import skill_server
+import rpc
+
+def main():
+    parser = argparse.ArgumentParser(description='Nazar skill server')
+    parser.add_argument('--socket', help=f'Unix socket path (default: {skill_server.SOCKET_PATH})')
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    serve_parser = subparsers.add_parser('serve', help='Run the server in the foreground')
+    serve_parser.add_argument('--preload', '-p', action='append', choices=sorted(skill_server.CLIS),
+                              help='CLI to import before accepting requests (default: obsidian)')
+
+    subparsers.add_parser('status', help='Show server statistics')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        print(f"Skill server listening on {args.socket or skill_server.SOCKET_PATH}", file=sys.stderr)
+        try:
+            skill_server.serve(args.socket, args.preload or ['obsidian'])
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == 'status':
+        try:
+            stats = rpc.call(args.socket or skill_server.SOCKET_PATH, 'stats', timeout=5)
+        except rpc.Unavailable:
+            print("Skill server is not running", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(stats, indent=2))
+
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
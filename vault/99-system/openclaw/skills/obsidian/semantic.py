@@ -0,0 +1,488 @@
+"""Offline semantic search over the vault.
+
+Notes are split into chunks at headings and at daily-note entries, embedded
+on the CPU with a small sentence-embedding model (ONNX Runtime), and stored
+as float16 rows in a memory-mapped file. A SQLite table next to it maps each
+row to its note, heading and text. A query is one matrix-vector product over
+the mapped rows. Refreshing re-embeds only notes whose content hash changed
+(mtime/size are checked first, so unchanged notes are not even read).
+
+The model directory ($EMBED_MODEL_DIR) holds an ONNX export of a
+sentence-transformers model: model.onnx and tokenizer.json (for example
+all-MiniLM-L6-v2, 384 dimensions). onnxruntime and tokenizers are already
+in the voice venv as faster-whisper dependencies.
+"""
+
+import os
+import re
+import sys
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+
+from obsidian import CACHE_PATH, ENTRY_HEADER
+
+VOICE_VENV = os.environ.get("VOICE_VENV", "/opt/voice-venv")
+sys.path.insert(0, f"{VOICE_VENV}/lib/python3.13/site-packages")
+
+EMBED_MODEL_DIR = os.environ.get("EMBED_MODEL_DIR", "/opt/models/embed")
+SEMANTIC_DIR = os.environ.get("SEMANTIC_INDEX_DIR", os.path.join(CACHE_PATH, "semantic"))
+TABLE_PATH = os.path.join(SEMANTIC_DIR, "chunks.sqlite")
+
+# Tokens per chunk fed to the model (MiniLM was trained on 256)
+MAX_TOKENS = 256
+# Sections longer than this are split at paragraph boundaries
+MAX_CHUNK_CHARS = 1200
+BATCH_SIZE = 32
+# Notes embedded per commit during a refresh
+NOTES_PER_COMMIT = 64
+# Rewrite the vector file once this fraction of its rows is stale
+COMPACT_FRACTION = 0.3
+# Rows scored per block, bounding the float32 working copy
+SCORE_BLOCK_ROWS = 65536
+
+HEADING_LINE = re.compile(r'^#{1,6}\s+(.+?)\s*#*\s*$', re.M)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+-- row = position of the chunk's vector in the vector file
+CREATE TABLE IF NOT EXISTS chunks (
+    row INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    heading TEXT,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_path ON chunks(path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_embedder = {}
+_embed_lock = threading.Lock()
+
+
+def get_embedder(model_dir=None):
+    """
+    Return the loaded (session, tokenizer, dimensions), loading on first use.
+
+    Raises:
+        ImportError: onnxruntime or tokenizers is not installed
+        FileNotFoundError: The model directory lacks model.onnx or tokenizer.json
+    """
+    model_dir = model_dir or EMBED_MODEL_DIR
+    with _embed_lock:
+        if model_dir not in _embedder:
+            import onnxruntime
+            from tokenizers import Tokenizer
+
+            for name in ("model.onnx", "tokenizer.json"):
+                if not os.path.exists(os.path.join(model_dir, name)):
+                    raise FileNotFoundError(f"{name} not found in {model_dir} (set EMBED_MODEL_DIR)")
+            tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+            tokenizer.enable_truncation(MAX_TOKENS)
+            tokenizer.enable_padding()
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = min(4, os.cpu_count() or 1)
+            session = onnxruntime.InferenceSession(
+                os.path.join(model_dir, "model.onnx"), options, providers=["CPUExecutionProvider"]
+            )
+            dim = session.get_outputs()[0].shape[-1]
+            if not isinstance(dim, int):
+                dim = _embed_batch(session, tokenizer, ["probe"]).shape[1]
+            _embedder[model_dir] = (session, tokenizer, dim)
+        return _embedder[model_dir]
+
+
+def _embed_batch(session, tokenizer, texts):
+    import numpy as np
+
+    encodings = tokenizer.encode_batch(texts)
+    feeds = {
+        "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+        "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+        "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+    }
+    names = {i.name for i in session.get_inputs()}
+    output = session.run(None, {k: v for k, v in feeds.items() if k in names})[0]
+    if output.ndim == 3:
+        # Token embeddings: mean-pool over the real (unpadded) tokens
+        mask = feeds["attention_mask"][:, :, None].astype(np.float32)
+        output = (output * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+    norms = np.linalg.norm(output, axis=1, keepdims=True)
+    return (output / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+def embed(texts, model_dir=None):
+    """
+    Embed texts as unit-length vectors.
+
+    Returns:
+        float32 array of shape (len(texts), dimensions)
+    """
+    import numpy as np
+
+    session, tokenizer, dim = get_embedder(model_dir)
+    if not texts:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.concatenate([
+        _embed_batch(session, tokenizer, texts[i:i + BATCH_SIZE])
+        for i in range(0, len(texts), BATCH_SIZE)
+    ])
+
+
+def _model_stamp(model_dir=None):
+    st = os.stat(os.path.join(model_dir or EMBED_MODEL_DIR, "model.onnx"))
+    return f"{os.path.abspath(model_dir or EMBED_MODEL_DIR)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _split_long(text):
+    if len(text) <= MAX_CHUNK_CHARS:
+        return [text]
+    parts, current = [], ""
+    for paragraph in re.split(r'\n\s*\n', text):
+        if current and len(current) + len(paragraph) > MAX_CHUNK_CHARS:
+            parts.append(current)
+            current = ""
+        current = f"{current}\n\n{paragraph}" if current else paragraph
+        while len(current) > MAX_CHUNK_CHARS:
+            parts.append(current[:MAX_CHUNK_CHARS])
+            current = current[MAX_CHUNK_CHARS:]
+    if current.strip():
+        parts.append(current)
+    return parts
+
+
+def chunk_note(text, title):
+    """
+    Split a note into embeddable chunks at headings and daily-note entries.
+
+    Returns:
+        List of (heading, chunk_text); heading is None for text before the
+        first heading, "[HH:MM]" for daily-note entries
+    """
+    import vault_index
+
+    _, body = vault_index.parse_frontmatter(text)
+    bounds = sorted(
+        [(m.start(), m.end(), m.group(1)) for m in HEADING_LINE.finditer(body)]
+        + [(m.start(), m.end(), f"[{m.group(1)}]") for m in ENTRY_HEADER.finditer(body)]
+    )
+    sections = [(None, body[:bounds[0][0]] if bounds else body)]
+    for i, (start, end, heading) in enumerate(bounds):
+        stop = bounds[i + 1][0] if i + 1 < len(bounds) else len(body)
+        sections.append((heading, body[end:stop]))
+
+    chunks = []
+    for heading, section in sections:
+        # Drop entry separators and hidden markers; skip sections with no text
+        section = re.sub(r'<!--.*?-->', '', section, flags=re.S)
+        section = re.sub(r'^\s*---\s*$', '', section, flags=re.M).strip()
+        if not section:
+            continue
+        for part in _split_long(section):
+            chunks.append((heading, part.strip()))
+    return chunks
+
+
+def _embedding_text(title, heading, text):
+    return f"{title} — {heading}\n{text}" if heading else f"{title}\n{text}"
+
+
+@contextmanager
+def _writer_lock():
+    import fcntl
+
+    os.makedirs(SEMANTIC_DIR, exist_ok=True)
+    with open(os.path.join(SEMANTIC_DIR, "lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def connect():
+    """Open the chunk table, creating it on first use."""
+    os.makedirs(SEMANTIC_DIR, exist_ok=True)
+    conn = sqlite3.connect(TABLE_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _meta(conn):
+    return dict(conn.execute("SELECT key, value FROM meta"))
+
+
+def _vectors_path(generation):
+    return os.path.join(SEMANTIC_DIR, f"vectors-{generation}.f16")
+
+
+def _reset(conn, stamp, dim):
+    """Drop everything (new or changed model) and start generation 0."""
+    old = _meta(conn).get("generation")
+    with conn:
+        conn.execute("DELETE FROM notes")
+        conn.execute("DELETE FROM chunks")
+        conn.execute("DELETE FROM meta")
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)",
+                         [("model", stamp), ("dim", str(dim)), ("generation", "0")])
+    if old is not None and os.path.exists(_vectors_path(old)):
+        os.remove(_vectors_path(old))
+    open(_vectors_path(0), "wb").close()
+
+
+def _compact(conn, meta):
+    """Rewrite the vector file without stale rows and renumber the chunks."""
+    import numpy as np
+
+    dim, generation = int(meta["dim"]), int(meta["generation"])
+    old_path = _vectors_path(generation)
+    live = [row for (row,) in conn.execute("SELECT row FROM chunks ORDER BY row")]
+    vectors = np.memmap(old_path, dtype="<f2", mode="r").reshape(-1, dim) if live else None
+
+    new_path = _vectors_path(generation + 1)
+    with open(new_path, "wb") as f:
+        for i in range(0, len(live), SCORE_BLOCK_ROWS):
+            f.write(np.ascontiguousarray(vectors[live[i:i + SCORE_BLOCK_ROWS]]).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    del vectors
+
+    with conn:
+        # Two passes so new row numbers never collide with old ones
+        conn.execute("UPDATE chunks SET row = -1 - row")
+        conn.executemany("UPDATE chunks SET row = ? WHERE row = ?",
+                         [(new, -1 - old) for new, old in enumerate(live)])
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'generation'", (str(generation + 1),))
+    os.remove(old_path)
+
+
+def refresh(folder=None, model_dir=None):
+    """
+    Bring the semantic index up to date with the vault.
+
+    Uses the vault index to find notes, reads only those whose mtime or
+    size changed, and re-embeds only those whose content hash changed.
+
+    Args:
+        folder: Vault-relative folder to refresh (defaults to the whole vault)
+        model_dir: Embedding model directory (defaults to EMBED_MODEL_DIR)
+
+    Returns:
+        Dict with counts of notes embedded, unchanged, removed and chunks added
+    """
+    import numpy as np
+    import vault_index
+    from obsidian import VAULT_PATH
+
+    stats = {"embedded": 0, "unchanged": 0, "removed": 0, "chunks": 0}
+    _, _, dim = get_embedder(model_dir)
+    stamp = _model_stamp(model_dir)
+
+    with _writer_lock(), closing(connect()) as conn:
+        meta = _meta(conn)
+        if meta.get("model") != stamp or int(meta.get("dim", 0)) != dim:
+            _reset(conn, stamp, dim)
+            meta = _meta(conn)
+        vectors_path = _vectors_path(meta["generation"])
+
+        vault_index.refresh(folder)
+        current = {n["path"]: (n["mtime"], n["size"], n["title"]) for n in vault_index.query_notes(folder)}
+        prefix = vault_index.relative(folder).rstrip('/') + '/' if folder else ''
+        known = {
+            path: (mtime, size, digest)
+            for path, mtime, size, digest in conn.execute("SELECT path, mtime, size, hash FROM notes")
+            if path.startswith(prefix)
+        }
+
+        with conn:
+            for path in set(known) - set(current):
+                conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+                conn.execute("DELETE FROM notes WHERE path = ?", (path,))
+                stats["removed"] += 1
+
+        changed = sorted(p for p, (mtime, size, _) in current.items() if known.get(p, (None, None))[:2] != (mtime, size))
+        for i in range(0, len(changed), NOTES_PER_COMMIT):
+            notes, texts = [], []
+            for path in changed[i:i + NOTES_PER_COMMIT]:
+                mtime, size, title = current[path]
+                try:
+                    with open(os.path.join(VAULT_PATH, path), 'rb') as f:
+                        raw = f.read()
+                except FileNotFoundError:
+                    continue
+                digest = hashlib.sha1(raw).hexdigest()
+                if path in known and known[path][2] == digest:
+                    notes.append((path, mtime, size, digest, None))
+                    stats["unchanged"] += 1
+                    continue
+                chunks = chunk_note(raw.decode('utf-8', errors='replace'), title)
+                notes.append((path, mtime, size, digest, chunks))
+                texts.extend(_embedding_text(title, heading, text) for heading, text in chunks)
+                stats["embedded"] += 1
+
+            vectors = embed(texts, model_dir).astype("<f2")
+            with open(vectors_path, "ab") as f:
+                first_row = f.tell() // (dim * 2)
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Vectors are on disk before the rows referencing them are committed;
+            # rows written by a crashed refresh are simply never referenced
+            row = first_row
+            with conn:
+                for path, mtime, size, digest, chunks in notes:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO notes (path, mtime, size, hash) VALUES (?, ?, ?, ?)",
+                        (path, mtime, size, digest),
+                    )
+                    if chunks is None:
+                        continue
+                    conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+                    conn.executemany(
+                        "INSERT INTO chunks (row, path, heading, text) VALUES (?, ?, ?, ?)",
+                        [(row + j, path, heading, text) for j, (heading, text) in enumerate(chunks)],
+                    )
+                    row += len(chunks)
+                    stats["chunks"] += len(chunks)
+
+        total_rows = os.path.getsize(vectors_path) // (dim * 2)
+        live = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        if total_rows and (total_rows - live) / total_rows > COMPACT_FRACTION:
+            _compact(conn, meta)
+
+    return stats
+
+
+def _rank(conn, query_vector, limit, folder):
+    """
+    Best-scoring chunks for a query, read inside the caller's transaction.
+
+    Returns:
+        List of (score, path, heading, text), best first, several per note
+
+    Raises:
+        FileNotFoundError: A compaction replaced this snapshot's vector file
+    """
+    import numpy as np
+    import vault_index
+
+    meta = _meta(conn)
+    if "dim" not in meta:
+        return []
+    sql, params = "SELECT row FROM chunks", []
+    if folder:
+        prefix = vault_index.relative(folder).rstrip('/') + '/'
+        sql += " WHERE substr(path, 1, ?) = ?"
+        params = [len(prefix), prefix]
+    live = np.fromiter((r for (r,) in conn.execute(sql, params)), dtype=np.int64)
+    dim = int(meta["dim"])
+    try:
+        vectors = np.memmap(_vectors_path(meta["generation"]), dtype="<f2", mode="r").reshape(-1, dim)
+    except ValueError:
+        return []
+    if not live.size or query_vector.shape[0] != dim:
+        return []
+
+    live = live[live < len(vectors)]
+    if live.size < len(vectors) // 4:
+        # Few candidate rows (folder filter): gather them instead of scanning
+        scores = vectors[live].astype(np.float32) @ query_vector
+        candidates = live
+    else:
+        all_scores = np.empty(len(vectors), dtype=np.float32)
+        for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+            block = vectors[start:start + SCORE_BLOCK_ROWS]
+            all_scores[start:start + len(block)] = block.astype(np.float32) @ query_vector
+        scores, candidates = all_scores[live], live
+    if not candidates.size:
+        return []
+
+    # Several chunks of one note can rank high: over-fetch, then keep one per note
+    k = min(len(candidates), limit * 5)
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    rows = [int(candidates[i]) for i in top]
+    info = {
+        row: (path, heading, text) for row, path, heading, text in conn.execute(
+            f"SELECT row, path, heading, text FROM chunks WHERE row IN ({','.join('?' * len(rows))})", rows
+        )
+    }
+    return [(float(scores[i]), *info[row]) for i, row in zip(top, rows) if row in info]
+
+
+def search(query, limit=10, folder=None, model_dir=None):
+    """
+    Notes most similar in meaning to a query.
+
+    Args:
+        query: Free text, e.g. "when did I feel burned out"
+        limit: Maximum number of notes
+        folder: Restrict to a vault-relative folder
+        model_dir: Embedding model directory (defaults to EMBED_MODEL_DIR)
+
+    Returns:
+        List of dicts (path, heading, snippet, score), best match first,
+        one per note (its best chunk)
+    """
+    query_vector = embed([query], model_dir)[0]
+
+    ranked = []
+    with closing(connect()) as conn:
+        for _ in range(3):
+            # sqlite3 opens no transaction for SELECTs, so begin one: under WAL
+            # every read in it sees one snapshot, and the row numbers, their
+            # text and the vector generation agree even if _compact renumbers
+            # the chunks meanwhile. Retry if it removed that generation's file.
+            conn.execute("BEGIN")
+            try:
+                ranked = _rank(conn, query_vector, limit, folder)
+                break
+            except FileNotFoundError:
+                ranked = []
+            finally:
+                conn.rollback()
+
+    results, seen = [], set()
+    for score, path, heading, text in ranked:
+        if path in seen:
+            continue
+        seen.add(path)
+        snippet = " ".join(text.split())
+        results.append({
+            "path": path,
+            "heading": heading,
+            "snippet": snippet[:200] + ("…" if len(snippet) > 200 else ""),
+            "score": round(score, 4),
+        })
+        if len(results) == limit:
+            break
+    return results
+
+
+def index_stats():
+    """Counts and sizes of the semantic index."""
+    with closing(connect()) as conn:
+        meta = _meta(conn)
+        notes = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        chunks = conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    path = _vectors_path(meta["generation"]) if "generation" in meta else None
+    size = os.path.getsize(path) if path and os.path.exists(path) else 0
+    dim = int(meta.get("dim", 0))
+    rows = size // (dim * 2) if dim else 0
+    return {
+        "path": SEMANTIC_DIR,
+        "model": meta.get("model"),
+        "dimensions": dim,
+        "notes": notes,
+        "chunks": chunks,
+        "stale_rows": rows - chunks,
+        "vector_bytes": size,
+    }
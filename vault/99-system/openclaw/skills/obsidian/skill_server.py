@@ -0,0 +1,220 @@
+"""Resident server that runs the obsidian and voice CLIs in one warm process.
+
+Every agent action used to start a fresh interpreter, redo the sys.path
+setup and re-import the skill modules (and, for voice, the Whisper stack).
+With the server running, `obsidian-cli.py` and `voice-cli.py` forward their
+argv over a Unix socket and print the captured output; the command runs in
+the server with modules, config and models already loaded. When the server
+is down the CLIs run the command in-process exactly as before.
+
+The client half (forward) imports only the standard library and rpc.py.
+"""
+
+import os
+import sys
+
+import rpc
+
+SOCKET_PATH = os.environ.get("NAZAR_SKILL_SOCKET", "/tmp/nazar-skills.sock")
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+
+SKILLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLIS = {
+    "obsidian": os.path.join(SKILLS_DIR, "obsidian", "scripts", "obsidian-cli.py"),
+    "voice": os.path.join(SKILLS_DIR, "voice", "scripts", "voice-cli.py"),
+}
+
+
+# Arguments that name files on the client, per CLI and subcommand: options
+# whose value is a path, the other options that take a value, and the index
+# of the first positional that is a path (None: no positional is). Content,
+# titles, queries and vault-relative note paths are sent unchanged.
+PATH_ARGS = {
+    ("voice", "transcribe"): ((), ("--model", "-m", "--workers", "-w"), 0),
+    ("voice", "daily-note"): ((), ("--model", "-m"), 0),
+    ("voice", "transcribe-batch"): ((), ("--model", "-m", "--workers", "-w"), 0),
+    ("voice", "speak"): (("--file", "-f", "--output", "-o"), (), None),
+    ("obsidian", "attachments"): ((), ("--name", "--note", "--folder", "-f"), 1),
+}
+
+
+def _matches(arg, names):
+    """Whether an option (or a unique-prefix abbreviation argparse accepts) is one of names."""
+    return any(arg == name or (arg.startswith("--") and len(arg) > 2 and name.startswith(arg))
+               for name in names)
+
+
+def _absolutize(cli, argv):
+    """Make the client-relative paths among argv absolute for the server."""
+    spec = PATH_ARGS.get((cli, argv[0]))
+    if spec is None:
+        return argv
+    path_options, value_options, first_path = spec
+
+    out = [argv[0]]
+    positional = 0
+    expect = None  # "path" or "value" when the previous option takes one
+    options_done = False
+    for arg in argv[1:]:
+        if expect:
+            out.append(os.path.abspath(arg) if expect == "path" else arg)
+            expect = None
+        elif arg == "--" and not options_done:
+            options_done = True
+            out.append(arg)
+        elif arg.startswith("-") and arg != "-" and not options_done:
+            name, eq, value = arg.partition("=")
+            if _matches(name, path_options):
+                out.append(f"{name}={os.path.abspath(value)}" if eq else arg)
+                expect = None if eq else "path"
+            else:
+                out.append(arg)
+                expect = "value" if not eq and _matches(name, value_options) else None
+        else:
+            is_path = first_path is not None and positional >= first_path
+            out.append(os.path.abspath(arg) if is_path else arg)
+            positional += 1
+    return out
+
+
+def forward(cli, argv=None):
+    """
+    Run a CLI command on the resident server, exiting with its status.
+
+    Returns (without exiting) when no server is running or the server
+    refuses the request before running it (another vault), so the caller
+    can run the command locally. A failure after the request was sent
+    exits with an error instead: the command may already have run.
+
+    Args:
+        cli: CLI name ("obsidian" or "voice")
+        argv: Arguments (defaults to sys.argv[1:])
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        return
+    try:
+        result = rpc.call(SOCKET_PATH, "run", cli=cli, argv=_absolutize(cli, argv), vault=VAULT_PATH)
+    except rpc.Unavailable:
+        return
+    except (RuntimeError, OSError) as e:
+        # The command may already have run (and written), so don't repeat it
+        print(f"Skill server failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    if "refused" in result:
+        return
+
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    sys.stdout.flush()
+    sys.exit(result["exit"])
+
+
+class _ThreadStream:
+    """sys.stdout/stderr stand-in that writes to a per-thread buffer when one is set."""
+
+    def __init__(self, default, name):
+        self._default = default
+        self._name = name
+
+    def _target(self):
+        return getattr(_local, self._name, None) or self._default
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        return self._target().flush()
+
+    def __getattr__(self, attr):
+        return getattr(self._target(), attr)
+
+
+_local = None
+_modules = {}
+_stats = {"started": None, "requests": 0, "by_cli": {}}
+
+
+def _load_cli(cli):
+    """Import a CLI script as a module (once per server)."""
+    import importlib.util
+
+    if cli not in _modules:
+        spec = importlib.util.spec_from_file_location(f"{cli}_cli", CLIS[cli])
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[cli] = module
+    return _modules[cli]
+
+
+def _run(cli, argv, vault=None):
+    """Execute one CLI invocation, capturing its output and exit status."""
+    import io
+    import traceback
+
+    if vault is not None and os.path.realpath(vault) != os.path.realpath(VAULT_PATH):
+        return {"refused": f"Server serves vault {VAULT_PATH}, not {vault}"}
+    if cli not in CLIS:
+        raise ValueError(f"Unknown CLI: {cli}")
+
+    module = _load_cli(cli)
+    out, err = io.StringIO(), io.StringIO()
+    _local.stdout, _local.stderr = out, err
+    try:
+        module.main(argv)
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=err)
+            code = 1
+    except Exception:
+        traceback.print_exc(file=err)
+        code = 1
+    finally:
+        _local.stdout = _local.stderr = None
+
+    _stats["requests"] += 1
+    _stats["by_cli"][cli] = _stats["by_cli"].get(cli, 0) + 1
+    return {"stdout": out.getvalue(), "stderr": err.getvalue(), "exit": code}
+
+
+def _server_stats():
+    import time
+    return {
+        "pid": os.getpid(),
+        "vault": VAULT_PATH,
+        "uptime": round(time.time() - _stats["started"], 1),
+        "requests": _stats["requests"],
+        "by_cli": _stats["by_cli"],
+        "loaded": sorted(_modules),
+    }
+
+
+def serve(socket_path=None, preload=("obsidian",)):
+    """
+    Run the skill server in the foreground until interrupted.
+
+    Args:
+        socket_path: Override the socket location
+        preload: CLIs to import before accepting requests
+    """
+    import threading
+    import time
+
+    global _local
+    _local = threading.local()
+    sys.stdout = _ThreadStream(sys.stdout, "stdout")
+    sys.stderr = _ThreadStream(sys.stderr, "stderr")
+
+    for cli in preload:
+        _load_cli(cli)
+
+    _stats["started"] = time.time()
+    rpc.serve(socket_path or SOCKET_PATH, {"run": _run, "stats": _server_stats})
+
+
+def is_running(socket_path=None):
+    """Check whether the skill server answers on the socket."""
+    return rpc.is_running(socket_path or SOCKET_PATH)
@@ -0,0 +1,289 @@
+"""Opt-in timing spans for skill operations.
+
+With NAZAR_TIMING=1, instrumented operations (config load, note writes,
+Whisper load and decode, Piper synthesis, Opus encoding, ...) record a span:
+its name, duration and attributes such as bytes, model and audio seconds.
+Each span is appended as one JSON line to $NAZAR_TIMING_LOG. Aggregated
+counts and duration histograms are merged into a state file shared by all
+processes and rendered as a Prometheus text file ($NAZAR_METRICS_FILE) for
+node_exporter's textfile collector. Export happens at process exit and at
+most every FLUSH_SECONDS in long-running daemons.
+
+Disabled (the default), span() and timed() cost one flag check.
+"""
+
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+# Same default as obsidian.CACHE_PATH; obsidian.py imports this module, so it
+# cannot import from obsidian at load time
+CACHE_PATH = os.environ.get(
+    "NAZAR_CACHE_DIR", f"{os.environ.get('VAULT_PATH', '/vault')}/99-system/openclaw/cache"
+)
+
+ENABLED = os.environ.get("NAZAR_TIMING", "0") == "1"
+TIMING_LOG = os.environ.get("NAZAR_TIMING_LOG", os.path.join(CACHE_PATH, "timing.jsonl"))
+METRICS_PATH = os.environ.get("NAZAR_METRICS_FILE", os.path.join(CACHE_PATH, "nazar.prom"))
+STATE_PATH = os.path.join(os.path.dirname(TIMING_LOG), "timing-state.json")
+FLUSH_SECONDS = 10.0
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Numeric span attributes that are also exported as counters
+COUNTED = ("bytes", "audio_seconds", "characters")
+
+_local = threading.local()
+_lock = threading.Lock()
+_pending = {}
+_last_flush = [time.monotonic()]
+_registered = [False]
+
+
+def process_age():
+    """Seconds since this process started (Linux /proc), or None."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Field 22 (starttime, in clock ticks); the name field may contain spaces
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _aggregate(name, seconds, attrs, error):
+    entry = _pending.setdefault(name, {"count": 0, "sum": 0.0, "errors": 0,
+                                       "buckets": [0] * len(BUCKETS), "counters": {}})
+    entry["count"] += 1
+    entry["sum"] += seconds
+    entry["errors"] += int(error)
+    for i, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            entry["buckets"][i] += 1
+            break
+    for key in COUNTED:
+        value = attrs.get(key)
+        if isinstance(value, (int, float)):
+            entry["counters"][key] = entry["counters"].get(key, 0) + value
+
+
+def record(name, seconds, error=False, **attrs):
+    """
+    Record a finished span (no-op unless NAZAR_TIMING=1).
+
+    Args:
+        name: Dotted span name, e.g. "whisper.decode"
+        seconds: Duration in seconds
+        error: Whether the operation raised
+        **attrs: JSON-serializable attributes (bytes, model, audio_seconds, ...)
+    """
+    if not ENABLED:
+        return
+    stack = getattr(_local, "stack", None)
+    line = {"ts": round(time.time(), 3), "span": name, "ms": round(seconds * 1000, 3),
+            "pid": os.getpid(), **attrs}
+    if stack:
+        line["parent"] = stack[-1]
+    if error:
+        line["error"] = True
+
+    try:
+        os.makedirs(os.path.dirname(TIMING_LOG), exist_ok=True)
+        # One write per line on an O_APPEND fd, so concurrent processes don't interleave
+        fd = os.open(TIMING_LOG, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (json.dumps(line, default=str) + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+    with _lock:
+        _aggregate(name, seconds, attrs, error)
+        if not _registered[0]:
+            atexit.register(flush)
+            _registered[0] = True
+        due = time.monotonic() - _last_flush[0] >= FLUSH_SECONDS
+    if due:
+        flush()
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time a block as a span.
+
+    Yields a dict of attributes the block can fill in as it learns them
+    (e.g. audio duration after decoding); they are recorded when it ends.
+    """
+    if not ENABLED:
+        yield attrs
+        return
+    stack = _local.__dict__.setdefault("stack", [])
+    stack.append(name)
+    start = time.perf_counter()
+    error = False
+    try:
+        yield attrs
+    except BaseException:
+        error = True
+        raise
+    finally:
+        stack.pop()
+        record(name, time.perf_counter() - start, error, **attrs)
+
+
+def timed(name):
+    """Decorator form of span() for functions without extra attributes."""
+    def decorator(func):
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with span(name):
+                return func(*args, **kwargs)
+        wrapper.__name__ = func.__name__
+        wrapper.__doc__ = func.__doc__
+        wrapper.__wrapped__ = func
+        return wrapper
+    return decorator
+
+
+def startup(command):
+    """Record the time from process start to now as a process.startup span."""
+    if ENABLED:
+        age = process_age()
+        if age is not None:
+            record("process.startup", age, command=command)
+
+
+def _merge(state, pending):
+    for name, entry in pending.items():
+        total = state.setdefault(name, {"count": 0, "sum": 0.0, "errors": 0,
+                                        "buckets": [0] * len(BUCKETS), "counters": {}})
+        total["count"] += entry["count"]
+        total["sum"] += entry["sum"]
+        total["errors"] += entry["errors"]
+        total["buckets"] = [a + b for a, b in zip(total["buckets"], entry["buckets"])]
+        for key, value in entry["counters"].items():
+            total["counters"][key] = total["counters"].get(key, 0) + value
+    return state
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render(state):
+    """Prometheus text exposition of the aggregated spans."""
+    lines = [
+        "# HELP nazar_span_duration_seconds Duration of Nazar skill operations.",
+        "# TYPE nazar_span_duration_seconds histogram",
+    ]
+    for name in sorted(state):
+        entry = state[name]
+        label = f'span="{_escape(name)}"'
+        cumulative = 0
+        for bound, count in zip(BUCKETS, entry["buckets"]):
+            cumulative += count
+            lines.append(f'nazar_span_duration_seconds_bucket{{{label},le="{bound:g}"}} {cumulative}')
+        lines.append(f'nazar_span_duration_seconds_bucket{{{label},le="+Inf"}} {entry["count"]}')
+        lines.append(f'nazar_span_duration_seconds_sum{{{label}}} {entry["sum"]:.6f}')
+        lines.append(f'nazar_span_duration_seconds_count{{{label}}} {entry["count"]}')
+
+    lines += ["# HELP nazar_span_errors_total Skill operations that raised.",
+              "# TYPE nazar_span_errors_total counter"]
+    lines += [f'nazar_span_errors_total{{span="{_escape(name)}"}} {state[name]["errors"]}'
+              for name in sorted(state)]
+
+    for key in COUNTED:
+        rows = [(name, state[name]["counters"][key]) for name in sorted(state)
+                if key in state[name]["counters"]]
+        if rows:
+            lines += [f"# HELP nazar_span_{key}_total Total {key.replace('_', ' ')} handled per operation.",
+                      f"# TYPE nazar_span_{key}_total counter"]
+            lines += [f'nazar_span_{key}_total{{span="{_escape(name)}"}} {value:g}' for name, value in rows]
+    return "\n".join(lines) + "\n"
+
+
+def flush():
+    """Merge this process's aggregates into the shared state and rewrite the metrics file."""
+    import fcntl
+
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _last_flush[0] = time.monotonic()
+    if not pending:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+        with open(STATE_PATH, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                state = json.loads(f.read() or "{}")
+            except ValueError:
+                state = {}
+            state = _merge(state, pending)
+            f.seek(0)
+            f.truncate()
+            json.dump(state, f)
+            f.flush()
+
+            # Still under the lock: the textfile collector must never see a partial file
+            os.makedirs(os.path.dirname(METRICS_PATH) or ".", exist_ok=True)
+            tmp = f"{METRICS_PATH}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as out:
+                out.write(render(state))
+            os.replace(tmp, METRICS_PATH)
+    except OSError as e:
+        print(f"timing: could not export metrics: {e}", file=sys.stderr)
+
+
+def summary(limit=None, log_path=None):
+    """
+    Summarize recent spans from the JSON-lines log.
+
+    Args:
+        limit: Only the last N spans (None for the whole log)
+        log_path: Log file (defaults to NAZAR_TIMING_LOG)
+
+    Returns:
+        Dict of span name -> {count, total_ms, median_ms, p95_ms, max_ms}
+    """
+    import math
+    import statistics
+    from collections import deque
+
+    durations = {}
+    try:
+        with open(log_path or TIMING_LOG, "r", encoding="utf-8") as f:
+            lines = deque(f, maxlen=limit) if limit else f.readlines()
+    except FileNotFoundError:
+        return {}
+    for line in lines:
+        try:
+            item = json.loads(line)
+        except ValueError:
+            continue
+        durations.setdefault(item["span"], []).append(item["ms"])
+
+    result = {}
+    for name, values in sorted(durations.items()):
+        values.sort()
+        result[name] = {
+            "count": len(values),
+            "total_ms": round(sum(values), 1),
+            "median_ms": round(statistics.median(values), 2),
+            "p95_ms": round(values[math.ceil(len(values) * 0.95) - 1], 2),
+            "max_ms": round(values[-1], 2),
+        }
+    return result
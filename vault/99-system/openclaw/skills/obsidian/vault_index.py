@@ -0,0 +1,802 @@
+"""Persistent index of vault notes backed by SQLite.
+
+Stores path, mtime, size, title, frontmatter, tags, wikilinks and the byte
+offsets of headings and daily-note entries for every Markdown note so
+lookups, listings and section reads don't walk or re-parse the vault, plus an FTS5
+full-text index over titles, bodies and frontmatter for ranked search. The index is
+refreshed incrementally: a shallow refresh stats directories only and
+re-lists those whose mtime changed; a deep refresh also stats every note
+and re-parses the ones whose mtime or size changed. Queries start with
+catch_up(): a shallow refresh plus the notes the change feed saw modified.
+"""
+
+import os
+import re
+import json
+import sqlite3
+from contextlib import closing
+
+from obsidian import VAULT_PATH, CACHE_PATH
+
+INDEX_PATH = os.environ.get("VAULT_INDEX_PATH", os.path.join(CACHE_PATH, "vault-index.sqlite"))
+
+# Never indexed: Obsidian config, trash, Syncthing internals and our own caches
+SKIP_DIRS = {'.obsidian', '.trash', '.stversions', '.stfolder', '.git'}
+
+DAILY_NAME = re.compile(r'^(\d{4}-\d{2}-\d{2})\.md$')
+WIKILINK = re.compile(r'!?\[\[([^\]|#^]+)(?:[#^][^\]|]*)?(?:\|[^\]]*)?\]\]')
+INLINE_TAG = re.compile(r'(?<![\w/#&])#([A-Za-z_][\w/-]*)')
+HEADING = re.compile(r'^#\s+(.+?)\s*#*\s*$', re.M)
+# Headings, "**[HH:MM]**" daily-note entries and code fences (which hide headings)
+OUTLINE = re.compile(
+    rb'^(?:(#{1,6})[ \t]+(.+?)[ \t]*#*[ \t]*|\*\*\[(\d{1,2}:\d{2})\]\*\*.*|(```|~~~).*)\r?$', re.M
+)
+# Outline level of daily-note entries: below every heading level
+ENTRY_LEVEL = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    folder TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    title TEXT,
+    frontmatter TEXT,
+    daily_date TEXT
+);
+CREATE INDEX IF NOT EXISTS notes_folder ON notes(folder);
+CREATE INDEX IF NOT EXISTS notes_daily ON notes(daily_date);
+CREATE INDEX IF NOT EXISTS notes_name ON notes(name);
+CREATE TABLE IF NOT EXISTS tags (
+    path TEXT NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags(tag);
+CREATE INDEX IF NOT EXISTS tags_path ON tags(path);
+-- name: lowercased last component of the target, matched against notes.name
+CREATE TABLE IF NOT EXISTS links (
+    path TEXT NOT NULL,
+    target TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS links_path ON links(path);
+CREATE INDEX IF NOT EXISTS links_name ON links(name);
+-- offset: byte offset of the heading/entry line; level: 1-6, or 7 for entries
+CREATE TABLE IF NOT EXISTS outline (
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outline_path ON outline(path);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL
+);
+-- feed_cursor: change-feed sequence number catch_up() has applied
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+-- rowid = notes.id; prefix indexes keep short "word*" queries fast
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title,
+    body,
+    frontmatter,
+    tokenize = 'porter unicode61 remove_diacritics 2',
+    prefix = '3 4'
+);
+"""
+
+# Bumped on every schema change; older databases are dropped and rebuilt
+# by the next refresh (the index only holds data derived from the vault).
+SCHEMA_VERSION = 3
+
+# bm25 column weights: title, body, frontmatter
+BM25_WEIGHTS = (10.0, 1.0, 2.0)
+
+# Embeds of these are attachments, not links to notes
+ATTACHMENT_EXTENSIONS = {
+    'png', 'jpg', 'jpeg', 'gif', 'bmp', 'svg', 'webp', 'pdf', 'mp3', 'ogg', 'opus', 'm4a',
+    'wav', 'flac', 'webm', 'mp4', 'mov', 'mkv', 'canvas',
+}
+
+# Shorter final words are matched exactly: a 1-2 letter prefix expands to
+# most of the vocabulary and makes ranking slow.
+MIN_PREFIX = 3
+
+
+def connect():
+    """Open the index database, creating the schema on first use."""
+    os.makedirs(os.path.dirname(INDEX_PATH), exist_ok=True)
+    conn = sqlite3.connect(INDEX_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        with conn:
+            for table in ('notes', 'tags', 'links', 'outline', 'dirs', 'meta', 'notes_fts'):
+                conn.execute(f"DROP TABLE IF EXISTS {table}")
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def relative(path):
+    """Vault-relative form of a path (accepts absolute or relative)."""
+    if os.path.isabs(path):
+        return os.path.relpath(path, VAULT_PATH)
+    return os.path.normpath(path)
+
+
+def note_name(path):
+    """Link-matching key of a note: lowercased file name without .md."""
+    name = os.path.basename(path).lower()
+    return name[:-3] if name.endswith('.md') else name
+
+
+def link_key(target):
+    """Lowercased link target without .md (keeps a folder prefix if given)."""
+    key = target.strip().lower()
+    return key[:-3] if key.endswith('.md') else key
+
+
+def is_attachment(target):
+    """Whether a link target is an embedded file rather than a note."""
+    return target.rsplit('.', 1)[-1].lower() in ATTACHMENT_EXTENSIONS if '.' in target else False
+
+
+def _skip_dir(rel_dir):
+    cache_rel = os.path.relpath(CACHE_PATH, VAULT_PATH)
+    return os.path.basename(rel_dir) in SKIP_DIRS or rel_dir == cache_rel
+
+
+def parse_frontmatter(text):
+    """
+    Split YAML frontmatter from a note body.
+
+    Handles the simple `key: value`, `key: [a, b]` and `- item` list forms
+    used by the vault templates; values stay strings.
+
+    Returns:
+        Tuple of (frontmatter dict, body text)
+    """
+    if not text.startswith('---\n'):
+        return {}, text
+    end = text.find('\n---', 4)
+    if end == -1:
+        return {}, text
+
+    meta = {}
+    key = None
+    for line in text[4:end].splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('#'):
+            continue
+        if stripped.startswith('- ') and key is not None:
+            if not isinstance(meta.get(key), list):
+                meta[key] = []
+            meta[key].append(stripped[2:].strip().strip('"\''))
+            continue
+        if ':' in line and not line.startswith((' ', '\t')):
+            key, _, value = line.partition(':')
+            key = key.strip()
+            value = value.strip()
+            if value.startswith('[') and value.endswith(']'):
+                meta[key] = [v.strip().strip('"\'') for v in value[1:-1].split(',') if v.strip()]
+            else:
+                meta[key] = value.strip('"\'')
+
+    body_start = text.find('\n', end + 1)
+    return meta, text[body_start + 1:] if body_start != -1 else ''
+
+
+def parse_note(text, filename):
+    """
+    Extract indexable metadata from note text.
+
+    Returns:
+        Dict with title, frontmatter, body, tags (set) and links (set)
+    """
+    meta, body = parse_frontmatter(text)
+
+    title = meta.get('title') if isinstance(meta.get('title'), str) else None
+    if not title:
+        match = HEADING.search(body)
+        title = match.group(1) if match else os.path.splitext(filename)[0]
+
+    tags = set()
+    fm_tags = meta.get('tags', [])
+    if isinstance(fm_tags, str):
+        fm_tags = [t for t in re.split(r'[,\s]+', fm_tags) if t]
+    tags.update(t.lstrip('#') for t in fm_tags)
+    tags.update(INLINE_TAG.findall(body))
+
+    links = {link.strip() for link in WIKILINK.findall(text) if link.strip()}
+
+    return {"title": title, "frontmatter": meta, "body": body, "tags": tags, "links": links}
+
+
+def parse_outline(raw):
+    """
+    Headings and daily-note entries of a note with their byte offsets.
+
+    Headings inside frontmatter or fenced code blocks are ignored.
+
+    Args:
+        raw: Note content as bytes
+
+    Returns:
+        List of (offset, line, level, title) in file order; entries have
+        level ENTRY_LEVEL and their "HH:MM" as title
+    """
+    skip_to = 0
+    if raw.startswith(b'---\n'):
+        end = raw.find(b'\n---', 4)
+        skip_to = end + 4 if end != -1 else 0
+
+    outline, fence, line, counted = [], None, 1, 0
+    for match in OUTLINE.finditer(raw, skip_to):
+        line += raw.count(b'\n', counted, match.start())
+        counted = match.start()
+        marker = match.group(4)
+        if marker:
+            if fence is None:
+                fence = marker
+            elif fence == marker:
+                fence = None
+        elif fence:
+            continue
+        elif match.group(1):
+            outline.append((match.start(), line, len(match.group(1)),
+                            match.group(2).decode('utf-8', errors='replace')))
+        else:
+            outline.append((match.start(), line, ENTRY_LEVEL, match.group(3).decode('ascii')))
+    return outline
+
+
+def _index_file(conn, rel, st):
+    full = os.path.join(VAULT_PATH, rel)
+    try:
+        with open(full, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        _remove(conn, rel)
+        return
+    # Same text as reading in text mode (universal newlines); offsets come from the bytes
+    text = raw.decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+
+    parsed = parse_note(text, os.path.basename(rel))
+    daily = DAILY_NAME.match(os.path.basename(rel))
+
+    note_id = conn.execute(
+        "INSERT INTO notes (path, folder, mtime, size, name, title, frontmatter, daily_date) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, size = excluded.size, "
+        "title = excluded.title, frontmatter = excluded.frontmatter, daily_date = excluded.daily_date "
+        "RETURNING id",
+        (rel, os.path.dirname(rel), st.st_mtime, st.st_size, note_name(rel), parsed["title"],
+         json.dumps(parsed["frontmatter"], ensure_ascii=False), daily.group(1) if daily else None),
+    ).fetchone()[0]
+    conn.execute("DELETE FROM tags WHERE path = ?", (rel,))
+    conn.execute("DELETE FROM links WHERE path = ?", (rel,))
+    conn.execute("DELETE FROM outline WHERE path = ?", (rel,))
+    conn.executemany("INSERT INTO tags (path, tag) VALUES (?, ?)", [(rel, t) for t in parsed["tags"]])
+    conn.executemany(
+        "INSERT INTO links (path, target, name) VALUES (?, ?, ?)",
+        [(rel, l, link_key(l).rsplit('/', 1)[-1]) for l in parsed["links"]],
+    )
+    conn.executemany(
+        "INSERT INTO outline (path, offset, line, level, title) VALUES (?, ?, ?, ?, ?)",
+        [(rel, *row) for row in parse_outline(raw)],
+    )
+
+    frontmatter_text = " ".join(
+        f"{k} {' '.join(v) if isinstance(v, list) else v}" for k, v in parsed["frontmatter"].items()
+    )
+    # Full-text rows share the note's id as their rowid
+    conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+    conn.execute(
+        "INSERT INTO notes_fts (rowid, title, body, frontmatter) VALUES (?, ?, ?, ?)",
+        (note_id, parsed["title"], parsed["body"], frontmatter_text),
+    )
+
+
+def _remove(conn, rel):
+    conn.execute("DELETE FROM notes_fts WHERE rowid IN (SELECT id FROM notes WHERE path = ?)", (rel,))
+    for table in ('notes', 'tags', 'links', 'outline'):
+        conn.execute(f"DELETE FROM {table} WHERE path = ?", (rel,))
+
+
+def _remove_dir(conn, rel_dir):
+    prefix = rel_dir + '/'
+    conn.execute(
+        "DELETE FROM notes_fts WHERE rowid IN (SELECT id FROM notes WHERE substr(path, 1, ?) = ?)",
+        (len(prefix), prefix),
+    )
+    for table in ('notes', 'tags', 'links', 'outline'):
+        conn.execute(f"DELETE FROM {table} WHERE substr(path, 1, ?) = ?", (len(prefix), prefix))
+    conn.execute("DELETE FROM dirs WHERE path = ? OR substr(path, 1, ?) = ?", (rel_dir, len(prefix), prefix))
+
+
+def refresh(folder=None, deep=True):
+    """
+    Bring the index up to date with the filesystem.
+
+    Args:
+        folder: Vault-relative folder to refresh (defaults to the whole vault)
+        deep: Also stat unchanged directories' notes to catch edits; a
+            shallow refresh only picks up added/removed files
+
+    Returns:
+        Dict with counts of notes indexed and removed
+    """
+    root = relative(folder) if folder else '.'
+    stats = {"indexed": 0, "removed": 0}
+
+    with closing(connect()) as conn, conn:
+        known_dirs = dict(conn.execute("SELECT path, mtime FROM dirs"))
+        children = {}
+        for d in known_dirs:
+            if d != '.':
+                children.setdefault(os.path.dirname(d) or '.', []).append(d)
+
+        stack = [root]
+        while stack:
+            rel_dir = stack.pop()
+            full_dir = os.path.join(VAULT_PATH, rel_dir)
+            try:
+                dir_mtime = os.stat(full_dir).st_mtime
+            except FileNotFoundError:
+                _remove_dir(conn, rel_dir)
+                continue
+
+            if not deep and known_dirs.get(rel_dir) == dir_mtime:
+                # Unchanged listing: only descend into known subdirectories
+                stack.extend(children.get(rel_dir, []))
+                continue
+
+            folder_key = '' if rel_dir == '.' else rel_dir
+            prefix = folder_key + '/' if folder_key else ''
+            indexed = {
+                path: (mtime, size) for path, mtime, size in
+                conn.execute("SELECT path, mtime, size FROM notes WHERE folder = ?", (folder_key,))
+            }
+            seen, subdirs = set(), set()
+            with os.scandir(full_dir) as entries:
+                for entry in entries:
+                    rel = prefix + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.') and not _skip_dir(rel):
+                            subdirs.add(rel)
+                    elif entry.name.endswith('.md'):
+                        seen.add(rel)
+                        st = entry.stat()
+                        if indexed.get(rel) != (st.st_mtime, st.st_size):
+                            _index_file(conn, rel, st)
+                            stats["indexed"] += 1
+
+            for rel in set(indexed) - seen:
+                _remove(conn, rel)
+                stats["removed"] += 1
+            for gone in set(children.get(rel_dir, [])) - subdirs:
+                _remove_dir(conn, gone)
+
+            stack.extend(subdirs)
+            conn.execute("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", (rel_dir, dir_mtime))
+
+    return stats
+
+
+def catch_up(folder=None):
+    """
+    Cheap refresh before a query.
+
+    A shallow refresh picks up added and removed notes. Notes edited in
+    place (Obsidian, Syncthing) don't change their directory's mtime, so
+    while the change-feed watcher runs, the notes it journaled as changed
+    since the last catch-up are re-indexed as well. Without a watcher such
+    edits wait for a deep refresh (`index refresh`); a first catch-up, or
+    one whose cursor the feed no longer holds, runs the deep refresh.
+
+    Args:
+        folder: Vault-relative folder for the shallow refresh
+
+    Returns:
+        Dict with counts of notes indexed and removed
+    """
+    import changes
+
+    if not changes.watcher_running():
+        return refresh(folder, deep=False)
+
+    with closing(connect()) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'feed_cursor'").fetchone()
+    cursor = int(row[0]) if row else None
+
+    if cursor is None:
+        # Everything journaled so far is covered by the deep refresh
+        cursor = changes.feed_stats()["cursor"]
+        stats = refresh()
+    else:
+        stats = refresh(folder, deep=False)
+        paths = set()
+        while True:
+            feed = changes.changes(since=cursor, limit=5000, refresh=False)
+            if feed["reset"]:
+                stats = refresh()
+                paths.clear()
+            for change in feed["changes"]:
+                paths.update(p for p in (change["path"], change["old_path"]) if p and p.endswith('.md'))
+            cursor = feed["cursor"]
+            if not feed["more"]:
+                break
+        with closing(connect()) as conn, conn:
+            for rel in sorted(paths):
+                try:
+                    st = os.stat(os.path.join(VAULT_PATH, rel))
+                except FileNotFoundError:
+                    if conn.execute("SELECT 1 FROM notes WHERE path = ?", (rel,)).fetchone():
+                        _remove(conn, rel)
+                        stats["removed"] += 1
+                    continue
+                known = conn.execute("SELECT mtime, size FROM notes WHERE path = ?", (rel,)).fetchone()
+                if known != (st.st_mtime, st.st_size):
+                    _index_file(conn, rel, st)
+                    stats["indexed"] += 1
+
+    with closing(connect()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('feed_cursor', ?)", (str(cursor),))
+    return stats
+
+
+def update_note(path):
+    """Re-index a single note after it was written (or drop it if deleted)."""
+    rel = relative(path)
+    with closing(connect()) as conn, conn:
+        try:
+            st = os.stat(os.path.join(VAULT_PATH, rel))
+        except FileNotFoundError:
+            _remove(conn, rel)
+            return
+        _index_file(conn, rel, st)
+
+
+def _filters(folder=None, tag=None, start=None, end=None, daily_only=False):
+    """Build (joins, where clauses, params) for the common note filters on alias n."""
+    joins, where, params = "", [], []
+    if tag:
+        joins += " JOIN tags t ON t.path = n.path"
+        where.append("t.tag = ?")
+        params.append(tag.lstrip('#'))
+    if folder:
+        prefix = relative(folder).rstrip('/')
+        where.append("(n.folder = ? OR substr(n.folder, 1, ?) = ?)")
+        params += [prefix, len(prefix) + 1, prefix + '/']
+    if daily_only or start or end:
+        where.append("n.daily_date IS NOT NULL")
+    if start:
+        where.append("n.daily_date >= ?")
+        params.append(str(start))
+    if end:
+        where.append("n.daily_date <= ?")
+        params.append(str(end))
+    return joins, where, params
+
+
+def query_notes(folder=None, tag=None, start=None, end=None, daily_only=False):
+    """
+    Query indexed notes.
+
+    Args:
+        folder: Vault-relative folder prefix (includes subfolders)
+        tag: Only notes carrying this tag (frontmatter or inline)
+        start: Earliest daily-note date, 'YYYY-MM-DD' (implies daily notes)
+        end: Latest daily-note date, 'YYYY-MM-DD' (implies daily notes)
+        daily_only: Only notes named YYYY-MM-DD.md
+
+    Returns:
+        List of dicts (path, mtime, size, title, daily_date), sorted by path
+    """
+    joins, where, params = _filters(folder, tag, start, end, daily_only)
+    sql = "SELECT DISTINCT n.path, n.mtime, n.size, n.title, n.daily_date FROM notes n" + joins
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY n.path"
+
+    with closing(connect()) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [
+        {"path": r[0], "mtime": r[1], "size": r[2], "title": r[3], "daily_date": r[4]}
+        for r in rows
+    ]
+
+
+def _match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, a longer last word as a prefix."""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    if len(words[-1]) >= MIN_PREFIX:
+        terms[-1] += '*'
+    return " ".join(terms)
+
+
+def search(query, folder=None, tag=None, start=None, end=None, limit=20, raw=False):
+    """
+    Full-text search over note titles, bodies and frontmatter.
+
+    Args:
+        query: Search text (all words must match; the last may be a prefix)
+        folder: Restrict to a vault-relative folder (includes subfolders)
+        tag: Restrict to notes with this tag
+        start: Restrict to daily notes from 'YYYY-MM-DD'
+        end: Restrict to daily notes up to 'YYYY-MM-DD'
+        limit: Maximum number of results
+        raw: Pass query to FTS5 unchanged (AND/OR/NOT, "phrases", NEAR)
+
+    Returns:
+        List of dicts (path, title, snippet, score), best match first
+    """
+    match = query if raw else _match_expression(query)
+    if not match:
+        return []
+
+    # Rank first, then build snippets for the top hits only: snippet() is
+    # far more expensive than bm25() and would otherwise run on every match.
+    joins, where, params = _filters(folder, tag, start, end)
+    sql = (
+        "SELECT n.id, n.path, n.title, bm25(notes_fts, {}) AS score "
+        "FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid{} "
+        "WHERE notes_fts MATCH ?"
+    ).format(", ".join(str(w) for w in BM25_WEIGHTS), joins)
+    if where:
+        sql += " AND " + " AND ".join(where)
+    sql += " ORDER BY score LIMIT ?"
+
+    with closing(connect()) as conn:
+        hits = conn.execute(sql, [match] + params + [limit]).fetchall()
+        if not hits:
+            return []
+        ids = [h[0] for h in hits]
+        snippets = dict(conn.execute(
+            "SELECT rowid, snippet(notes_fts, -1, '«', '»', '…', 12) FROM notes_fts "
+            f"WHERE notes_fts MATCH ? AND rowid IN ({','.join('?' * len(ids))})",
+            [match] + ids,
+        ))
+    return [
+        {"path": path, "title": title, "snippet": snippets.get(note_id, ''), "score": -score}
+        for note_id, path, title, score in hits
+    ]
+
+
+def get_note_info(path):
+    """
+    Indexed metadata for one note.
+
+    Returns:
+        Dict with path, mtime, size, title, frontmatter, tags and links, or None
+    """
+    rel = relative(path)
+    with closing(connect()) as conn:
+        row = conn.execute(
+            "SELECT path, mtime, size, title, frontmatter, daily_date FROM notes WHERE path = ?", (rel,)
+        ).fetchone()
+        if row is None:
+            return None
+        tags = [t for (t,) in conn.execute("SELECT tag FROM tags WHERE path = ? ORDER BY tag", (rel,))]
+        links = [l for (l,) in conn.execute("SELECT target FROM links WHERE path = ? ORDER BY target", (rel,))]
+    return {
+        "path": row[0], "mtime": row[1], "size": row[2], "title": row[3],
+        "frontmatter": json.loads(row[4] or '{}'), "daily_date": row[5],
+        "tags": tags, "links": links,
+    }
+
+
+def outline(path):
+    """
+    Indexed outline of a note.
+
+    Returns:
+        Tuple of ((mtime, size) the outline was taken at, list of
+        (offset, line, level, title)), or None if the note isn't indexed
+    """
+    rel = relative(path)
+    with closing(connect()) as conn:
+        stamp = conn.execute("SELECT mtime, size FROM notes WHERE path = ?", (rel,)).fetchone()
+        if stamp is None:
+            return None
+        rows = conn.execute(
+            "SELECT offset, line, level, title FROM outline WHERE path = ? ORDER BY offset", (rel,)
+        ).fetchall()
+    return tuple(stamp), rows
+
+
+def index_stats():
+    """Counts of indexed notes, tags and links."""
+    with closing(connect()) as conn:
+        notes, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM notes").fetchone()
+        tags = conn.execute("SELECT COUNT(DISTINCT tag) FROM tags").fetchone()[0]
+        links = conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+    return {"path": INDEX_PATH, "notes": notes, "bytes": size, "tags": tags, "links": links}
+
+
+def _pick(key, source, candidates):
+    """
+    Resolve a link key among notes sharing its name, the way Obsidian does.
+
+    A folder-qualified target must match the end of the note's path. Among
+    several matches a note in the linking note's folder wins, then the
+    shortest path.
+    """
+    if '/' in key:
+        candidates = [p for p in candidates
+                      if link_key(p) == key or link_key(p).endswith('/' + key)]
+    if len(candidates) <= 1:
+        return candidates[0] if candidates else None
+    folder = os.path.dirname(source)
+    same = [p for p in candidates if os.path.dirname(p) == folder]
+    return min(same or candidates, key=lambda p: (p.count('/'), p))
+
+
+def _notes_named(conn, names):
+    """Map note name -> list of paths for the given names."""
+    by_name = {}
+    names = list(set(names))
+    # Stay under SQLite's bound-parameter limit on huge link sets
+    for i in range(0, len(names), 500):
+        chunk = names[i:i + 500]
+        for name, path in conn.execute(
+            f"SELECT name, path FROM notes WHERE name IN ({','.join('?' * len(chunk))})", chunk
+        ):
+            by_name.setdefault(name, []).append(path)
+    return by_name
+
+
+def resolve_link(target, source=''):
+    """
+    Resolve a wikilink target to a note.
+
+    Args:
+        target: Link text as written, e.g. "Website" or "02-projects/Website"
+        source: Vault-relative path of the linking note (breaks ties)
+
+    Returns:
+        Vault-relative note path, or None if no note matches
+    """
+    key = link_key(target)
+    with closing(connect()) as conn:
+        candidates = _notes_named(conn, [key.rsplit('/', 1)[-1]])
+    return _pick(key, relative(source) if source else '', candidates.get(key.rsplit('/', 1)[-1], []))
+
+
+def backlinks(path):
+    """
+    Notes that link to a note.
+
+    Args:
+        path: Note path (vault-relative or absolute)
+
+    Returns:
+        List of dicts (path, title), sorted by path
+    """
+    rel = relative(path)
+    name = note_name(rel)
+    with closing(connect()) as conn:
+        rows = conn.execute(
+            "SELECT l.path, l.target, n.title FROM links l JOIN notes n ON n.path = l.path "
+            "WHERE l.name = ? ORDER BY l.path", (name,)
+        ).fetchall()
+        if not rows:
+            return []
+        candidates = _notes_named(conn, [name]).get(name, [])
+
+    result = {}
+    for source, target, title in rows:
+        if source not in result and _pick(link_key(target), source, candidates) == rel:
+            result[source] = {"path": source, "title": title}
+    return list(result.values())
+
+
+def outgoing_links(path):
+    """
+    Wikilinks and embeds in a note, with what they resolve to.
+
+    Returns:
+        List of dicts (target, path, attachment) sorted by target; path is
+        None for unresolved links and attachments
+    """
+    rel = relative(path)
+    with closing(connect()) as conn:
+        rows = conn.execute("SELECT target, name FROM links WHERE path = ? ORDER BY target", (rel,)).fetchall()
+        by_name = _notes_named(conn, [name for _, name in rows])
+    result = []
+    for target, name in rows:
+        attachment = is_attachment(target)
+        resolved = None if attachment else _pick(link_key(target), rel, by_name.get(name, []))
+        result.append({"target": target, "path": resolved, "attachment": attachment})
+    return result
+
+
+def unresolved_links(folder=None):
+    """
+    Links to notes that don't exist (yet), attachments excluded.
+
+    Args:
+        folder: Only links from notes under this vault-relative folder
+
+    Returns:
+        List of dicts (path, target) sorted by path then target
+    """
+    joins, where, params = _filters(folder)
+    where = " AND " + " AND ".join(where) if where else ""
+    with closing(connect()) as conn:
+        # Names no note carries can't resolve; folder-qualified targets need a path check
+        rows = conn.execute(
+            "SELECT l.path, l.target, l.name, "
+            "EXISTS (SELECT 1 FROM notes m WHERE m.name = l.name) AS named "
+            f"FROM links l JOIN notes n ON n.path = l.path{joins} "
+            f"WHERE (NOT named OR instr(l.target, '/') > 0){where} ORDER BY l.path, l.target",
+            params,
+        ).fetchall()
+        by_name = _notes_named(conn, [name for _, _, name, named in rows if named])
+    return [
+        {"path": path, "target": target}
+        for path, target, name, named in rows
+        if not is_attachment(target)
+        and (not named or _pick(link_key(target), path, by_name.get(name, [])) is None)
+    ]
+
+
+def orphans(folder=None, include_daily=False):
+    """
+    Notes no other note links to.
+
+    Args:
+        folder: Only notes under this vault-relative folder
+        include_daily: Also list daily notes (rarely linked, so left out by default)
+
+    Returns:
+        List of dicts (path, title), sorted by path
+    """
+    joins, where, params = _filters(folder)
+    if not include_daily:
+        where.append("n.daily_date IS NULL")
+    sql = (
+        "SELECT n.path, n.title, "
+        "EXISTS (SELECT 1 FROM links l WHERE l.name = n.name AND l.path != n.path) AS linked, "
+        "(SELECT COUNT(*) FROM notes m WHERE m.name = n.name) > 1 "
+        "OR EXISTS (SELECT 1 FROM links l WHERE l.name = n.name AND l.path != n.path "
+        "AND instr(l.target, '/')) AS ambiguous "
+        f"FROM notes n{joins}"
+    )
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY n.path"
+
+    with closing(connect()) as conn:
+        rows = conn.execute(sql, params).fetchall()
+        # A link to a shared name may resolve to a namesake, and a folder-qualified
+        # one may point elsewhere (or nowhere): check those notes properly
+        shared = [path for path, _, linked, ambiguous in rows if linked and ambiguous]
+        contested = {}
+        for path in shared:
+            name = note_name(path)
+            if name not in contested:
+                contested[name] = conn.execute(
+                    "SELECT path, target FROM links WHERE name = ?", (name,)
+                ).fetchall()
+        by_name = _notes_named(conn, list(contested))
+
+    result = []
+    for path, title, linked, ambiguous in rows:
+        if linked and ambiguous:
+            name = note_name(path)
+            linked = any(source != path and _pick(link_key(target), source, by_name[name]) == path
+                         for source, target in contested[name])
+        if not linked:
+            result.append({"path": path, "title": title})
+    return result
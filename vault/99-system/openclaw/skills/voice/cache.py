@@ -0,0 +1,351 @@
+"""Content-addressed caches of transcription results and synthesized speech.
+
+Transcripts are keyed by the SHA-256 of the audio bytes plus the model size
+and decode parameters, so a re-sent or re-processed recording is served
+without running Whisper again. Speech is keyed by normalized text, voice
+model and output format, so repeated agent phrases are sent as ready-made
+Opus files. Each kind lives in its own subdirectory; the cache is bounded by
+total size (speech also by its own cap) and evicts least-recently-used
+entries (mtime is bumped on hit). Hit/miss counters and a running size per
+kind are kept in counters.json, so a put only walks the cache when the
+tracked size goes over a limit (each eviction re-measures it).
+"""
+
+import os
+import json
+import fcntl
+import hashlib
+import unicodedata
+
+from obsidian import CACHE_PATH
+
+VOICE_CACHE_DIR = os.environ.get("VOICE_CACHE_DIR", os.path.join(CACHE_PATH, "voice"))
+VOICE_CACHE_MAX_MB = int(os.environ.get("VOICE_CACHE_MAX_MB", "200"))
+VOICE_TTS_CACHE_MAX_MB = int(os.environ.get("VOICE_TTS_CACHE_MAX_MB", "50"))
+
+TRANSCRIPTS_DIR = os.path.join(VOICE_CACHE_DIR, "transcripts")
+SPEECH_DIR = os.path.join(VOICE_CACHE_DIR, "speech")
+COUNTERS_PATH = os.path.join(VOICE_CACHE_DIR, "counters.json")
+
+# A put over a limit evicts down to this fraction of it, so a full cache
+# is walked once per tenth of its size written rather than on every put
+EVICT_TO = 0.9
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def transcript_key(audio_path, model, params):
+    """
+    Build the cache key for one transcription.
+
+    Args:
+        audio_path: Path to audio file
+        model: Model size
+        params: Decode parameters passed to WhisperModel.transcribe
+
+    Returns:
+        Hex key string
+    """
+    material = json.dumps(
+        {"audio": file_digest(audio_path), "model": model, "params": params},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def normalize_text(text):
+    """Normalize text for speech caching (Unicode NFC, collapsed whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def speech_key(text, model_path, fmt, params=None):
+    """
+    Build the cache key for one synthesized utterance.
+
+    Args:
+        text: Text being spoken
+        model_path: Piper voice model (its size and mtime are part of the key,
+            so replacing the voice invalidates its entries)
+        fmt: Output format ("ogg" or "wav")
+        params: Extra synthesis/encoding parameters
+
+    Returns:
+        Hex key string
+    """
+    try:
+        st = os.stat(model_path)
+        voice = [os.path.basename(model_path), st.st_size, st.st_mtime_ns]
+    except OSError:
+        voice = [os.path.basename(model_path)]
+    material = json.dumps(
+        {"text": normalize_text(text), "voice": voice, "format": fmt, "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+def _entry_path(directory, key, suffix):
+    return os.path.join(directory, key[:2], key + suffix)
+
+
+def _write_atomic(path, data):
+    import tempfile
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _entries(directory):
+    """List (path, size, mtime) for every cache entry under directory."""
+    entries = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith('.tmp') or os.path.join(root, name) == COUNTERS_PATH:
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+    return entries
+
+
+def _kind(path):
+    """Cache kind (top-level subdirectory) of an entry path."""
+    return os.path.relpath(path, VOICE_CACHE_DIR).split(os.sep, 1)[0]
+
+
+def _sizes(entries):
+    """Bytes per kind of a list of entries."""
+    sizes = {}
+    for path, size, _ in entries:
+        sizes[_kind(path)] = sizes.get(_kind(path), 0) + size
+    return sizes
+
+
+def evict(directory, max_bytes):
+    """
+    Delete least-recently-used entries until the directory fits max_bytes.
+
+    Also resets the tracked sizes of the kinds under directory to what is left.
+
+    Returns:
+        Tuple of (entries_removed, bytes_freed)
+    """
+    entries = sorted(_entries(directory), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for path, size, _ in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        removed += 1
+        freed += size
+
+    left = _sizes(entries[removed:])
+    whole = os.path.abspath(directory) == os.path.abspath(VOICE_CACHE_DIR)
+
+    def update(state):
+        sizes = state.setdefault("sizes", {})
+        if whole:
+            sizes.clear()
+        else:
+            sizes[os.path.basename(directory.rstrip(os.sep))] = 0
+        sizes.update(left)
+
+    _update_counters(update)
+    return removed, freed
+
+
+def _update_counters(update):
+    """Apply update(state) to counters.json under an exclusive lock; returns its result."""
+    os.makedirs(VOICE_CACHE_DIR, exist_ok=True)
+    with open(COUNTERS_PATH, 'a+', encoding='utf-8') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        f.seek(0)
+        try:
+            state = json.loads(f.read() or '{}')
+        except ValueError:
+            state = {}
+        result = update(state)
+        f.seek(0)
+        f.truncate()
+        f.write(json.dumps(state))
+    return result
+
+
+def _count(kind, hit):
+    """Record a hit or miss for a cache kind (shared across processes)."""
+    def update(state):
+        entry = state.setdefault(kind, {"hits": 0, "misses": 0})
+        entry["hits" if hit else "misses"] += 1
+
+    _update_counters(update)
+
+
+def _grow(kind, delta):
+    """
+    Add delta bytes to a kind's tracked size.
+
+    The first time, the sizes are measured by walking the cache instead.
+
+    Returns:
+        Dict of bytes per kind
+    """
+    def update(state):
+        sizes = state.get("sizes")
+        if sizes is None:
+            sizes = state["sizes"] = _sizes(_entries(VOICE_CACHE_DIR))
+        else:
+            sizes[kind] = sizes.get(kind, 0) + delta
+        return dict(sizes)
+
+    return _update_counters(update)
+
+
+def _put(directory, key, suffix, data):
+    """Write an entry, track its size and evict only when a limit is exceeded."""
+    path = _entry_path(directory, key, suffix)
+    try:
+        replaced = os.path.getsize(path)
+    except FileNotFoundError:
+        replaced = 0
+    _write_atomic(path, data)
+    sizes = _grow(_kind(path), len(data) - replaced)
+
+    total = sum(sizes.values())
+    speech_max, total_max = VOICE_TTS_CACHE_MAX_MB * 1024 * 1024, VOICE_CACHE_MAX_MB * 1024 * 1024
+    if sizes.get(_kind(SPEECH_DIR), 0) > speech_max:
+        total -= evict(SPEECH_DIR, int(speech_max * EVICT_TO))[1]
+    if total > total_max:
+        evict(VOICE_CACHE_DIR, int(total_max * EVICT_TO))
+    return path
+
+
+def counters():
+    """Hit/miss counters per cache kind."""
+    try:
+        with open(COUNTERS_PATH, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    state.pop("sizes", None)
+    return state
+
+
+def get_transcript(key):
+    """
+    Look up a cached transcription.
+
+    Returns:
+        Dict with "segments" and "info", or None on a miss
+    """
+    path = _entry_path(TRANSCRIPTS_DIR, key, '.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        _count("transcripts", False)
+        return None
+    os.utime(path)
+    _count("transcripts", True)
+    return entry
+
+
+def put_transcript(key, segments, info):
+    """
+    Store a transcription and keep the cache within its size limit.
+
+    Args:
+        key: Key from transcript_key()
+        segments: List of {"start", "end", "text"} dicts
+        info: Dict of transcription metadata (language, duration, ...)
+    """
+    data = json.dumps({"segments": segments, "info": info}, ensure_ascii=False).encode('utf-8')
+    _put(TRANSCRIPTS_DIR, key, '.json', data)
+
+
+def get_speech(key, fmt):
+    """
+    Look up cached synthesized speech.
+
+    Returns:
+        Path to the cached audio file, or None on a miss
+    """
+    path = _entry_path(SPEECH_DIR, key, '.' + fmt)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        _count("speech", False)
+        return None
+    _count("speech", True)
+    return path
+
+
+def put_speech(key, fmt, data):
+    """
+    Store synthesized speech and keep the caches within their size limits.
+
+    Args:
+        key: Key from speech_key()
+        fmt: Output format, used as the file extension
+        data: Encoded audio bytes
+
+    Returns:
+        Path to the cached audio file
+    """
+    return _put(SPEECH_DIR, key, '.' + fmt, data)
+
+
+def cache_stats():
+    """
+    Summarize cache usage.
+
+    Returns:
+        Dict with directory, limit and per-kind entry counts, sizes and
+        hit/miss counters
+    """
+    stats = {"dir": VOICE_CACHE_DIR, "max_mb": VOICE_CACHE_MAX_MB, "kinds": {}}
+    hits = counters()
+    if os.path.isdir(VOICE_CACHE_DIR):
+        for kind in sorted(os.listdir(VOICE_CACHE_DIR)):
+            if not os.path.isdir(os.path.join(VOICE_CACHE_DIR, kind)):
+                continue
+            entries = _entries(os.path.join(VOICE_CACHE_DIR, kind))
+            stats["kinds"][kind] = dict(
+                {"hits": 0, "misses": 0},
+                entries=len(entries),
+                mb=round(sum(size for _, size, _ in entries) / (1024 * 1024), 2),
+                **hits.get(kind, {}),
+            )
+    return stats
+
+
+def prune(max_mb=None):
+    """
+    Evict entries down to max_mb (defaults to the configured limit; 0 clears).
+
+    Returns:
+        Tuple of (entries_removed, bytes_freed)
+    """
+    limit = VOICE_CACHE_MAX_MB if max_mb is None else max_mb
+    return evict(VOICE_CACHE_DIR, limit * 1024 * 1024)
@@ -0,0 +1,115 @@
+"""Long-lived transcription daemon on a local Unix socket.
+
+The daemon keeps Whisper models warm (see models.py) so the CLI and
+transcribe.py only pay decode time. Requests and responses are single JSON
+lines (see obsidian/rpc.py). The client half of this module imports nothing
+heavy, so callers can probe for the daemon before deciding to load Whisper
+themselves.
+"""
+
+import os
+
+import rpc
+
+SOCKET_PATH = os.environ.get("VOICE_DAEMON_SOCKET", "/tmp/nazar-voice.sock")
+
+# Raised when no daemon is listening on the socket
+DaemonUnavailable = rpc.Unavailable
+
+
+def call(op, timeout=None, socket_path=None, **params):
+    """
+    Send one request to the daemon and return its result.
+
+    Args:
+        op: Operation name (transcribe, daily-note, transcribe-batch, speak, stats, ping)
+        timeout: Socket timeout in seconds (None waits for the decode)
+        socket_path: Override the socket location
+        **params: Operation arguments
+
+    Returns:
+        The "result" field of the daemon's response
+
+    Raises:
+        DaemonUnavailable: No daemon is listening
+        RuntimeError: The daemon reported an error
+    """
+    try:
+        return rpc.call(socket_path or SOCKET_PATH, op, timeout, **params)
+    except RuntimeError as e:
+        raise RuntimeError(f"Voice daemon error: {e}")
+
+
+def is_running(socket_path=None):
+    """Check whether a daemon answers on the socket."""
+    return rpc.is_running(socket_path or SOCKET_PATH)
+
+
+def _handlers():
+    """Map operation names to in-process implementations."""
+    import policy
+    import tts
+    import voice
+    from models import get_model, pool_stats
+
+    def transcribe(audio_path, model="auto", parallel=None):
+        return {"text": voice.transcribe_audio(audio_path, model, parallel)}
+
+    def daily_note(audio_path, model="auto", stream=False):
+        save = voice.transcribe_and_save_streaming if stream else voice.transcribe_and_save
+        path, timestamp, text = save(audio_path, model)
+        return {"path": path, "timestamp": timestamp, "text": text}
+
+    def transcribe_batch(sources, model="auto", workers=None, save=True):
+        results, summary = voice.transcribe_many(sources, model, workers, save)
+        return {"results": results, "summary": summary}
+
+    def segments(audio_path, model="auto"):
+        segs, info = voice.transcribe_segments(audio_path, model)
+        return dict(info, segments=[s._asdict() for s in segs])
+
+    def speak(text, output_file, model_path=None):
+        return {"path": voice.generate_speech(text, output_file, model_path)}
+
+    def speak_opus(text, opus_path, model_path=None):
+        return {"path": voice.generate_opus(text, opus_path, model_path)}
+
+    def preload(model="small"):
+        get_model(model)
+        return pool_stats()
+
+    def preload_tts(model_path=None):
+        tts.get_voice(model_path)
+        return stats()
+
+    def stats():
+        return dict(pool_stats(), tts_voices=tts.loaded_voices(), load=policy.current_load())
+
+    return {
+        "stats": stats,
+        "preload": preload,
+        "preload-tts": preload_tts,
+        "transcribe": transcribe,
+        "segments": segments,
+        "daily-note": daily_note,
+        "transcribe-batch": transcribe_batch,
+        "speak": speak,
+        "speak-opus": speak_opus,
+    }
+
+
+def serve(socket_path=None, preload_models=(), preload_tts=False):
+    """
+    Run the daemon in the foreground until interrupted.
+
+    Args:
+        socket_path: Override the socket location
+        preload_models: Model sizes to load before accepting requests
+        preload_tts: Load the default Piper voice before accepting requests
+    """
+    handlers = _handlers()
+    for size in preload_models:
+        handlers["preload"](size)
+    if preload_tts:
+        handlers["preload-tts"]()
+    rpc.serve(socket_path or SOCKET_PATH, handlers)
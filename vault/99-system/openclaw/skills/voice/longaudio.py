@@ -0,0 +1,250 @@
+"""Parallel transcription of one long recording across cores.
+
+A WhisperModel decodes a recording as one sequential beam search, so an
+hour-long meeting keeps a single core busy while the rest of the VPS idles.
+Here the recording is decoded once, cut into chunks of about CHUNK_SECONDS
+in the middle of pauses found by preprocess.speech_regions(), and the chunks
+are transcribed by a process pool in which every worker loads its own model.
+
+Each chunk owns the audio between its two cut points. Where no pause is
+close enough to a target, the cut is hard: the chunks on either side also
+decode OVERLAP_SECONDS past it, and a segment is kept only by the chunk that
+owns its midpoint, so overlapped speech is not transcribed twice. Segment
+times are mapped back to positions in the original file.
+"""
+
+import os
+from collections import namedtuple
+
+import preprocess
+import timing
+from models import get_model, MODEL_FOOTPRINT_MB, POOL_MAX_MB
+
+SAMPLE_RATE = preprocess.SAMPLE_RATE
+
+# Recordings at least this long are split when transcribe_segments() decides
+# on its own (0 never splits automatically)
+MIN_SECONDS = float(os.environ.get("VOICE_PARALLEL_MIN_SECONDS", "900"))
+CHUNK_SECONDS = float(os.environ.get("VOICE_CHUNK_SECONDS", "120"))
+
+# A cut goes in the longest pause within SEARCH_SECONDS of its target (the
+# nearest of equally long ones). Pauses shorter than MIN_GAP_SECONDS are not
+# trusted; without a usable one the cut is hard and both neighbours decode
+# OVERLAP_SECONDS across it.
+SEARCH_SECONDS = 20.0
+MIN_GAP_SECONDS = 0.3
+OVERLAP_SECONDS = 5.0
+
+# Chunks queued per worker; bounds the decoded audio held for the pool
+QUEUE_PER_WORKER = 2
+
+Chunk = namedtuple("Chunk", "start end own_start own_end")
+
+# Model settings of a pool worker process (set by _load_worker)
+_worker = {}
+
+
+def plan_chunks(length, regions, chunk_seconds=CHUNK_SECONDS):
+    """
+    Choose cut points for a recording.
+
+    Args:
+        length: Number of samples in the recording
+        regions: Speech regions from preprocess.speech_regions()
+        chunk_seconds: Target chunk length
+
+    Returns:
+        List of Chunk(start, end, own_start, own_end) in samples: the span to
+        decode (including any overlap) and the span whose segments it keeps
+    """
+    import numpy as np
+
+    chunk = max(int(chunk_seconds * SAMPLE_RATE), 1)
+    search = int(min(SEARCH_SECONDS, chunk_seconds / 4) * SAMPLE_RATE)
+    min_gap = int(MIN_GAP_SECONDS * SAMPLE_RATE)
+    overlap = int(OVERLAP_SECONDS * SAMPLE_RATE)
+
+    gap_starts, gap_ends = regions[:-1, 1], regions[1:, 0]
+    usable = gap_ends - gap_starts >= min_gap
+    gap_starts, gap_ends = gap_starts[usable], gap_ends[usable]
+    # Keep half the minimum gap of silence on each side of a cut
+    lows, highs = gap_starts + min_gap // 2, gap_ends - min_gap // 2
+
+    cuts = []
+    position = 0
+    # The last chunk may run to 1.5x the target rather than leave a stub
+    while length - position > chunk + chunk // 2:
+        target = position + chunk
+        candidates = np.clip(target, lows, highs)
+        distance = np.abs(candidates - target)
+        near = np.flatnonzero(distance <= search)
+        if len(near):
+            # Longest pause first, then the one closest to the target
+            best = near[np.lexsort((distance[near], -(gap_ends - gap_starts)[near]))[0]]
+            cuts.append((int(candidates[best]), False))
+        else:
+            cuts.append((target, True))
+        position = cuts[-1][0]
+
+    bounds = [(0, False)] + cuts + [(length, False)]
+    return [
+        Chunk(max(a - overlap, 0) if hard_a else a, min(b + overlap, length) if hard_b else b, a, b)
+        for (a, hard_a), (b, hard_b) in zip(bounds, bounds[1:])
+    ]
+
+
+def worker_count(model, parallel=True):
+    """
+    Number of pool workers for a model.
+
+    Args:
+        model: Model size
+        parallel: True for the default, or an explicit worker count
+
+    Returns:
+        Workers: the CPU count, capped so one model per worker fits in
+        WHISPER_POOL_MAX_MB, unless parallel gives the count
+    """
+    if parallel is not True:
+        return max(1, int(parallel))
+    cores = os.cpu_count() or 1
+    footprint = MODEL_FOOTPRINT_MB.get(model) or POOL_MAX_MB
+    return max(1, min(cores, POOL_MAX_MB // footprint))
+
+
+def _clip(regions, chunk):
+    """The parts of regions inside a chunk's decode span."""
+    import numpy as np
+
+    clipped = np.clip(regions, chunk.start, chunk.end)
+    return clipped[clipped[:, 1] > clipped[:, 0]]
+
+
+def _speech(samples, regions):
+    """Concatenated samples of regions."""
+    import numpy as np
+
+    return np.concatenate([samples[s:e] for s, e in regions]) if len(regions) else samples[:0]
+
+
+def _load_worker(model, compute_type, cpu_threads):
+    """Pool initializer: load this worker's model before the first chunk arrives."""
+    _worker.update(model=model, compute_type=compute_type, cpu_threads=cpu_threads)
+    get_model(model, compute_type, cpu_threads=cpu_threads)
+
+
+def _decode(audio, params, whisper=None):
+    """Transcribe one chunk; times are relative to the chunk's speech audio."""
+    if whisper is None:
+        whisper = get_model(_worker["model"], _worker["compute_type"], cpu_threads=_worker["cpu_threads"])
+    segs, info = whisper.transcribe(audio, **params)
+    return [(s.start, s.end, s.text) for s in segs], info.language, info.language_probability
+
+
+def _decode_all(samples, jobs, model, compute_type, params, workers):
+    """Decode every job, in a process pool when there is more than one worker."""
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    import multiprocessing
+
+    if workers < 2:
+        whisper = get_model(model, compute_type)
+        return [_decode(_speech(samples, regions), params, whisper) for _, regions in jobs]
+
+    results = [None] * len(jobs)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    queue = list(range(len(jobs)))[::-1]
+    # spawn, not fork: the daemon and skill server are threaded processes
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_load_worker,
+                             initargs=(model, compute_type, threads)) as pool:
+        running = {}
+        while queue or running:
+            while queue and len(running) < workers * QUEUE_PER_WORKER:
+                index = queue.pop()
+                running[pool.submit(_decode, _speech(samples, jobs[index][1]), params)] = index
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[running.pop(future)] = future.result()
+    return results
+
+
+def _stitch(jobs, results):
+    """Keep each segment in the chunk owning its midpoint, in original-file time."""
+    segments = []
+    for (chunk, regions), (segs, _, _) in zip(jobs, results):
+        own_start, own_end = chunk.own_start / SAMPLE_RATE, chunk.own_end / SAMPLE_RATE
+        for start, end, text in segs:
+            start = preprocess.to_original_time(start, regions)
+            end = preprocess.to_original_time(end, regions, end=True)
+            if not own_start <= (start + end) / 2 < own_end:
+                continue
+            if segments and start < segments[-1][1]:
+                # A kept segment from the overlap may run past the cut
+                start = min(segments[-1][1], end)
+            segments.append((start, end, text))
+    return segments
+
+
+def _language(jobs, results):
+    """Language spoken longest across the chunks, with its duration-weighted probability."""
+    weights = {}
+    for (_, regions), (_, language, probability) in zip(jobs, results):
+        seconds = float((regions[:, 1] - regions[:, 0]).sum()) / SAMPLE_RATE
+        total = weights.setdefault(language, [0.0, 0.0])
+        total[0] += seconds
+        total[1] += seconds * probability
+    if not weights:
+        return None, 0.0
+    language, (seconds, weighted) = max(weights.items(), key=lambda item: item[1][0])
+    return language, weighted / seconds if seconds else 0.0
+
+
+def transcribe_chunked(audio_path, model, compute_type="int8", params=None, trim=True,
+                       workers=None, chunk_seconds=CHUNK_SECONDS):
+    """
+    Transcribe a long recording as chunks decoded in parallel.
+
+    Args:
+        audio_path: Path to audio file
+        model: Model size (not "auto"; resolve it first)
+        compute_type: CTranslate2 compute type
+        params: WhisperModel.transcribe parameters
+        trim: Decode only the speech regions of each chunk
+        workers: Pool processes (default: worker_count(model))
+        chunk_seconds: Target chunk length
+
+    Returns:
+        Tuple of (list of (start, end, text) in seconds from the start of
+        the file, info dict with language, language_probability, duration,
+        speech_duration, chunks and workers)
+    """
+    import numpy as np
+
+    with timing.span("voice.preprocess") as attrs:
+        samples = preprocess.decode_audio(audio_path)
+        found = preprocess.speech_regions(samples)
+        regions = (preprocess.kept_regions(found, len(samples)) if trim
+                   else np.array([[0, len(samples)]], dtype=np.int64))
+        chunks = plan_chunks(len(samples), found, chunk_seconds)
+        speech = float((regions[:, 1] - regions[:, 0]).sum()) / SAMPLE_RATE
+        attrs.update(audio_seconds=len(samples) / SAMPLE_RATE, speech_seconds=speech, chunks=len(chunks))
+
+    jobs = [(chunk, clipped) for chunk, clipped in ((c, _clip(regions, c)) for c in chunks) if len(clipped)]
+    workers = max(1, min(workers or worker_count(model), len(jobs)))
+
+    results = []
+    if jobs:
+        with timing.span("whisper.decode_chunked", model=model, audio_seconds=speech,
+                         chunks=len(jobs), workers=workers, beam_size=(params or {}).get("beam_size")):
+            results = _decode_all(samples, jobs, model, compute_type, params or {}, workers)
+
+    language, probability = _language(jobs, results)
+    info = {
+        "language": language,
+        "language_probability": probability,
+        "duration": len(samples) / SAMPLE_RATE,
+        "speech_duration": speech,
+        "chunks": len(jobs),
+        "workers": workers,
+    }
+    return _stitch(jobs, results), info
@@ -0,0 +1,139 @@
+"""Process-wide registry of loaded Whisper models.
+
+Loading a WhisperModel takes seconds; decoding a short voice note often takes
+less. Models are kept warm here, keyed by (size, compute_type, cpu_threads),
+and evicted least-recently-used first when the pool exceeds its entry count
+or memory ceiling. A batch that loads a model with few threads per worker
+therefore keeps it apart from the default-threaded model single requests use.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import timing
+
+VOICE_VENV = os.environ.get("VOICE_VENV", "/opt/voice-venv")
+sys.path.insert(0, f"{VOICE_VENV}/lib/python3.13/site-packages")
+
+# faster_whisper (ctranslate2, tokenizers, onnxruntime) is imported inside
+# get_model() so importing voice.py for TTS or the cache stays cheap.
+
+WHISPER_ROOT = os.environ.get("WHISPER_MODEL_DIR", "/opt/models/whisper")
+POOL_MAX_MODELS = int(os.environ.get("WHISPER_POOL_SIZE", "2"))
+POOL_MAX_MB = int(os.environ.get("WHISPER_POOL_MAX_MB", "1500"))
+
+# Approximate resident size (MB) of each model with int8 weights on CPU.
+# Used when the RSS delta of a load cannot be measured.
+MODEL_FOOTPRINT_MB = {
+    "tiny": 75,
+    "base": 150,
+    "small": 500,
+    "medium": 1500,
+    "large": 3100,
+}
+
+_pool = OrderedDict()
+_lock = threading.Lock()
+
+
+def _rss_mb():
+    """Current resident set size of this process in MB (0 if unknown)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _used_mb():
+    return sum(entry["mb"] for entry in _pool.values())
+
+
+def _evict(needed_mb=0):
+    """Drop least-recently-used models until the new one fits."""
+    while _pool and (len(_pool) >= POOL_MAX_MODELS or _used_mb() + needed_mb > POOL_MAX_MB):
+        _pool.popitem(last=False)
+
+
+def get_model(size="small", compute_type="int8", num_workers=1, cpu_threads=0):
+    """
+    Return a warm WhisperModel, loading it on first use.
+
+    Args:
+        size: Model size (tiny, base, small, medium, large)
+        compute_type: CTranslate2 compute type (int8, int8_float32, float32)
+        num_workers: Concurrent transcribe() calls the model must serve;
+            a pooled model with fewer workers is reloaded
+        cpu_threads: Threads per worker (0 lets CTranslate2 decide); part
+            of the pool key, so differently threaded models don't mix
+
+    Returns:
+        WhisperModel instance shared by the whole process
+    """
+    key = (size, compute_type, cpu_threads)
+    with _lock:
+        entry = _pool.get(key)
+        if entry is not None and entry["num_workers"] >= num_workers:
+            _pool.move_to_end(key)
+            entry["hits"] += 1
+            return entry["model"]
+
+        _pool.pop(key, None)
+        _evict(MODEL_FOOTPRINT_MB.get(size, 0))
+
+        from faster_whisper import WhisperModel
+
+        before = _rss_mb()
+        with timing.span("whisper.model_load", model=size, compute_type=compute_type, cpu_threads=cpu_threads):
+            model = WhisperModel(
+                size,
+                device="cpu",
+                compute_type=compute_type,
+                cpu_threads=cpu_threads,
+                num_workers=num_workers,
+                download_root=WHISPER_ROOT,
+            )
+        measured = _rss_mb() - before
+        mb = measured if measured > 0 else MODEL_FOOTPRINT_MB.get(size, 0)
+
+        _pool[key] = {"model": model, "mb": mb, "hits": 0, "num_workers": num_workers}
+        return model
+
+
+def unload(size=None, compute_type="int8"):
+    """Unload one model (at any thread count), or every model when size is None."""
+    with _lock:
+        if size is None:
+            _pool.clear()
+        else:
+            for key in [k for k in _pool if k[:2] == (size, compute_type)]:
+                del _pool[key]
+
+
+def pool_stats():
+    """
+    Describe the models currently held in the pool.
+
+    Returns:
+        Dict with limits, memory used and per-model entries (LRU first)
+    """
+    with _lock:
+        return {
+            "max_models": POOL_MAX_MODELS,
+            "max_mb": POOL_MAX_MB,
+            "used_mb": round(_used_mb(), 1),
+            "models": [
+                {
+                    "size": size,
+                    "compute_type": ct,
+                    "cpu_threads": threads,
+                    "num_workers": e["num_workers"],
+                    "mb": round(e["mb"], 1),
+                    "hits": e["hits"],
+                }
+                for (size, ct, threads), e in _pool.items()
+            ],
+        }
@@ -0,0 +1,204 @@
+"""Adaptive choice of Whisper model and decode parameters.
+
+`model="auto"` resolves through this policy instead of a fixed small/beam-5
+decode. Duration tiers pick the model and beam size, so short clips get a
+smaller, greedy decode. When the VPS is busy (load average per core or
+decodes already in flight above the limits), or recent decodes with the
+tier's settings ran slower than latency_target_rtf (seconds of decoding
+per second of audio), the clip drops one tier. A result with low language
+probability is re-decoded with the escalation settings when the machine
+is neither busy nor slow.
+
+Thresholds live in policy.json ($VOICE_POLICY overrides the path). The file
+is re-read when it changes. benchmarks/wer_latency.py measures WER against
+latency on local fixtures to set them.
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+POLICY_PATH = os.environ.get(
+    "VOICE_POLICY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "policy.json"),
+)
+
+DEFAULT_POLICY = {
+    "compute_type": "int8",
+    "tiers": [{"max_seconds": None, "model": "small", "beam_size": 5}],
+    "busy": {"max_load_per_core": 0.8, "max_queue": 2},
+    "escalate": {"min_language_probability": 0.6, "model": "small", "beam_size": 5},
+    "latency_target_rtf": 0.5,
+}
+
+MODEL_ORDER = ["tiny", "base", "small", "medium", "large"]
+
+# Load snapshot for callers that decide for themselves (batch backlogs)
+IDLE = {"load_per_core": 0.0, "queue": 0}
+
+# Recent real-time factors: weight of each new decode, and how long an
+# estimate counts (a tier dropped for being slow is retried after this)
+RTF_SMOOTHING = 0.3
+RTF_MAX_AGE = 600.0
+
+_loaded = {"stamp": None, "policy": DEFAULT_POLICY}
+_active = {"decodes": 0}
+# (model, beam_size) -> (smoothed real-time factor, monotonic time)
+_rtf = {}
+_lock = threading.Lock()
+
+
+def load_policy():
+    """
+    Return the policy config, re-reading policy.json when it changed.
+
+    Returns:
+        Dict with compute_type, tiers, busy, escalate and latency_target_rtf
+    """
+    try:
+        st = os.stat(POLICY_PATH)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return DEFAULT_POLICY
+    with _lock:
+        if stamp != _loaded["stamp"]:
+            with open(POLICY_PATH, 'r') as f:
+                _loaded["policy"] = dict(DEFAULT_POLICY, **json.load(f))
+            _loaded["stamp"] = stamp
+        return _loaded["policy"]
+
+
+def probe_duration(audio_path):
+    """Container duration in seconds from the file header (None if unknown)."""
+    try:
+        import av
+
+        with av.open(audio_path, mode='r') as container:
+            if container.duration is not None:
+                return container.duration / 1_000_000
+            stream = container.streams.audio[0]
+            if stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except Exception:
+        pass
+    return None
+
+
+@contextmanager
+def decoding():
+    """Count a decode as in flight (the policy's queue depth) while the block runs."""
+    with _lock:
+        _active["decodes"] += 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _active["decodes"] -= 1
+
+
+def current_load():
+    """
+    Snapshot of how busy this machine and process are.
+
+    Returns:
+        Dict with load_per_core (1-minute load average / cores) and queue
+        (decodes in flight in this process)
+    """
+    try:
+        load = os.getloadavg()[0] / (os.cpu_count() or 1)
+    except OSError:
+        load = 0.0
+    return {"load_per_core": round(load, 2), "queue": _active["decodes"]}
+
+
+def record_decode(model, beam_size, elapsed, audio_seconds):
+    """Feed a finished decode's real-time factor into the latency check."""
+    if not audio_seconds:
+        return
+    rtf = elapsed / audio_seconds
+    now = time.monotonic()
+    with _lock:
+        previous = _rtf.get((model, beam_size))
+        if previous and now - previous[1] < RTF_MAX_AGE:
+            rtf = previous[0] + RTF_SMOOTHING * (rtf - previous[0])
+        _rtf[(model, beam_size)] = (rtf, now)
+
+
+def recent_rtf(model, beam_size):
+    """Smoothed real-time factor of this process's recent decodes with these settings (None if none)."""
+    with _lock:
+        entry = _rtf.get((model, beam_size))
+    if entry is None or time.monotonic() - entry[1] >= RTF_MAX_AGE:
+        return None
+    return entry[0]
+
+
+def is_busy(load=None, policy=None):
+    """Whether the load snapshot exceeds the policy's busy limits."""
+    policy = policy or load_policy()
+    load = load or current_load()
+    limits = policy["busy"]
+    return load["load_per_core"] > limits["max_load_per_core"] or load["queue"] >= limits["max_queue"]
+
+
+def choose(duration, load=None, policy=None):
+    """
+    Pick the model and decode parameters for a clip.
+
+    Args:
+        duration: Clip length in seconds (None picks the longest tier)
+        load: Snapshot from current_load() (taken now if None; pass IDLE
+            to ignore load)
+        policy: Policy dict (defaults to load_policy())
+
+    Returns:
+        Dict with model, compute_type, beam_size, tier index, busy flag and
+        slow flag (recent decodes at this tier missed latency_target_rtf)
+    """
+    policy = policy or load_policy()
+    tiers = policy["tiers"]
+    index = len(tiers) - 1
+    if duration is not None:
+        for i, tier in enumerate(tiers):
+            if tier.get("max_seconds") is None or duration <= tier["max_seconds"]:
+                index = i
+                break
+
+    busy = is_busy(load, policy)
+    target = policy.get("latency_target_rtf")
+    rtf = recent_rtf(tiers[index]["model"], tiers[index].get("beam_size", 5))
+    slow = bool(target) and rtf is not None and rtf > target
+    if (busy or slow) and index > 0:
+        index -= 1
+
+    tier = tiers[index]
+    return {
+        "model": tier["model"],
+        "compute_type": tier.get("compute_type", policy["compute_type"]),
+        "beam_size": tier.get("beam_size", 5),
+        "tier": index,
+        "busy": busy,
+        "slow": slow,
+    }
+
+
+def escalation(decision, language_probability, policy=None):
+    """
+    Decide whether a finished decode should be redone with a stronger setting.
+
+    Returns:
+        Decision dict for the re-decode, or None to keep the result
+    """
+    policy = policy or load_policy()
+    rule = policy.get("escalate")
+    if (not rule or decision["busy"] or decision.get("slow")
+            or language_probability >= rule["min_language_probability"]):
+        return None
+
+    stronger = (MODEL_ORDER.index(rule["model"]) > MODEL_ORDER.index(decision["model"])
+                or rule.get("beam_size", 5) > decision["beam_size"])
+    if not stronger:
+        return None
+    return dict(decision, model=rule["model"], beam_size=rule.get("beam_size", 5), escalated=True)
@@ -0,0 +1,183 @@
+"""Audio preprocessing before Whisper: decode once, drop silence.
+
+Phone memos often carry long pauses and room noise, and Whisper spends the
+same beam-search effort on dead air as on speech. The file is decoded once
+with PyAV to 16 kHz mono float32 (Whisper's input format). Frame energies
+are compared against the recording's own noise floor, and only the speech
+regions are concatenated and handed to Whisper as an array. Segment
+timestamps are mapped back to positions in the original file.
+"""
+
+import os
+from collections import namedtuple
+
+SAMPLE_RATE = 16000
+TRIM_SILENCE = os.environ.get("VOICE_TRIM_SILENCE", "1") != "0"
+
+# Energy VAD defaults: 30 ms frames; speech is `margin_db` above the noise
+# floor (10th percentile frame energy) and above `floor_db` absolute. Pauses
+# shorter than min_silence_ms stay in; bursts shorter than min_speech_ms
+# (clicks, bumps) are dropped; kept regions get pad_ms of context each side.
+VAD_DEFAULTS = {
+    "frame_ms": 30,
+    "margin_db": 12.0,
+    "floor_db": -55.0,
+    "min_silence_ms": 600,
+    "min_speech_ms": 200,
+    "pad_ms": 200,
+}
+
+# Trimming less than this share of the file is not worth the remapping
+MIN_TRIM_FRACTION = 0.1
+
+Preprocessed = namedtuple("Preprocessed", "audio regions duration speech_duration")
+
+
+def decode_audio(audio_path, sample_rate=SAMPLE_RATE):
+    """
+    Decode any audio file to mono float32 samples.
+
+    Returns:
+        1-D numpy float32 array in [-1, 1] at sample_rate
+    """
+    import av
+    import numpy as np
+
+    resampler = av.audio.resampler.AudioResampler(format='flt', layout='mono', rate=sample_rate)
+    chunks = []
+    with av.open(audio_path, mode='r') as container:
+        for frame in container.decode(audio=0):
+            frame.pts = None
+            for resampled in resampler.resample(frame):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+        for resampled in resampler.resample(None):
+            chunks.append(resampled.to_ndarray().reshape(-1))
+
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+def _merge_runs(starts, ends, min_gap):
+    """Join runs separated by fewer than min_gap units (runs sorted, non-overlapping)."""
+    import numpy as np
+
+    keep = (starts[1:] - ends[:-1]) >= min_gap
+    return (np.concatenate((starts[:1], starts[1:][keep])),
+            np.concatenate((ends[:-1][keep], ends[-1:])))
+
+
+def speech_regions(samples, sample_rate=SAMPLE_RATE, **vad):
+    """
+    Find speech regions with a vectorized frame-energy detector.
+
+    Args:
+        samples: Mono float32 samples
+        sample_rate: Sample rate of samples
+        **vad: Overrides for VAD_DEFAULTS
+
+    Returns:
+        (N, 2) int array of [start, end) sample offsets, sorted
+    """
+    import numpy as np
+
+    opts = dict(VAD_DEFAULTS, **vad)
+    frame = int(sample_rate * opts["frame_ms"] / 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    frames = samples[:count * frame].reshape(count, frame)
+    energy_db = 10 * np.log10(np.mean(np.square(frames, dtype=np.float64), axis=1) + 1e-12)
+    threshold = max(np.percentile(energy_db, 10) + opts["margin_db"], opts["floor_db"])
+    speech = energy_db > threshold
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.view(np.int8), [0]))))
+    if len(edges) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    starts, ends = edges[::2], edges[1::2]
+
+    starts, ends = _merge_runs(starts, ends, opts["min_silence_ms"] / opts["frame_ms"])
+    long_enough = (ends - starts) * opts["frame_ms"] >= opts["min_speech_ms"]
+    starts, ends = starts[long_enough], ends[long_enough]
+    if len(starts) == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    pad = int(sample_rate * opts["pad_ms"] / 1000)
+    starts = np.maximum(starts * frame - pad, 0)
+    ends = np.minimum(ends * frame + pad, len(samples))
+    starts, ends = _merge_runs(starts, ends, 1)
+    return np.stack((starts, ends), axis=1).astype(np.int64)
+
+
+def kept_regions(regions, length):
+    """
+    Regions worth decoding: the speech, or the whole file when trimming
+    would drop less than MIN_TRIM_FRACTION of it.
+
+    Args:
+        regions: Regions from speech_regions()
+        length: Number of samples in the recording
+
+    Returns:
+        (N, 2) int array of [start, end) sample offsets
+    """
+    import numpy as np
+
+    if len(regions) and (regions[:, 1] - regions[:, 0]).sum() > (1 - MIN_TRIM_FRACTION) * length:
+        return np.array([[0, length]], dtype=np.int64)
+    return regions
+
+
+def preprocess(audio_path, normalize=False, **vad):
+    """
+    Decode a recording and keep only its speech.
+
+    Args:
+        audio_path: Path to audio file
+        normalize: Peak-normalize the speech to -1 dBFS
+        **vad: Overrides for VAD_DEFAULTS
+
+    Returns:
+        Preprocessed(audio, regions, duration, speech_duration): the
+        concatenated speech samples, their [start, end) offsets in the
+        original (16 kHz samples), and both durations in seconds
+    """
+    import numpy as np
+
+    samples = decode_audio(audio_path)
+    duration = len(samples) / SAMPLE_RATE
+    regions = kept_regions(speech_regions(samples, **vad), len(samples))
+    audio = np.concatenate([samples[s:e] for s, e in regions]) if len(regions) else samples[:0]
+
+    if normalize and len(audio):
+        peak = np.max(np.abs(audio))
+        if peak > 0:
+            audio = audio * (10 ** (-1 / 20) / peak)
+
+    return Preprocessed(audio.astype(np.float32, copy=False), regions, duration, len(audio) / SAMPLE_RATE)
+
+
+def to_original_time(seconds, regions, end=False):
+    """
+    Map a time in the trimmed audio back to the original recording.
+
+    Args:
+        seconds: Time in the concatenated speech audio
+        regions: Regions from preprocess()
+        end: Treat the time as a segment end, so a time on a region boundary
+            maps to the end of the earlier region rather than the next start
+
+    Returns:
+        Seconds from the start of the original file
+    """
+    import numpy as np
+
+    if len(regions) == 0:
+        return seconds
+    lengths = regions[:, 1] - regions[:, 0]
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    position = seconds * SAMPLE_RATE
+    index = np.searchsorted(offsets, position, side='left' if end else 'right') - 1
+    index = min(max(int(index), 0), len(regions) - 1)
+    return float(regions[index, 0] + position - offsets[index]) / SAMPLE_RATE
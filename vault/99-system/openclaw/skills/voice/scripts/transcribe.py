@@ -8,39 +8,52 @@ import os
 VOICE_VENV = os.environ.get("VOICE_VENV", "/opt/voice-venv")
 sys.path.insert(0, f"{VOICE_VENV}/lib/python3.13/site-packages")
 
-from faster_whisper import WhisperModel
+# Sibling skill modules (daemon client, model pool) and the obsidian skill
+sys.path.insert(0, os.path.join(os.environ.get("VAULT_PATH", "/vault"), "99-system/openclaw/skills/obsidian"))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
 
-MODEL_ROOT = os.environ.get("WHISPER_MODEL_DIR", "/opt/models/whisper")
+import daemon
 
-def transcribe(audio_path, model_size="small"):
+def transcribe(audio_path, model_size="auto"):
     """Transcribe audio file to text."""
     if not os.path.exists(audio_path):
         print(f"Error: File not found: {audio_path}", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Loading Whisper model: {model_size}", file=sys.stderr)
-    model = WhisperModel(model_size, device="cpu", compute_type="int8", download_root=MODEL_ROOT)
-
-    print(f"Transcribing: {audio_path}", file=sys.stderr)
-    segments, info = model.transcribe(audio_path, beam_size=5)
-
-    print(f"Language: {info.language} (probability: {info.language_probability:.2f})", file=sys.stderr)
+    try:
+        info = daemon.call("segments", audio_path=os.path.abspath(audio_path), model=model_size)
+        print(f"Transcribing via daemon: {audio_path}", file=sys.stderr)
+        segments = [(s["start"], s["end"], s["text"]) for s in info["segments"]]
+    except daemon.DaemonUnavailable:
+        from voice import transcribe_segments
+
+        print(f"Transcribing: {audio_path}", file=sys.stderr)
+        segs, info = transcribe_segments(audio_path, model_size)
+        segments = ((s.start, s.end, s.text) for s in segs)
+
+    print(f"Language: {info['language']} (probability: {info['language_probability']:.2f})", file=sys.stderr)
+    if "model" in info:
+        escalated = ", escalated" if info["escalated"] else ""
+        print(f"Model: {info['model']} (beam {info['beam_size']}{escalated})", file=sys.stderr)
+    silence = info["duration"] - info.get("speech_duration", info["duration"])
+    if silence > 0:
+        print(f"Skipped {silence:.1f}s of {info['duration']:.1f}s as silence", file=sys.stderr)
 
     full_text = []
-    for segment in segments:
-        print(f"[{segment.start:.2f}s -> {segment.end:.2f}s] {segment.text}")
-        full_text.append(segment.text)
+    for start, end, text in segments:
+        print(f"[{start:.2f}s -> {end:.2f}s] {text}")
+        full_text.append(text)
 
     return " ".join(full_text)
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: transcribe.py <audio_file> [model_size]", file=sys.stderr)
-        print("Models: tiny, base, small (default), medium, large", file=sys.stderr)
+        print("Models: auto (default), tiny, base, small, medium, large", file=sys.stderr)
         sys.exit(1)
 
     audio_file = sys.argv[1]
-    model = sys.argv[2] if len(sys.argv) > 2 else "small"
+    model = sys.argv[2] if len(sys.argv) > 2 else "auto"
 
     result = transcribe(audio_file, model)
     print("\n--- Full Transcription ---")
@@ -10,27 +10,80 @@ VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
 sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
 sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
 
-from voice import (
-    transcribe_audio,
-    transcribe_with_timestamp,
-    transcribe_and_save,
-    generate_speech,
-    speak,
-    convert_to_opus
-)
-
-def main():
-    parser = argparse.ArgumentParser(description='Voice Processing CLI')
+if __name__ == '__main__':
+    # Hand the command to the resident skill server when one is running
+    from skill_server import forward
+    forward('voice')
+
+import daemon
+
+# voice.py pulls in faster_whisper; import it only when the daemon can't serve
+# the request so warm-daemon calls skip the model stack entirely.
+
+def transcribe_audio(audio_path, model, parallel=None):
+    # Older daemons don't take parallel; only send it when asked for
+    options = {} if parallel is None else {'parallel': parallel}
+    try:
+        return daemon.call('transcribe', audio_path=os.path.abspath(audio_path), model=model, **options)['text']
+    except daemon.DaemonUnavailable:
+        from voice import transcribe_audio
+        return transcribe_audio(audio_path, model, parallel)
+
+def transcribe_and_save(audio_path, model, stream=False):
+    try:
+        result = daemon.call('daily-note', audio_path=os.path.abspath(audio_path), model=model, stream=stream)
+        return result['path'], result['timestamp'], result['text']
+    except daemon.DaemonUnavailable:
+        from voice import transcribe_and_save, transcribe_and_save_streaming
+        save = transcribe_and_save_streaming if stream else transcribe_and_save
+        return save(audio_path, model)
+
+def transcribe_many(sources, model, workers, save):
+    sources = [os.path.abspath(source) for source in sources]
+    try:
+        result = daemon.call('transcribe-batch', sources=sources, model=model, workers=workers, save=save)
+        return result['results'], result['summary']
+    except daemon.DaemonUnavailable:
+        from voice import transcribe_many
+        return transcribe_many(sources, model, workers, save)
+
+def speak(text, output_file):
+    try:
+        return daemon.call('speak', text=text, output_file=os.path.abspath(output_file))['path']
+    except daemon.DaemonUnavailable:
+        from voice import speak
+        return speak(text, output_file)
+
+def speak_opus(text, opus_path):
+    try:
+        return daemon.call('speak-opus', text=text, opus_path=os.path.abspath(opus_path))['path']
+    except daemon.DaemonUnavailable:
+        from voice import generate_opus
+        return generate_opus(text, opus_path)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='voice-cli.py', description='Voice Processing CLI')
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
     # Transcribe command
     transcribe_parser = subparsers.add_parser('transcribe', help='Transcribe audio to text')
     transcribe_parser.add_argument('audio', help='Path to audio file')
-    transcribe_parser.add_argument('--model', '-m', default='small',
-                                  choices=['tiny', 'base', 'small', 'medium', 'large'],
-                                  help='Whisper model size (default: small)')
+    transcribe_parser.add_argument('--model', '-m', default='auto',
+                                  choices=['auto', 'tiny', 'base', 'small', 'medium', 'large'],
+                                  help='Whisper model size (default: auto, see policy.json)')
     transcribe_parser.add_argument('--save', '-s', action='store_true',
                                   help='Save to daily note with timestamp')
+    transcribe_parser.add_argument('--stream', action='store_true',
+                                  help='Print segments as they are decoded; with --save, '
+                                       'write the daily-note entry progressively')
+    split = transcribe_parser.add_mutually_exclusive_group()
+    split.add_argument('--parallel', '-p', action='store_true',
+                       help='Split the recording into chunks decoded across cores '
+                            '(default for recordings of VOICE_PARALLEL_MIN_SECONDS or longer)')
+    split.add_argument('--workers', '-w', type=int,
+                       help='Decode chunks with this many worker processes (implies --parallel)')
+    split.add_argument('--sequential', action='store_true',
+                       help='Never split the recording')
 
     # Speak command
     speak_parser = subparsers.add_parser('speak', help='Generate speech from text')
@@ -39,26 +92,50 @@ def main():
     speak_parser.add_argument('--output', '-o', default='/tmp/voice_output.wav',
                               help='Output file path (default: /tmp/voice_output.wav)')
     speak_parser.add_argument('--opus', action='store_true',
-                              help='Convert to OGG/Opus for WhatsApp')
+                              help='Write OGG/Opus for WhatsApp (output name with .ogg)')
 
     # Daily voice note command
     daily_parser = subparsers.add_parser('daily-note', help='Transcribe and save to daily note')
     daily_parser.add_argument('audio', help='Path to audio file')
-    daily_parser.add_argument('--model', '-m', default='small',
-                             choices=['tiny', 'base', 'small', 'medium', 'large'])
-
-    args = parser.parse_args()
+    daily_parser.add_argument('--model', '-m', default='auto',
+                             choices=['auto', 'tiny', 'base', 'small', 'medium', 'large'])
+    daily_parser.add_argument('--stream', action='store_true',
+                             help='Write the entry progressively while decoding')
+
+    # Batch transcription command
+    batch_parser = subparsers.add_parser('transcribe-batch',
+                                         help='Transcribe a backlog of recordings into daily notes')
+    batch_parser.add_argument('audio', nargs='+', help='Audio files and/or directories')
+    batch_parser.add_argument('--model', '-m', default='auto',
+                              choices=['auto', 'tiny', 'base', 'small', 'medium', 'large'])
+    batch_parser.add_argument('--workers', '-w', type=int,
+                              help='Concurrent decodes (default: CPU count)')
+    batch_parser.add_argument('--no-save', action='store_true',
+                              help='Print transcripts without writing daily notes')
+
+    # Cache command
+    cache_parser = subparsers.add_parser('cache', help='Inspect or prune the transcription and speech caches')
+    cache_parser.add_argument('action', choices=['stats', 'prune'], help='Action')
+    cache_parser.add_argument('--max-mb', type=int,
+                              help='Prune down to this size (default: VOICE_CACHE_MAX_MB; 0 clears)')
+
+    args = parser.parse_args(argv)
 
     if args.command == 'transcribe':
         print(f"Transcribing with {args.model} model...", file=sys.stderr)
 
         if args.save:
-            path, timestamp, text = transcribe_and_save(args.audio, args.model)
+            path, timestamp, text = transcribe_and_save(args.audio, args.model, args.stream)
             print(f"Saved to: {path}")
             print(f"Timestamp: [{timestamp}]")
             print(f"\nTranscription:\n{text}")
+        elif args.stream:
+            from voice import transcribe_stream
+            for segment in transcribe_stream(args.audio, args.model):
+                print(segment.text.strip(), flush=True)
         else:
-            text = transcribe_audio(args.audio, args.model)
+            parallel = args.workers or (True if args.parallel else False if args.sequential else None)
+            text = transcribe_audio(args.audio, args.model, parallel)
             print(text)
 
     elif args.command == 'speak':
@@ -69,22 +146,65 @@ def main():
             text = args.text
 
         print(f"Generating speech...", file=sys.stderr)
-        wav_path = speak(text, args.output)
-        print(f"WAV: {wav_path}")
-
         if args.opus:
-            opus_path = convert_to_opus(wav_path)
+            # Piper PCM is encoded straight to Opus; no WAV is written
+            opus_path = speak_opus(text, os.path.splitext(args.output)[0] + '.ogg')
             print(f"Opus: {opus_path}")
+        else:
+            wav_path = speak(text, args.output)
+            print(f"WAV: {wav_path}")
 
     elif args.command == 'daily-note':
         print(f"Transcribing and saving to daily note...", file=sys.stderr)
-        path, timestamp, text = transcribe_and_save(args.audio, args.model)
+        path, timestamp, text = transcribe_and_save(args.audio, args.model, args.stream)
         print(f"Saved to: {path}")
         print(f"Timestamp: [{timestamp}]")
         print(f"\nTranscription:\n{text}")
 
+    elif args.command == 'transcribe-batch':
+        print(f"Transcribing batch with {args.model} model...", file=sys.stderr)
+        results, summary = transcribe_many(args.audio, args.model, args.workers, not args.no_save)
+
+        for r in results:
+            if r['error']:
+                print(f"FAILED {r['path']}: {r['error']}")
+                continue
+            trimmed = (f", {r['silence']:.1f}s silence skipped (~{r['saved']:.1f}s decode saved)"
+                       if r['silence'] else "")
+            print(f"[{r['date']} {r['timestamp']}] {r['path']} "
+                  f"({r['duration']:.1f}s audio, {r['elapsed']:.1f}s, RTF {r['rtf']:.2f}{trimmed})")
+            if args.no_save:
+                print(f"  {r['text']}")
+
+        rtf = f"{summary['rtf']:.2f}" if summary['rtf'] is not None else "n/a"
+        print(f"\n{summary['files']} files ({summary['failed']} failed), "
+              f"{summary['audio_seconds']:.1f}s audio in {summary['elapsed']:.1f}s "
+              f"with {summary['workers']} workers, RTF {rtf}")
+        if summary['silence_seconds']:
+            print(f"Skipped {summary['silence_seconds']:.1f}s of silence "
+                  f"(~{summary['saved_seconds']:.1f}s decode saved)")
+        for note in summary['notes']:
+            print(f"Saved to: {note}")
+
+    elif args.command == 'cache':
+        import cache
+
+        if args.action == 'stats':
+            stats = cache.cache_stats()
+            print(f"Cache: {stats['dir']} (limit {stats['max_mb']} MB)")
+            for kind, info in stats['kinds'].items():
+                lookups = info['hits'] + info['misses']
+                rate = f"{100 * info['hits'] / lookups:.0f}%" if lookups else "n/a"
+                print(f"  {kind}: {info['entries']} entries, {info['mb']} MB, "
+                      f"{info['hits']} hits / {info['misses']} misses (hit rate {rate})")
+        else:
+            removed, freed = cache.prune(args.max_mb)
+            print(f"Removed {removed} entries ({freed / (1024 * 1024):.2f} MB)")
+
     else:
         parser.print_help()
 
 if __name__ == '__main__':
+    import timing
+    timing.startup('voice-cli')
     main()
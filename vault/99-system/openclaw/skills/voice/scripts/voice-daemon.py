@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Run the resident voice daemon that keeps Whisper models and Piper voices warm."""
+
+import sys
+import os
+import json
+import argparse
+
+# Add skill directories to path (relative to vault)
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
+
+import daemon
+
+def main():
+    parser = argparse.ArgumentParser(description='Voice transcription daemon')
+    parser.add_argument('--socket', help=f'Unix socket path (default: {daemon.SOCKET_PATH})')
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    serve_parser = subparsers.add_parser('serve', help='Run the daemon in the foreground')
+    serve_parser.add_argument('--preload', '-p', action='append', default=[],
+                              choices=['tiny', 'base', 'small', 'medium', 'large'],
+                              help='Load a model before accepting requests (repeatable)')
+    serve_parser.add_argument('--preload-tts', action='store_true',
+                              help='Load the default Piper voice before accepting requests')
+
+    subparsers.add_parser('status', help='Show loaded models and voices')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        print(f"Voice daemon listening on {args.socket or daemon.SOCKET_PATH}", file=sys.stderr)
+        try:
+            daemon.serve(args.socket, args.preload, args.preload_tts)
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == 'status':
+        try:
+            stats = daemon.call('stats', timeout=5, socket_path=args.socket)
+        except daemon.DaemonUnavailable:
+            print("Voice daemon is not running", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(stats, indent=2))
+
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
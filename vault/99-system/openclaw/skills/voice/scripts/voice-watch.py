@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Watch the vault inbox and transcribe new voice notes into the daily journal."""
+
+import sys
+import os
+import json
+import argparse
+
+# Add skill directories to path (relative to vault)
+VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/voice"))
+sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"))
+
+import watcher
+
+def main():
+    parser = argparse.ArgumentParser(description='Voice inbox watcher')
+    subparsers = parser.add_subparsers(dest='command', help='Commands')
+
+    serve_parser = subparsers.add_parser('serve', help='Watch the inbox in the foreground')
+    serve_parser.add_argument('--dir', '-d', action='append',
+                              help=f'Folder to watch, repeatable (default: {", ".join(watcher.INBOX_DIRS)})')
+    serve_parser.add_argument('--settle', type=float, default=watcher.SETTLE_SECONDS,
+                              help='Seconds a file must stay unchanged before it is transcribed')
+    serve_parser.add_argument('--poll', type=float,
+                              help='Rescan every N seconds instead of using inotify')
+
+    subparsers.add_parser('status', help='Show processed files from the state store')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        dirs = [os.path.abspath(d) for d in args.dir] if args.dir else None
+        try:
+            watcher.watch(dirs, settle=args.settle, poll=args.poll)
+        except KeyboardInterrupt:
+            pass
+
+    elif args.command == 'status':
+        print(json.dumps(watcher.state_stats(), indent=2))
+
+    else:
+        parser.print_help()
+
+if __name__ == '__main__':
+    main()
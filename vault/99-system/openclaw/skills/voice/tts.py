@@ -0,0 +1,179 @@
+"""Resident Piper text-to-speech engine.
+
+Running the `piper` binary per utterance reloads the ONNX voice every time
+and only returns once the whole WAV is written. Here voices stay loaded for
+the life of the process (daemon, skill server or agent), text is split into
+sentences, and sentences are synthesized on a background thread while the
+consumer handles earlier audio, so the first sentence's PCM is available
+as soon as it is ready.
+"""
+
+import os
+import re
+import sys
+import threading
+
+import timing
+
+VOICE_VENV = os.environ.get("VOICE_VENV", "/opt/voice-venv")
+sys.path.insert(0, f"{VOICE_VENV}/lib/python3.13/site-packages")
+
+PIPER_MODEL = os.path.join(
+    os.environ.get("PIPER_MODEL_DIR", "/opt/models/piper"),
+    "en_US-lessac-medium.onnx"
+)
+
+# Sentence boundary: terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, or a blank line
+SENTENCE_END = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\')\]]))\s+|\n\s*\n')
+# Fragments shorter than this are merged into the next sentence; Piper's
+# per-call overhead outweighs the earlier start for "Hi." or "OK."
+MIN_SENTENCE_CHARS = 20
+
+_voices = {}
+_lock = threading.Lock()
+
+
+def get_voice(model_path=None):
+    """
+    Return a loaded PiperVoice, loading it on first use.
+
+    Args:
+        model_path: Path to the .onnx voice (defaults to en_US-lessac-medium);
+            its .onnx.json config must sit next to it
+
+    Returns:
+        PiperVoice instance shared by the whole process
+
+    Raises:
+        ImportError: The piper-tts package is not installed
+    """
+    model_path = model_path or PIPER_MODEL
+    with _lock:
+        if model_path not in _voices:
+            from piper import PiperVoice
+
+            with timing.span("piper.voice_load", model=os.path.basename(model_path)):
+                _voices[model_path] = PiperVoice.load(model_path)
+        return _voices[model_path]
+
+
+def sample_rate(model_path=None):
+    """Sample rate (Hz) of the voice's 16-bit mono PCM output."""
+    return get_voice(model_path).config.sample_rate
+
+
+def split_sentences(text):
+    """
+    Split text into sentences for incremental synthesis.
+
+    Returns:
+        List of non-empty sentences, short fragments merged forward
+    """
+    sentences = []
+    pending = ""
+    for part in SENTENCE_END.split(text):
+        part = " ".join(part.split())
+        if not part:
+            continue
+        pending = f"{pending} {part}" if pending else part
+        if len(pending) >= MIN_SENTENCE_CHARS:
+            sentences.append(pending)
+            pending = ""
+    if pending:
+        if sentences and len(pending) < MIN_SENTENCE_CHARS:
+            sentences[-1] = f"{sentences[-1]} {pending}"
+        else:
+            sentences.append(pending)
+    return sentences
+
+
+def _synthesize_pcm(voice, sentence):
+    """Yield 16-bit PCM chunks for one sentence (piper-tts 1.2 and 1.3+ APIs)."""
+    if hasattr(voice, "synthesize_stream_raw"):
+        yield from voice.synthesize_stream_raw(sentence)
+    else:
+        for chunk in voice.synthesize(sentence):
+            yield chunk.audio_int16_bytes
+
+
+def synthesize_stream(text, model_path=None, prefetch=2):
+    """
+    Synthesize text sentence by sentence, yielding PCM as it is produced.
+
+    A worker thread synthesizes up to `prefetch` sentences ahead of the
+    consumer, so encoding or playback of one sentence overlaps with
+    synthesis of the next.
+
+    Args:
+        text: Text to speak
+        model_path: Path to the .onnx voice (defaults to en_US-lessac-medium)
+        prefetch: Sentences synthesized ahead of the consumer
+
+    Yields:
+        bytes of 16-bit little-endian mono PCM at sample_rate(model_path)
+    """
+    import queue
+
+    voice = get_voice(model_path)
+    sentences = split_sentences(text)
+    if not sentences:
+        return
+
+    chunks = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def produce():
+        try:
+            for sentence in sentences:
+                if stop.is_set():
+                    return
+                chunks.put(b"".join(_synthesize_pcm(voice, sentence)))
+            chunks.put(done)
+        except BaseException as e:
+            chunks.put(e)
+
+    worker = threading.Thread(target=produce, name="piper-synth", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        # Consumer stopped early: let the producer finish its current sentence and exit
+        stop.set()
+        while worker.is_alive():
+            try:
+                chunks.get_nowait()
+            except queue.Empty:
+                worker.join(0.05)
+
+
+def synthesize_wav(text, output_file, model_path=None):
+    """
+    Synthesize text into a 16-bit mono WAV file.
+
+    Returns:
+        Path to the WAV file
+    """
+    import wave
+
+    rate = sample_rate(model_path)
+    with wave.open(output_file, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        for pcm in synthesize_stream(text, model_path):
+            wav.writeframes(pcm)
+    return output_file
+
+
+def loaded_voices():
+    """Paths of the voices currently loaded in this process."""
+    with _lock:
+        return sorted(_voices)
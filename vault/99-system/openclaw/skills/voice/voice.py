@@ -2,7 +2,7 @@
 
 import sys
 import os
-import subprocess
+from collections import namedtuple
 
 # Add obsidian skill to path (relative to vault)
 VAULT_PATH = os.environ.get("VAULT_PATH", "/vault")
@@ -11,31 +11,205 @@ sys.path.insert(0, os.path.join(VAULT_PATH, "99-system/openclaw/skills/obsidian"
 VOICE_VENV = os.environ.get("VOICE_VENV", "/opt/voice-venv")
 sys.path.insert(0, f"{VOICE_VENV}/lib/python3.13/site-packages")
 
-from faster_whisper import WhisperModel
-from obsidian import append_to_daily_note, get_daily_note_path
-
-WHISPER_ROOT = os.environ.get("WHISPER_MODEL_DIR", "/opt/models/whisper")
-PIPER_MODEL = os.path.join(
-    os.environ.get("PIPER_MODEL_DIR", "/opt/models/piper"),
-    "en_US-lessac-medium.onnx"
+# subprocess, cache, longaudio, policy, preprocess and tts are imported by
+# the functions that use them, so the speak and daily-note fallbacks start
+# within the budget of benchmarks/startup.py --check.
+import timing
+from models import get_model, WHISPER_ROOT
+from obsidian import (
+    append_to_daily_note,
+    append_entries_to_daily_note,
+    get_daily_note_path,
+    start_daily_entry,
+    update_daily_entry,
 )
 
-def transcribe_audio(audio_path, model="small"):
+AUDIO_EXTENSIONS = ('.ogg', '.opus', '.oga', '.mp3', '.m4a', '.aac', '.wav', '.flac', '.webm')
+
+Segment = namedtuple("Segment", "start end text")
+
+def _info_dict(info):
+    return {
+        "language": info.language,
+        "language_probability": info.language_probability,
+        "duration": info.duration,
+        "speech_duration": info.duration,
+    }
+
+def _speech_audio(audio_path):
+    """Decode once and drop silence; returns (preprocess result, info dict)."""
+    import preprocess
+
+    with timing.span("voice.preprocess") as attrs:
+        pre = preprocess.preprocess(audio_path)
+        attrs.update(audio_seconds=pre.duration, speech_seconds=pre.speech_duration)
+    info = {
+        "language": None,
+        "language_probability": 0.0,
+        "duration": pre.duration,
+        "speech_duration": pre.speech_duration,
+    }
+    return pre, info
+
+def _original_segment(s, regions):
+    """Map a segment decoded from trimmed audio back to original-file time."""
+    import preprocess
+
+    return Segment(
+        preprocess.to_original_time(s.start, regions),
+        preprocess.to_original_time(s.end, regions, end=True),
+        s.text,
+    )
+
+def _key_params(params, trim, compute_type):
+    """Decode parameters that identify a transcript in the cache."""
+    import preprocess
+
+    key_params = dict(params, trim_silence=preprocess.VAD_DEFAULTS) if trim else params
+    if compute_type != "int8":
+        key_params = dict(key_params, compute_type=compute_type)
+    return key_params
+
+def _transcribe_trimmed(audio_path, model, compute_type, params, cpu_threads=0):
+    """Decode once, drop silence, transcribe the speech and remap timestamps."""
+    pre, info = _speech_audio(audio_path)
+    if not len(pre.audio):
+        return [], info
+
+    whisper = get_model(model, compute_type, cpu_threads=cpu_threads)
+    with timing.span("whisper.decode", model=model, audio_seconds=pre.speech_duration,
+                     beam_size=params.get("beam_size")):
+        # Segments are produced lazily: the decode runs while they are collected
+        segs, whisper_info = whisper.transcribe(pre.audio, **params)
+        segments = [_original_segment(s, pre.regions) for s in segs]
+    info["language"] = whisper_info.language
+    info["language_probability"] = whisper_info.language_probability
+    return segments, info
+
+def _transcribe_auto(audio_path, use_cache, trim_silence, params, load=None, parallel=None, cpu_threads=0):
+    """Resolve model="auto" through the policy, escalating low-confidence results."""
+    import policy
+
+    decision = policy.choose(policy.probe_duration(audio_path), load)
+    segments, info = transcribe_segments(
+        audio_path, decision["model"], use_cache, trim_silence, decision["compute_type"],
+        parallel, cpu_threads, **dict({"beam_size": decision["beam_size"]}, **params)
+    )
+
+    retry = policy.escalation(decision, info["language_probability"]) if segments else None
+    if retry:
+        decision = retry
+        segments, info = transcribe_segments(
+            audio_path, decision["model"], use_cache, trim_silence, decision["compute_type"],
+            parallel, cpu_threads, **dict(params, beam_size=decision["beam_size"])
+        )
+
+    info = dict(info, model=decision["model"], beam_size=decision["beam_size"], escalated=bool(retry))
+    return segments, info
+
+def transcribe_segments(audio_path, model="auto", use_cache=True, trim_silence=None,
+                        compute_type="int8", parallel=None, cpu_threads=0, **params):
+    """
+    Transcribe an audio file into timestamped segments, using the cache.
+
+    Identical audio decoded with the same model and parameters is served
+    from the content-addressed cache (see cache.py) without running Whisper.
+    With trim_silence, only the speech regions found by preprocess.py are
+    decoded; timestamps still refer to the original file. model="auto"
+    picks the model and beam size from policy.py. Long recordings are
+    split into chunks transcribed by a process pool (see longaudio.py).
+
+    Args:
+        audio_path: Path to audio file
+        model: Model size, or "auto" for the adaptive policy
+        use_cache: Look up and store results in the transcription cache
+        trim_silence: Drop silence before decoding (default: VOICE_TRIM_SILENCE)
+        compute_type: CTranslate2 compute type (ignored for "auto")
+        parallel: Transcribe in chunks across cores: True/False, a worker
+            count, or None to split recordings of VOICE_PARALLEL_MIN_SECONDS
+            or longer
+        cpu_threads: Threads per model worker (0: the default model);
+            transcribe_many() decodes on its own model with fewer
+        **params: Extra WhisperModel.transcribe parameters (beam_size=5 default)
+
+    Returns:
+        Tuple of (list of Segment, info dict with language,
+        language_probability, duration and speech_duration; "auto" adds
+        the model, beam_size and whether the decode escalated; a chunked
+        decode adds the chunk and worker counts)
+    """
+    import time
+
+    import cache
+    import longaudio
+    import policy
+    import preprocess
+
+    if model == "auto":
+        return _transcribe_auto(audio_path, use_cache, trim_silence, params, parallel=parallel,
+                                cpu_threads=cpu_threads)
+
+    params = {"beam_size": 5, **params}
+    trim = preprocess.TRIM_SILENCE if trim_silence is None else trim_silence
+    if parallel is None:
+        duration = policy.probe_duration(audio_path) if longaudio.MIN_SECONDS > 0 else None
+        parallel = duration is not None and duration >= longaudio.MIN_SECONDS
+    workers = longaudio.worker_count(model, parallel) if parallel else 1
+    key_params = _key_params(params, trim, compute_type)
+    if workers > 1:
+        # Chunk boundaries change the decode, not the worker count
+        key_params = dict(key_params, chunk_seconds=longaudio.CHUNK_SECONDS)
+    with timing.span("voice.transcribe", model=model) as attrs:
+        if timing.ENABLED:
+            attrs["bytes"] = os.path.getsize(audio_path)
+        key = cache.transcript_key(audio_path, model, key_params) if use_cache else None
+
+        if key:
+            hit = cache.get_transcript(key)
+            if hit is not None:
+                attrs.update(cached=True, audio_seconds=hit["info"]["duration"])
+                return [Segment(**s) for s in hit["segments"]], hit["info"]
+
+        with policy.decoding():
+            if workers > 1:
+                chunked, info = longaudio.transcribe_chunked(audio_path, model, compute_type, params,
+                                                             trim, workers)
+                segments = [Segment(*s) for s in chunked]
+            else:
+                # Load first so the latency check sees the decode, not the model load
+                whisper = get_model(model, compute_type, cpu_threads=cpu_threads)
+                start = time.perf_counter()
+                if trim:
+                    segments, info = _transcribe_trimmed(audio_path, model, compute_type, params, cpu_threads)
+                else:
+                    with timing.span("whisper.decode", model=model, beam_size=params.get("beam_size")) as decode:
+                        segs, info = whisper.transcribe(audio_path, **params)
+                        segments = [Segment(s.start, s.end, s.text) for s in segs]
+                        decode["audio_seconds"] = info.duration
+                    info = _info_dict(info)
+                policy.record_decode(model, params["beam_size"], time.perf_counter() - start, info["duration"])
+
+        if key:
+            cache.put_transcript(key, [s._asdict() for s in segments], info)
+        attrs.update(cached=False, audio_seconds=info["duration"])
+    return segments, info
+
+def transcribe_audio(audio_path, model="auto", parallel=None):
     """
     Transcribe an audio file to text using Whisper.
 
     Args:
         audio_path: Path to audio file
-        model: Model size (tiny, base, small, medium, large)
+        model: Model size (tiny, base, small, medium, large) or "auto"
+        parallel: Chunked decode across cores (see transcribe_segments)
 
     Returns:
         Transcribed text string
     """
-    model_obj = WhisperModel(model, device="cpu", compute_type="int8", download_root=WHISPER_ROOT)
-    segments, _ = model_obj.transcribe(audio_path, beam_size=5)
+    segments, _ = transcribe_segments(audio_path, model, parallel=parallel)
     return " ".join([s.text for s in segments])
 
-def transcribe_with_timestamp(audio_path, model="small"):
+def transcribe_with_timestamp(audio_path, model="auto"):
     """
     Transcribe audio and return text with current timestamp.
 
@@ -47,13 +221,11 @@ def transcribe_with_timestamp(audio_path, model="small"):
     now = datetime.now()
     timestamp = now.strftime("%H:%M")
 
-    model_obj = WhisperModel(model, device="cpu", compute_type="int8", download_root=WHISPER_ROOT)
-    segments, _ = model_obj.transcribe(audio_path, beam_size=5)
-    text = " ".join([s.text for s in segments])
+    text = transcribe_audio(audio_path, model)
 
     return timestamp, text
 
-def transcribe_and_save(audio_path, model="small"):
+def transcribe_and_save(audio_path, model="auto"):
     """
     Transcribe audio and save to daily note with timestamp.
     Uses the obsidian skill for vault integration.
@@ -69,10 +241,285 @@ def transcribe_and_save(audio_path, model="small"):
     note_path = append_to_daily_note(text, timestamp=timestamp)
     return note_path, timestamp, text
 
+def transcribe_stream(audio_path, model="auto", use_cache=True, trim_silence=None,
+                      compute_type="int8", **params):
+    """
+    Yield transcription segments as Whisper produces them.
+
+    Model choice, silence trim and cache key are those of
+    transcribe_segments(), so a recording streamed once is served from the
+    cache to either. With model="auto", the escalation check runs on the
+    language probability Whisper reports before the first segment is
+    decoded, so a low-confidence recording is streamed with the escalation
+    settings from the start.
+
+    Args:
+        audio_path: Path to audio file
+        model: Model size, or "auto" to pick by duration and load
+        use_cache: Look up and store results in the transcription cache
+        trim_silence: Drop silence before decoding (default: VOICE_TRIM_SILENCE)
+        compute_type: CTranslate2 compute type (ignored for "auto")
+        **params: Extra WhisperModel.transcribe parameters (beam_size=5 default)
+
+    Yields:
+        Segment tuples (start, end, text), in original-file time
+    """
+    import cache
+    import policy
+    import preprocess
+
+    decision = None
+    if model == "auto":
+        decision = policy.choose(policy.probe_duration(audio_path))
+        model, compute_type = decision["model"], decision["compute_type"]
+        params = dict({"beam_size": decision["beam_size"]}, **params)
+    else:
+        params = {"beam_size": 5, **params}
+    trim = preprocess.TRIM_SILENCE if trim_silence is None else trim_silence
+
+    segments = []
+    with policy.decoding():
+        while True:
+            key_params = _key_params(params, trim, compute_type)
+            key = cache.transcript_key(audio_path, model, key_params) if use_cache else None
+            hit = cache.get_transcript(key) if key else None
+            if hit is not None:
+                info, segs = hit["info"], (Segment(**s) for s in hit["segments"])
+                speech = bool(hit["segments"])
+            elif trim:
+                pre, info = _speech_audio(audio_path)
+                speech = bool(len(pre.audio))
+                segs = ()
+                if speech:
+                    # Language detection runs here; the segments decode lazily
+                    decoded, whisper_info = get_model(model, compute_type).transcribe(pre.audio, **params)
+                    info.update(language=whisper_info.language,
+                                language_probability=whisper_info.language_probability)
+                    segs = (_original_segment(s, pre.regions) for s in decoded)
+            else:
+                decoded, whisper_info = get_model(model, compute_type).transcribe(audio_path, **params)
+                info, speech = _info_dict(whisper_info), True
+                segs = (Segment(s.start, s.end, s.text) for s in decoded)
+
+            retry = policy.escalation(decision, info["language_probability"]) if decision and speech else None
+            if not retry:
+                break
+            # Escalate once, before anything has been yielded
+            decision = None
+            model, compute_type = retry["model"], retry["compute_type"]
+            params = dict(params, beam_size=retry["beam_size"])
+
+        if hit is None:
+            for segment in segs:
+                segments.append(segment)
+                yield segment
+    if hit is not None:
+        yield from segs
+    elif key:
+        cache.put_transcript(key, [s._asdict() for s in segments], info)
+
+def transcribe_and_save_streaming(audio_path, model="auto", flush_interval=5.0):
+    """
+    Transcribe into the daily note progressively.
+
+    The entry appears as soon as the first segment is decoded, is rewritten
+    at most every flush_interval seconds while decoding continues, and is
+    finalized (in-progress markers removed) when the recording is done.
+
+    Args:
+        audio_path: Path to audio file
+        model: Model size
+        flush_interval: Minimum seconds between note rewrites
+
+    Returns:
+        Tuple of (note_path, timestamp, transcribed_text)
+    """
+    import time
+    from datetime import datetime
+
+    timestamp = datetime.now().strftime("%H:%M")
+    note_path, entry_id = start_daily_entry(timestamp=timestamp)
+
+    parts = []
+    last_flush = 0.0
+    try:
+        for segment in transcribe_stream(audio_path, model):
+            parts.append(segment.text.strip())
+            now = time.monotonic()
+            if now - last_flush >= flush_interval:
+                update_daily_entry(note_path, entry_id, " ".join(parts))
+                last_flush = now
+    except Exception as e:
+        update_daily_entry(note_path, entry_id, " ".join(parts) + f"\n\n*(transcription failed: {e})*", final=True)
+        raise
+
+    text = " ".join(parts)
+    update_daily_entry(note_path, entry_id, text, final=True)
+    return note_path, timestamp, text
+
+def recording_time(audio_path):
+    """
+    When a recording was made, for dating its journal entry.
+
+    Uses the container's creation_time tag when the recorder wrote one,
+    otherwise the file mtime (Syncthing preserves it from the phone).
+
+    Returns:
+        Naive local datetime
+    """
+    from datetime import datetime
+
+    try:
+        import av
+
+        with av.open(audio_path, mode='r') as container:
+            created = container.metadata.get('creation_time')
+        if created:
+            return datetime.fromisoformat(created.replace('Z', '+00:00')).astimezone().replace(tzinfo=None)
+    except Exception:
+        pass
+    return datetime.fromtimestamp(os.path.getmtime(audio_path))
+
+def collect_audio_files(sources):
+    """
+    Expand files and directories into audio files ordered by mtime.
+
+    Args:
+        sources: A path or list of paths (files or directories)
+
+    Returns:
+        List of audio file paths, oldest first
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            for name in os.listdir(source):
+                path = os.path.join(source, name)
+                if name.lower().endswith(AUDIO_EXTENSIONS) and os.path.isfile(path):
+                    files.append(path)
+        else:
+            files.append(source)
+
+    return sorted(set(files), key=os.path.getmtime)
+
+def transcribe_many(sources, model="auto", workers=None, save=True):
+    """
+    Transcribe a backlog of recordings with one shared model.
+
+    Files are decoded concurrently by a bounded worker pool. Each recording
+    is dated by recording_time(), and entries are appended to their daily notes in
+    one write per note, oldest first.
+
+    Args:
+        sources: Audio file, directory, or list of either
+        model: Model size, or "auto" to pick per file by duration
+        workers: Concurrent decodes (defaults to the CPU count)
+        save: Append the transcripts to daily notes
+
+    Returns:
+        Tuple of (results, summary). Each result is a dict with path, date,
+        timestamp, text, duration, silence (seconds trimmed), elapsed, saved
+        (estimated decode seconds saved by trimming), rtf and error; summary
+        holds the aggregate audio/silence/saved/elapsed seconds, rtf and the
+        note paths written.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from datetime import datetime
+    import time
+
+    import policy
+
+    files = collect_audio_files(sources)
+    cores = os.cpu_count() or 1
+    workers = max(1, min(workers or cores, len(files) or 1))
+    # Load the shared model(s) with enough CTranslate2 workers for the pool.
+    # The threads per worker are part of the pool key, so later single
+    # requests don't inherit this split. A backlog is our own load, so
+    # "auto" picks by duration only.
+    if model == "auto":
+        decisions = [policy.choose(policy.probe_duration(f), policy.IDLE) for f in files]
+        preload = {(d["model"], d["compute_type"]) for d in decisions}
+    else:
+        preload = {(model, "int8")}
+    threads = max(1, cores // workers) if workers > 1 else 0
+    for size, compute_type in preload:
+        get_model(size, compute_type, num_workers=workers, cpu_threads=threads)
+    # The batch already spreads files across cores; only a lone file is split
+    parallel = None if workers == 1 else False
+
+    def run(path):
+        recorded = recording_time(path)
+        result = {
+            "path": path,
+            "date": recorded.strftime('%Y-%m-%d'),
+            "timestamp": recorded.strftime('%H:%M'),
+            "text": "",
+            "duration": 0.0,
+            "silence": 0.0,
+            "elapsed": 0.0,
+            "saved": 0.0,
+            "rtf": None,
+            "error": None,
+        }
+        start = time.perf_counter()
+        try:
+            if model == "auto":
+                segments, info = _transcribe_auto(path, True, None, {}, policy.IDLE, parallel, threads)
+            else:
+                segments, info = transcribe_segments(path, model, parallel=parallel, cpu_threads=threads)
+            result["text"] = " ".join([s.text for s in segments]).strip()
+            result["duration"] = info["duration"]
+            speech = info.get("speech_duration", info["duration"])
+            result["silence"] = info["duration"] - speech
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+        result["elapsed"] = time.perf_counter() - start
+        if result["duration"]:
+            result["rtf"] = result["elapsed"] / result["duration"]
+        if result["silence"] and speech:
+            # Whisper time scales with audio length: estimate what the silence would have cost
+            result["saved"] = result["elapsed"] / speech * result["silence"]
+        return result
+
+    batch_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run, files))
+    elapsed = time.perf_counter() - batch_start
+
+    notes = []
+    if save:
+        by_date = {}
+        for result in results:
+            if result["text"] and not result["error"]:
+                by_date.setdefault(result["date"], []).append((result["timestamp"], result["text"]))
+        for date, entries in by_date.items():
+            notes.append(append_entries_to_daily_note(entries, datetime.strptime(date, '%Y-%m-%d')))
+
+    audio = sum(r["duration"] for r in results)
+    summary = {
+        "files": len(results),
+        "failed": sum(1 for r in results if r["error"]),
+        "workers": workers,
+        "audio_seconds": audio,
+        "silence_seconds": sum(r["silence"] for r in results),
+        "saved_seconds": sum(r["saved"] for r in results),
+        "elapsed": elapsed,
+        "rtf": elapsed / audio if audio else None,
+        "notes": notes,
+    }
+    return results, summary
+
 def generate_speech(text, output_file="output.wav", model_path=None):
     """
     Generate speech from text using Piper.
 
+    Uses the resident engine in tts.py (voice kept loaded, sentences
+    synthesized in a pipeline); falls back to the piper binary when the
+    piper-tts package is not importable.
+
     Args:
         text: Text to speak
         output_file: Output audio file path
@@ -81,26 +528,57 @@ def generate_speech(text, output_file="output.wav", model_path=None):
     Returns:
         Path to generated audio file
     """
-    model = model_path or PIPER_MODEL
+    import tts
+
+    model = model_path or tts.PIPER_MODEL
+
+    try:
+        with timing.span("piper.synthesize_wav", characters=len(text)) as attrs:
+            tts.synthesize_wav(text, output_file, model)
+            if timing.ENABLED:
+                attrs["bytes"] = os.path.getsize(output_file)
+        return output_file
+    except ImportError:
+        pass
 
     # Use piper via subprocess
+    import subprocess
+
     piper_bin = f"{VOICE_VENV}/bin/piper"
 
-    proc = subprocess.run(
-        [piper_bin, "--model", model, "--output_file", output_file],
-        input=text.encode(),
-        capture_output=True
-    )
+    with timing.span("piper.subprocess", characters=len(text)):
+        proc = subprocess.run(
+            [piper_bin, "--model", model, "--output_file", output_file],
+            input=text.encode(),
+            capture_output=True
+        )
 
     if proc.returncode != 0:
         raise RuntimeError(f"Piper failed: {proc.stderr.decode()}")
 
     return output_file
 
+def stream_speech(text, model_path=None):
+    """
+    Stream synthesized speech sentence by sentence.
+
+    Args:
+        text: Text to speak
+        model_path: Path to Piper model (defaults to en_US-lessac-medium)
+
+    Returns:
+        Tuple of (sample_rate, iterator of 16-bit mono PCM byte chunks)
+    """
+    import tts
+
+    model = model_path or tts.PIPER_MODEL
+    return tts.sample_rate(model), tts.synthesize_stream(text, model)
+
 def speak(text, output_file="/tmp/nazar_speech.wav"):
     """Quick TTS with default settings."""
     return generate_speech(text, output_file)
 
+@timing.timed("opus.convert")
 def convert_to_opus(wav_path, opus_path=None):
     """
     Convert WAV to OGG/Opus for WhatsApp voice messages.
@@ -150,3 +628,107 @@ def convert_to_opus(wav_path, opus_path=None):
     container.close()
 
     return opus_path
+
+def encode_opus(pcm_chunks, sample_rate, output, bit_rate=24000):
+    """
+    Encode 16-bit mono PCM to OGG/Opus in one pass, without temp files.
+
+    Args:
+        pcm_chunks: Iterable of 16-bit little-endian mono PCM bytes
+        sample_rate: Sample rate of the PCM (Hz)
+        output: Output path or writable binary file object
+        bit_rate: Opus bit rate (24 kbps suits WhatsApp voice notes)
+    """
+    import av
+    import numpy as np
+
+    # Resample to 48000Hz (WhatsApp standard)
+    resampler = av.audio.resampler.AudioResampler(
+        format='s16',
+        layout='mono',
+        rate=48000
+    )
+
+    container = av.open(output, 'w', format='ogg')
+    output_stream = container.add_stream('libopus', 48000)
+    output_stream.bit_rate = bit_rate
+
+    def mux(frames):
+        for frame in frames:
+            for packet in output_stream.encode(frame):
+                container.mux(packet)
+
+    try:
+        for pcm in pcm_chunks:
+            samples = np.frombuffer(pcm, dtype='<i2').reshape(1, -1)
+            frame = av.AudioFrame.from_ndarray(samples, format='s16', layout='mono')
+            frame.sample_rate = sample_rate
+            mux(resampler.resample(frame))
+
+        # Flush resampler and encoder
+        mux(resampler.resample(None))
+        for packet in output_stream.encode():
+            container.mux(packet)
+    finally:
+        container.close()
+
+def generate_opus(text, opus_path=None, model_path=None, use_cache=True):
+    """
+    Synthesize speech straight to OGG/Opus for WhatsApp voice replies.
+
+    Piper's PCM is resampled and encoded in memory as sentences are
+    synthesized; no intermediate WAV is written or decoded. Results are
+    cached by normalized text + voice, so repeated phrases skip Piper.
+
+    Args:
+        text: Text to speak
+        opus_path: Output .ogg path (None returns the OGG bytes)
+        model_path: Path to Piper model (defaults to en_US-lessac-medium)
+        use_cache: Serve and store results in the speech cache
+
+    Returns:
+        opus_path, or the OGG/Opus bytes when opus_path is None
+    """
+    import io
+    import shutil
+
+    import cache
+    import tts
+
+    model = model_path or tts.PIPER_MODEL
+    key = cache.speech_key(text, model, "ogg") if use_cache else None
+    cached = cache.get_speech(key, "ogg") if key else None
+    if cached:
+        if opus_path is None:
+            with open(cached, 'rb') as f:
+                return f.read()
+        shutil.copyfile(cached, opus_path)
+        return opus_path
+
+    # Synthesis and encoding are pipelined, so one span covers both
+    with timing.span("voice.generate_opus", characters=len(text)) as attrs:
+        try:
+            rate = tts.sample_rate(model)
+            buffer = io.BytesIO()
+            encode_opus(tts.synthesize_stream(text, model), rate, buffer)
+            data = buffer.getvalue()
+        except ImportError:
+            data = _generate_opus_via_wav(text, model)
+        attrs["bytes"] = len(data)
+
+    if key:
+        cache.put_speech(key, "ogg", data)
+    if opus_path is None:
+        return data
+    with open(opus_path, 'wb') as f:
+        f.write(data)
+    return opus_path
+
+def _generate_opus_via_wav(text, model):
+    """Two-step fallback for when only the piper binary is available."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="nazar-tts-") as tmp:
+        wav_path = generate_speech(text, os.path.join(tmp, "speech.wav"), model)
+        with open(convert_to_opus(wav_path), 'rb') as f:
+            return f.read()
@@ -0,0 +1,278 @@
+"""Inbox watcher: transcribe voice notes as Syncthing delivers them.
+
+Audio files that appear under the inbox folders are picked up through
+inotify (see obsidian/inotify.py), debounced until the file has stopped
+changing, and handed to a worker thread. The worker transcribes each file
+(through the voice daemon when it is running) and appends the text to the
+daily note of the recording's date. A small SQLite state store records
+every file by content hash before work starts. A file is therefore
+processed at most once, even across restarts, renames or re-sent copies.
+Files that arrived while the watcher was down are picked up by a scan at
+startup.
+"""
+
+import os
+import sys
+import time
+import queue
+import sqlite3
+import threading
+
+from obsidian import VAULT_PATH, CACHE_PATH
+
+import cache
+import daemon
+from voice import AUDIO_EXTENSIONS
+
+INBOX_DIRS = [
+    os.path.join(VAULT_PATH, folder.strip())
+    for folder in os.environ.get("VOICE_INBOX", "00-inbox").split(",") if folder.strip()
+]
+SETTLE_SECONDS = float(os.environ.get("VOICE_INBOX_SETTLE", "5"))
+STATE_PATH = os.environ.get("VOICE_INBOX_STATE", os.path.join(CACHE_PATH, "voice-inbox.sqlite"))
+
+
+def is_candidate(path):
+    """Audio file that is not a hidden or in-flight temp file (Syncthing uses .syncthing.*.tmp)."""
+    name = os.path.basename(path)
+    return not name.startswith('.') and name.lower().endswith(AUDIO_EXTENSIONS)
+
+
+def connect_state(path=None):
+    """Open the state store, creating its table on first use."""
+    path = path or STATE_PATH
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS processed (
+            digest TEXT PRIMARY KEY,
+            path TEXT NOT NULL,
+            size INTEGER,
+            mtime_ns INTEGER,
+            status TEXT NOT NULL,
+            claimed_at REAL NOT NULL,
+            finished_at REAL,
+            note TEXT,
+            error TEXT
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS processed_path ON processed (path)")
+    return conn
+
+
+def known(conn, path, stamp):
+    """Whether this exact file (path, size, mtime) was already claimed; avoids rehashing."""
+    return conn.execute(
+        "SELECT 1 FROM processed WHERE path = ? AND size = ? AND mtime_ns = ?", (path, *stamp)
+    ).fetchone() is not None
+
+
+def claim(conn, digest, path, stamp=(None, None)):
+    """
+    Record a file as taken before any work starts.
+
+    Returns:
+        True if this call claimed it, False if it was seen before
+    """
+    try:
+        conn.execute(
+            "INSERT INTO processed (digest, path, size, mtime_ns, status, claimed_at) "
+            "VALUES (?, ?, ?, ?, 'claimed', ?)",
+            (digest, path, *stamp, time.time()),
+        )
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+
+def finish(conn, digest, note=None, error=None):
+    """Mark a claimed file as done (or failed)."""
+    conn.execute(
+        "UPDATE processed SET status = ?, finished_at = ?, note = ?, error = ? WHERE digest = ?",
+        ("failed" if error else "done", time.time(), note, error, digest),
+    )
+
+
+def state_stats(conn=None):
+    """
+    Summarize the state store.
+
+    Returns:
+        Dict with counts per status and the most recent entries
+    """
+    conn = conn or connect_state()
+    counts = dict(conn.execute("SELECT status, COUNT(*) FROM processed GROUP BY status"))
+    recent = [
+        {"path": path, "status": status, "note": note, "error": error}
+        for path, status, note, error in conn.execute(
+            "SELECT path, status, note, error FROM processed ORDER BY claimed_at DESC LIMIT 10"
+        )
+    ]
+    return {"state": STATE_PATH, "inbox": INBOX_DIRS, "counts": counts, "recent": recent}
+
+
+def _transcribe(path):
+    try:
+        result = daemon.call("segments", audio_path=path, model="auto")
+        return " ".join(s["text"] for s in result["segments"]).strip()
+    except daemon.DaemonUnavailable:
+        from voice import transcribe_segments
+        segments, _ = transcribe_segments(path, "auto")
+        return " ".join(s.text for s in segments).strip()
+
+
+def process(conn, path):
+    """
+    Transcribe one settled inbox file into its daily note (at most once).
+
+    Returns:
+        Note path, or None if the file was already handled or has no speech
+    """
+    from obsidian import append_entries_to_daily_note
+    from voice import recording_time
+
+    stamp = _stamp(path)
+    if stamp is None:
+        raise FileNotFoundError(path)
+    if known(conn, path, stamp):
+        return None
+    digest = cache.file_digest(path)
+    if not claim(conn, digest, path, stamp):
+        return None
+    try:
+        text = _transcribe(path)
+        note = None
+        if text:
+            recorded = recording_time(path)
+            note = append_entries_to_daily_note([(recorded.strftime('%H:%M'), text)], recorded)
+    except Exception as e:
+        finish(conn, digest, error=f"{type(e).__name__}: {e}")
+        raise
+    finish(conn, digest, note=note)
+    return note
+
+
+def _worker(jobs, log):
+    conn = connect_state()
+    while True:
+        path = jobs.get()
+        if path is None:
+            return
+        try:
+            note = process(conn, path)
+            if note:
+                log(f"Transcribed {path} -> {note}")
+        except FileNotFoundError:
+            log(f"Gone before processing: {path}")
+        except Exception as e:
+            log(f"Failed {path}: {type(e).__name__}: {e}")
+
+
+def scan(dirs=None):
+    """Audio files already present under the inbox folders."""
+    found = []
+    for directory in dirs or INBOX_DIRS:
+        for root, subdirs, files in os.walk(directory):
+            subdirs[:] = [d for d in subdirs if not d.startswith('.')]
+            found.extend(os.path.join(root, name) for name in files if is_candidate(name))
+    return found
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def watch(dirs=None, settle=SETTLE_SECONDS, poll=None, log=None):
+    """
+    Run the watcher in the foreground until interrupted.
+
+    Args:
+        dirs: Folders to watch (defaults to VOICE_INBOX)
+        settle: Seconds a file must stay unchanged before it is processed
+        poll: Rescan interval in seconds instead of inotify (also used
+            automatically when inotify is unavailable)
+        log: Callable for progress messages (defaults to stderr)
+    """
+    import inotify
+
+    dirs = dirs or INBOX_DIRS
+    log = log or (lambda message: print(message, file=sys.stderr, flush=True))
+
+    notifier = None
+    if poll is None:
+        try:
+            notifier = inotify.Inotify()
+            for directory in dirs:
+                os.makedirs(directory, exist_ok=True)
+                notifier.add_watch(directory, inotify.IN_CLOSE_WRITE | inotify.IN_MOVED_TO,
+                                   recursive=True, skip=lambda d: os.path.basename(d).startswith('.'))
+        except OSError as e:
+            log(f"inotify unavailable ({e}), polling every 30s")
+            notifier, poll = None, 30.0
+
+    jobs = queue.Queue()
+    worker = threading.Thread(target=_worker, args=(jobs, log), name="inbox-worker", daemon=True)
+    worker.start()
+
+    # path -> (due time, size/mtime stamp when last seen)
+    pending = {}
+    # path -> stamp when handed to the worker, so rescans don't requeue it
+    enqueued = {}
+
+    def note_change(path):
+        if is_candidate(path):
+            pending[path] = (time.monotonic() + settle, _stamp(path))
+
+    for path in scan(dirs):
+        note_change(path)
+    log(f"Watching {', '.join(dirs)} ({'inotify' if notifier else f'polling every {poll}s'})")
+
+    next_scan = time.monotonic() + (poll or 0)
+    try:
+        while True:
+            now = time.monotonic()
+            waits = [due - now for due, _ in pending.values()]
+            if not notifier:
+                waits.append(next_scan - now)
+            timeout = max(0.0, min(waits)) if waits else None
+
+            if notifier:
+                for event in notifier.read(timeout):
+                    if event.path is None:
+                        # Event queue overflowed: fall back to a full scan
+                        for path in scan(dirs):
+                            note_change(path)
+                    else:
+                        note_change(event.path)
+            else:
+                time.sleep(timeout)
+                if time.monotonic() >= next_scan:
+                    for path in scan(dirs):
+                        if path not in pending and enqueued.get(path) != _stamp(path):
+                            note_change(path)
+                    next_scan = time.monotonic() + poll
+
+            now = time.monotonic()
+            for path, (due, stamp) in list(pending.items()):
+                if due > now:
+                    continue
+                current = _stamp(path)
+                if current is None:
+                    del pending[path]
+                elif current != stamp:
+                    # Still being written (Syncthing block copy): wait again
+                    pending[path] = (now + settle, current)
+                else:
+                    del pending[path]
+                    if enqueued.get(path) != current:
+                        enqueued[path] = current
+                        jobs.put(path)
+    finally:
+        jobs.put(None)
+        if notifier:
+            notifier.close()